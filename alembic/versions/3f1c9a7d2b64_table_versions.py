@@ -0,0 +1,47 @@
+"""table versions
+
+Revision ID: 3f1c9a7d2b64
+Revises: 59cb11f2798b
+Create Date: 2026-10-17 09:12:41.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c9a7d2b64'
+down_revision = '59cb11f2798b'
+branch_labels = None
+depends_on = None
+
+TRACKED_TABLES = (
+    'incomes',
+    'expenses',
+    'savings',
+    'income_templates',
+    'expense_templates',
+    'saving_templates',
+    'template_income_links',
+    'template_expense_links',
+    'template_saving_links',
+    'longterm_plans',
+    'longterm_periods',
+    'longterm_period_income_template_links',
+    'longterm_period_expense_template_links',
+    'longterm_period_saving_template_links',
+)
+
+
+def upgrade() -> None:
+    table_versions = op.create_table('table_versions',
+    sa.Column('table_name', sa.String(length=255), nullable=False),
+    sa.Column('version', sa.BigInteger(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('table_name')
+    )
+    op.bulk_insert(table_versions, [{'table_name': name, 'version': 1} for name in TRACKED_TABLES])
+
+
+def downgrade() -> None:
+    op.drop_table('table_versions')
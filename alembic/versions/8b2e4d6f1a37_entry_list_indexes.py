@@ -0,0 +1,37 @@
+"""entry list indexes
+
+Revision ID: 8b2e4d6f1a37
+Revises: 3f1c9a7d2b64
+Create Date: 2026-10-17 10:04:18.552910
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '8b2e4d6f1a37'
+down_revision = '3f1c9a7d2b64'
+branch_labels = None
+depends_on = None
+
+ENTRY_TABLES = ('incomes', 'expenses', 'savings')
+
+
+def upgrade() -> None:
+    for table in ENTRY_TABLES:
+        op.create_index(f'ix_{table}_created_at_id', table, ['created_at', 'id'], unique=False)
+        op.create_index(
+            f'ix_{table}_name_pattern',
+            table,
+            ['name'],
+            unique=False,
+            postgresql_ops={'name': 'text_pattern_ops'},
+        )
+    op.create_index('ix_expenses_category_created_at_id', 'expenses', ['category', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_expenses_category_created_at_id', table_name='expenses')
+    for table in reversed(ENTRY_TABLES):
+        op.drop_index(f'ix_{table}_name_pattern', table_name=table)
+        op.drop_index(f'ix_{table}_created_at_id', table_name=table)
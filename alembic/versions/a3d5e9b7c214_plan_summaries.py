@@ -0,0 +1,36 @@
+"""plan summaries
+
+Revision ID: a3d5e9b7c214
+Revises: f2a9c7e35d18
+Create Date: 2026-10-17 19:22:03.551870
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3d5e9b7c214'
+down_revision = 'f2a9c7e35d18'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('longterm_plan_summaries',
+    sa.Column('plan_id', sa.Integer(), nullable=False),
+    sa.Column('fingerprint', sa.String(length=32), nullable=False),
+    sa.Column('first_month', sa.Date(), nullable=True),
+    sa.Column('last_month', sa.Date(), nullable=True),
+    sa.Column('end_balance', sa.Numeric(precision=14, scale=2), nullable=True),
+    sa.Column('end_wealth', sa.Numeric(precision=14, scale=2), nullable=True),
+    sa.Column('min_balance', sa.Numeric(precision=14, scale=2), nullable=True),
+    sa.Column('min_balance_month', sa.Date(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['plan_id'], ['longterm_plans.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('plan_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('longterm_plan_summaries')
@@ -0,0 +1,69 @@
+"""template month totals
+
+Revision ID: c4d8e2a95f10
+Revises: 8b2e4d6f1a37
+Create Date: 2026-10-17 11:26:03.871455
+
+"""
+from decimal import Decimal
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4d8e2a95f10'
+down_revision = '8b2e4d6f1a37'
+branch_labels = None
+depends_on = None
+
+# template table, link table, entry table, link column referencing the entry
+TEMPLATES = (
+    ('income_templates', 'template_income_links', 'incomes', 'income_id'),
+    ('expense_templates', 'template_expense_links', 'expenses', 'expense_id'),
+    ('saving_templates', 'template_saving_links', 'savings', 'saving_id'),
+)
+
+
+def _backfill(bind, template_table, link_table, entry_table, entry_column):
+    annual = entry_table == 'expenses'
+    rows = bind.execute(sa.text(
+        f"SELECT l.template_id, e.amount{', e.is_annual_payment, e.annual_month' if annual else ''} "
+        f"FROM {link_table} l JOIN {entry_table} e ON e.id = l.{entry_column}"
+    ))
+    totals = {}
+    for row in rows:
+        vector = totals.setdefault(row[0], [Decimal('0')] * 12)
+        amount = Decimal(str(row[1] or 0))
+        if annual and row[2]:
+            if row[3] and 1 <= row[3] <= 12:
+                vector[row[3] - 1] += amount
+        else:
+            for month in range(12):
+                vector[month] += amount
+
+    table = sa.table(template_table, sa.column('id', sa.Integer), sa.column('month_totals', sa.JSON))
+    template_ids = [template_id for (template_id,) in bind.execute(sa.select(table.c.id))]
+    if template_ids:
+        bind.execute(
+            table.update().where(table.c.id == sa.bindparam('template_id')).values(month_totals=sa.bindparam('totals')),
+            [
+                {
+                    'template_id': template_id,
+                    'totals': [str(value) for value in totals.get(template_id, [Decimal('0')] * 12)],
+                }
+                for template_id in template_ids
+            ],
+        )
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    for template_table, link_table, entry_table, entry_column in TEMPLATES:
+        op.add_column(template_table, sa.Column('month_totals', sa.JSON(), nullable=True))
+        _backfill(bind, template_table, link_table, entry_table, entry_column)
+
+
+def downgrade() -> None:
+    for template_table, _, _, _ in reversed(TEMPLATES):
+        op.drop_column(template_table, 'month_totals')
@@ -0,0 +1,24 @@
+"""plan version
+
+Revision ID: d7a3f5c81e29
+Revises: c4d8e2a95f10
+Create Date: 2026-10-17 15:02:47.509113
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd7a3f5c81e29'
+down_revision = 'c4d8e2a95f10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('longterm_plans', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('longterm_plans', 'version')
@@ -0,0 +1,75 @@
+"""longterm accounts
+
+Revision ID: e6f1b8d24c07
+Revises: d7a3f5c81e29
+Create Date: 2026-10-17 16:40:12.284519
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e6f1b8d24c07'
+down_revision = 'd7a3f5c81e29'
+branch_labels = None
+depends_on = None
+
+LINK_TABLES = (
+    'longterm_period_income_template_links',
+    'longterm_period_expense_template_links',
+    'longterm_period_saving_template_links',
+)
+
+
+def upgrade() -> None:
+    op.create_table('longterm_accounts',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('plan_id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=255), nullable=False),
+    sa.Column('starting_balance', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('return_rate', sa.Numeric(precision=5, scale=2), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['plan_id'], ['longterm_plans.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_longterm_accounts_id'), 'longterm_accounts', ['id'], unique=False)
+    op.create_index(op.f('ix_longterm_accounts_plan_id'), 'longterm_accounts', ['plan_id'], unique=False)
+    op.create_table('longterm_transfers',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('plan_id', sa.Integer(), nullable=False),
+    sa.Column('from_account_id', sa.Integer(), nullable=True),
+    sa.Column('to_account_id', sa.Integer(), nullable=True),
+    sa.Column('amount', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('start_month', sa.Date(), nullable=False),
+    sa.Column('end_month', sa.Date(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['plan_id'], ['longterm_plans.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['from_account_id'], ['longterm_accounts.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['to_account_id'], ['longterm_accounts.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_longterm_transfers_id'), 'longterm_transfers', ['id'], unique=False)
+    op.create_index(op.f('ix_longterm_transfers_plan_id'), 'longterm_transfers', ['plan_id'], unique=False)
+    op.add_column('longterm_plans', sa.Column('financing_account_id', sa.Integer(), nullable=True))
+    # batch mode, SQLite cannot add a foreign key to an existing table
+    for table in LINK_TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.add_column(sa.Column('account_id', sa.Integer(), nullable=True))
+            batch_op.create_foreign_key(
+                f'fk_{table}_account_id', 'longterm_accounts', ['account_id'], ['id'], ondelete='SET NULL'
+            )
+
+
+def downgrade() -> None:
+    for table in LINK_TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_constraint(f'fk_{table}_account_id', type_='foreignkey')
+            batch_op.drop_column('account_id')
+    op.drop_column('longterm_plans', 'financing_account_id')
+    op.drop_index(op.f('ix_longterm_transfers_plan_id'), table_name='longterm_transfers')
+    op.drop_index(op.f('ix_longterm_transfers_id'), table_name='longterm_transfers')
+    op.drop_table('longterm_transfers')
+    op.drop_index(op.f('ix_longterm_accounts_plan_id'), table_name='longterm_accounts')
+    op.drop_index(op.f('ix_longterm_accounts_id'), table_name='longterm_accounts')
+    op.drop_table('longterm_accounts')
@@ -0,0 +1,40 @@
+"""longterm events
+
+Revision ID: f2a9c7e35d18
+Revises: e6f1b8d24c07
+Create Date: 2026-10-17 18:05:47.913062
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2a9c7e35d18'
+down_revision = 'e6f1b8d24c07'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('longterm_events',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('plan_id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=255), nullable=True),
+    sa.Column('month', sa.Date(), nullable=False),
+    sa.Column('kind', sa.String(length=16), nullable=False),
+    sa.Column('amount', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('account_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['plan_id'], ['longterm_plans.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['account_id'], ['longterm_accounts.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_longterm_events_id'), 'longterm_events', ['id'], unique=False)
+    op.create_index('ix_longterm_events_plan_id_month', 'longterm_events', ['plan_id', 'month'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_longterm_events_plan_id_month', table_name='longterm_events')
+    op.drop_index(op.f('ix_longterm_events_id'), table_name='longterm_events')
+    op.drop_table('longterm_events')
@@ -0,0 +1,14 @@
+"""ASGI application serving the API and the frontend in ``public/``.
+
+This is what run.py and serve.py hand to uvicorn; app.main.app alone only
+contains the API.
+"""
+
+from pathlib import Path
+
+from app.main import app
+from app.static_assets import STATIC_RELOAD, StaticAssets
+
+PUBLIC_DIR = Path(__file__).resolve().parent.parent / "public"
+
+app.mount("/", StaticAssets(PUBLIC_DIR, reload=STATIC_RELOAD), name="static")
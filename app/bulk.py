@@ -0,0 +1,92 @@
+"""Batch create and delete for the entry tables.
+
+Items are validated one by one so a bad row is reported with its index
+instead of rejecting the whole request. All valid rows are then written
+with one multi-row INSERT (or DELETE) in a single transaction.
+"""
+
+from typing import Any, Dict, List, Sequence, Tuple, Type
+
+from pydantic import BaseModel, Field, ValidationError
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from app.template_totals import ENTRY_KINDS, linked_template_ids, refresh_month_totals
+from app.versions import bump_versions
+
+MAX_BULK_ITEMS = 10_000
+
+
+class BulkCreatePayload(BaseModel):
+    items: List[Any] = Field(..., max_length=MAX_BULK_ITEMS)
+
+
+class BulkDeletePayload(BaseModel):
+    ids: List[int] = Field(..., max_length=MAX_BULK_ITEMS)
+
+
+class BulkItemError(BaseModel):
+    index: int
+    errors: List[Dict[str, Any]]
+
+
+class BulkDeleteError(BaseModel):
+    id: int
+    detail: str
+
+
+class BulkDeleteRead(BaseModel):
+    deleted: List[int]
+    errors: List[BulkDeleteError]
+
+
+def validate_items(schema: Type[BaseModel], items: Sequence[Any]) -> Tuple[List[Dict[str, Any]], List[BulkItemError]]:
+    rows = []
+    errors = []
+    for index, item in enumerate(items):
+        try:
+            rows.append(schema.model_validate(item).model_dump())
+        except ValidationError as exc:
+            errors.append(
+                BulkItemError(
+                    index=index,
+                    errors=[
+                        {"loc": list(error["loc"]), "msg": error["msg"], "type": error["type"]}
+                        for error in exc.errors(include_url=False)
+                    ],
+                )
+            )
+    return rows, errors
+
+
+def bulk_insert(db: Session, model, rows: List[Dict[str, Any]]) -> List:
+    if not rows:
+        return []
+    created = list(db.scalars(insert(model).returning(model, sort_by_parameter_order=True), rows))
+    # Core-level inserts bypass the flush hook that maintains the counters
+    bump_versions(db, (model.__tablename__,))
+    db.commit()
+    return created
+
+
+def bulk_delete(db: Session, model, link_column, ids: Sequence[int], not_found: str) -> BulkDeleteRead:
+    """Delete ``ids`` from ``model`` together with their template links (``link_column``).
+
+    The month totals of the affected templates are refreshed in the same transaction.
+    """
+    requested = list(dict.fromkeys(ids))
+    existing = set(db.scalars(select(model.id).where(model.id.in_(requested)))) if requested else set()
+    deleted = [entry_id for entry_id in requested if entry_id in existing]
+    if deleted:
+        kind = ENTRY_KINDS[model]
+        template_ids = linked_template_ids(db, kind, deleted)
+        # SQLite does not enforce ON DELETE CASCADE unless asked to, so remove the links explicitly
+        db.execute(delete(link_column.table).where(link_column.in_(deleted)))
+        db.execute(delete(model).where(model.id.in_(deleted)))
+        bump_versions(db, (model.__tablename__, link_column.table.name))
+        refresh_month_totals(db, kind, template_ids)
+        db.commit()
+    return BulkDeleteRead(
+        deleted=deleted,
+        errors=[BulkDeleteError(id=entry_id, detail=not_found) for entry_id in requested if entry_id not in existing],
+    )
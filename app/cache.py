@@ -0,0 +1,164 @@
+"""Bounded LRU cache for computed plan projections.
+
+Entries are content addressed: the key is a hash over everything a
+projection depends on, so a changed plan can never be served a stale
+result. Each entry also records the rows it was built from (the plan and
+its templates) so that write paths can drop exactly the entries they made
+unreachable instead of waiting for them to age out.
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Iterable, Optional, Set, Tuple
+
+from app.models import LongtermPlan
+
+Tag = Tuple[str, int]
+
+PLAN_FIELDS = (
+    "starting_balance",
+    "starting_saving_balance",
+    "savings_return_rate",
+    "financing_start_month",
+    "car_purchase_price",
+    "car_down_payment",
+    "car_final_payment",
+    "car_monthly_rate",
+    "car_term_months",
+    "car_insurance_monthly",
+    "car_fuel_monthly",
+    "car_maintenance_monthly",
+    "car_tax_monthly",
+    "car_interest_rate",
+    "financing_account_id",
+)
+
+
+def plan_fingerprint(plan: LongtermPlan) -> Tuple[str, Set[Tag]]:
+    """Return the content hash of ``plan`` and the rows it was derived from.
+
+    ``plan`` must be loaded with app.projection.load_plan_for_projection.
+    """
+    tags: Set[Tag] = {("plan", plan.id)}
+    periods = []
+    for period in sorted(plan.periods or [], key=lambda p: (p.start_month, p.id)):
+        linked = []
+        for links_attr, kind in (
+            ("income_templates", "income"),
+            ("expense_templates", "expense"),
+            ("savings_templates", "saving"),
+        ):
+            contents = []
+            for link in getattr(period, links_attr) or []:
+                template = link.template
+                if template is None:
+                    continue
+                tags.add((f"{kind}_template", template.id))
+                contents.append((template.id, link.account_id, tuple(template.month_totals or ())))
+            shared = (period.shared_month_totals or {}).get(kind)
+            linked.append((tuple(sorted(contents)), tuple(str(value) for value in shared or ())))
+        periods.append((period.start_month.isoformat(), period.end_month.isoformat(), tuple(linked)))
+
+    accounts = tuple((a.id, str(a.starting_balance), str(a.return_rate)) for a in plan.accounts or [])
+    transfers = tuple(
+        (t.from_account_id, t.to_account_id, str(t.amount), t.start_month.isoformat(), t.end_month.isoformat())
+        for t in plan.transfers or []
+    )
+    events = tuple(
+        (month.isoformat(), kind, str(amount), account_id) for month, kind, amount, account_id in plan.event_rows or ()
+    )
+    content = (
+        tuple(str(getattr(plan, name)) for name in PLAN_FIELDS),
+        tuple(periods),
+        accounts,
+        transfers,
+        events,
+    )
+    return hashlib.blake2b(repr(content).encode(), digest_size=16).hexdigest(), tags
+
+
+class ProjectionCache:
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, object]" = OrderedDict()
+        self._tags: Dict[Hashable, Set[Tag]] = {}
+        self._index: Dict[Tag, Set[Hashable]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[object]:
+        """Cached value for ``key`` or None; counts as a hit or a miss."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, tags: Iterable[Tag], value: object) -> None:
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = value
+            self._tags[key] = set(tags)
+            for tag in self._tags[key]:
+                self._index.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.maxsize:
+                oldest, _ = self._entries.popitem(last=False)
+                self._drop_tags(oldest)
+                self.evictions += 1
+
+    def get_or_compute(self, key: Hashable, tags: Iterable[Tag], compute: Callable[[], object]) -> object:
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, tags, value)
+        return value
+
+    def invalidate(self, *tags: Tag) -> int:
+        with self._lock:
+            keys = set()
+            for tag in tags:
+                keys.update(self._index.get(tag, ()))
+            for key in keys:
+                del self._entries[key]
+                self._drop_tags(key)
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+            self._index.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    def _drop_tags(self, key: Hashable) -> None:
+        for tag in self._tags.pop(key, ()):
+            keys = self._index.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._index[tag]
+
+
+projection_cache = ProjectionCache(maxsize=int(os.getenv("PROJECTION_CACHE_SIZE", "256")))
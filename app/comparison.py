@@ -0,0 +1,120 @@
+"""Side-by-side comparison of many plans.
+
+Projections that are not cached yet are computed on the shared process
+pool (app.pool), so comparing hundreds of plans uses every core. The
+result is aligned on one month axis covering all plans.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.cache import plan_fingerprint, projection_cache
+from app.models import LongtermPlan
+from app.money import CENTS, to_euros
+from app.pool import get_process_pool, pool_size
+from app.projection import (
+    FinancingInput,
+    Projection,
+    compute_projection,
+    financing_input,
+    freeze,
+    projection_input,
+)
+
+# below this many uncached plans the pool round trip costs more than it saves
+PARALLEL_THRESHOLD = 8
+
+
+@dataclass
+class PlanComparison:
+    plan_id: int
+    name: str
+    projection: Projection
+    total_car_cost: float
+
+    @property
+    def end_wealth(self) -> Optional[float]:
+        if not self.projection.months.size:
+            return None
+        return int(self.projection.total_wealth[-1]) / CENTS
+
+    @property
+    def lowest_balance(self) -> Optional[float]:
+        if not self.projection.months.size:
+            return None
+        return int(self.projection.balance.min()) / CENTS
+
+    @property
+    def lowest_balance_month(self) -> Optional[int]:
+        if not self.projection.months.size:
+            return None
+        return int(self.projection.months[self.projection.balance.argmin()])
+
+
+def total_car_cost(financing: FinancingInput) -> float:
+    if not financing.active:
+        return 0.0
+    cents = (
+        financing.down_payment
+        + (financing.monthly_rate + financing.running_costs) * financing.term_months
+        + financing.final_payment
+    )
+    return cents / CENTS
+
+
+def project_plans(plans: Sequence[LongtermPlan], workers: Optional[int] = None) -> List[Projection]:
+    """Projections of ``plans`` in order, computing cache misses in parallel."""
+    workers = workers or pool_size()
+    projections: List[Optional[Projection]] = []
+    missing = []
+    for plan in plans:
+        key, tags = plan_fingerprint(plan)
+        projection = projection_cache.get(key)
+        if projection is None:
+            missing.append((len(projections), key, tags, projection_input(plan)))
+        projections.append(projection)
+
+    inputs = [data for _, _, _, data in missing]
+    if workers > 1 and len(missing) >= PARALLEL_THRESHOLD:
+        chunksize = max(1, len(inputs) // (workers * 4))
+        computed = get_process_pool().map(compute_projection, inputs, chunksize=chunksize)
+    else:
+        computed = map(compute_projection, inputs)
+
+    for (position, key, tags, _), projection in zip(missing, computed):
+        projection = freeze(projection)
+        projection_cache.put(key, tags, projection)
+        projections[position] = projection
+    return projections
+
+
+def compare_plans(plans: Sequence[LongtermPlan], workers: Optional[int] = None) -> List[PlanComparison]:
+    return [
+        PlanComparison(
+            plan_id=plan.id,
+            name=plan.name,
+            projection=projection,
+            total_car_cost=total_car_cost(financing_input(plan)),
+        )
+        for plan, projection in zip(plans, project_plans(plans, workers))
+    ]
+
+
+def month_axis(comparisons: Sequence[PlanComparison]) -> np.ndarray:
+    covered = [c.projection.months for c in comparisons if c.projection.months.size]
+    if not covered:
+        return np.zeros(0, dtype=np.int64)
+    return np.arange(min(m[0] for m in covered), max(m[-1] for m in covered) + 1)
+
+
+def aligned_series(comparison: PlanComparison, axis: np.ndarray, names: Sequence[str]) -> Dict[str, List[Optional[float]]]:
+    """Series of one plan on ``axis``; months the plan does not cover are None."""
+    positions = comparison.projection.months - (axis[0] if axis.size else 0)
+    series = {}
+    for name in names:
+        values = np.full(axis.size, np.nan)
+        values[positions] = to_euros(getattr(comparison.projection, name))
+        series[name] = [None if np.isnan(value) else value for value in values.tolist()]
+    return series
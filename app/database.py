@@ -1,15 +1,54 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from starlette.concurrency import run_in_threadpool
 import os
+from typing import Optional, Union
 from dotenv import load_dotenv
 
+from app.instrumentation import SQL_INSTRUMENTATION, instrument_engine
+
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
+# "async" (default) or "sync"; async falls back to sync when the driver has no async variant
+DATABASE_MODE = os.getenv("DATABASE_MODE", "async").lower()
+
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+psycopg",
+    "postgresql+psycopg": "postgresql+psycopg",
+    "postgresql+psycopg_async": "postgresql+psycopg_async",
+    "postgresql+asyncpg": "postgresql+asyncpg",
+    "sqlite+aiosqlite": "sqlite+aiosqlite",
+}
+
+SYNC_DRIVERS = {
+    "postgresql+psycopg_async": "postgresql+psycopg",
+    "postgresql+asyncpg": "postgresql+psycopg",
+    "sqlite+aiosqlite": "sqlite",
+}
+
+
+def _with_driver(url: str, drivers: dict, default: Optional[str] = None) -> Optional[str]:
+    parsed = make_url(url)
+    driver = drivers.get(parsed.drivername, default)
+    if driver is None:
+        return None
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+def _async_url(url: str) -> Optional[str]:
+    return _with_driver(url, ASYNC_DRIVERS)
+
+
+def _sync_url(url: str) -> str:
+    return _with_driver(url, SYNC_DRIVERS, default=make_url(url).drivername)
+
 
 if DATABASE_URL:
     engine = create_engine(
-        DATABASE_URL,
+        _sync_url(DATABASE_URL),
         pool_pre_ping=True,
         echo=False
     )
@@ -18,13 +57,68 @@ else:
     engine = None
     SessionLocal = None
 
+ASYNC_DATABASE_URL = _async_url(DATABASE_URL) if DATABASE_URL and DATABASE_MODE == "async" else None
+
+if ASYNC_DATABASE_URL:
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        pool_pre_ping=True,
+        echo=False
+    )
+    # objects are serialized after the handler returns, so keep them loaded past commit
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+else:
+    async_engine = None
+    AsyncSessionLocal = None
+
+if SQL_INSTRUMENTATION:
+    if engine is not None:
+        instrument_engine(engine)
+    if async_engine is not None:
+        instrument_engine(async_engine.sync_engine)
+
 Base = declarative_base()
 
-def get_db():
+
+class ThreadedSession:
+    """Sync-mode stand-in for AsyncSession.
+
+    Routes only use ``run_sync``; here it runs the ORM work on the threadpool
+    instead of on the event loop.
+    """
+
+    def __init__(self, session):
+        self.sync_session = session
+
+    async def run_sync(self, fn, *args, **kwargs):
+        return await run_in_threadpool(fn, self.sync_session, *args, **kwargs)
+
+    async def close(self) -> None:
+        await run_in_threadpool(self.sync_session.close)
+
+
+DbSession = Union[AsyncSession, ThreadedSession]
+
+
+async def get_db():
+    if AsyncSessionLocal is not None:
+        async with AsyncSessionLocal() as db:
+            yield db
+        return
+    if SessionLocal is None:
+        raise RuntimeError("Database not configured")
+    db = ThreadedSession(SessionLocal())
+    try:
+        yield db
+    finally:
+        await db.close()
+
+
+def get_sync_db():
     if SessionLocal is None:
         raise RuntimeError("Database not configured")
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
@@ -0,0 +1,175 @@
+"""Streaming export of plan projections.
+
+Plans are loaded and projected one at a time inside the response
+generator, and every format writes its output in small pieces, so memory
+use does not grow with the number of plans or months exported. CSV and
+NDJSON need nothing beyond the standard library; Parquet and Arrow IPC
+require the optional ``pyarrow`` package.
+"""
+
+import csv
+import io
+import json
+from typing import Callable, Iterable, Iterator, List, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.models import LongtermPlan
+from app.money import to_euros
+from app.projection import Projection, load_plan_for_projection, month_label, projection_for_plan
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional, only needed for columnar exports
+    pa = None
+    pq = None
+
+VALUE_COLUMNS = (
+    "income",
+    "expense",
+    "savings",
+    "net",
+    "balance",
+    "saving_total",
+    "invested_balance",
+    "total_wealth",
+)
+COLUMNS = ("plan_id", "plan_name", "month") + VALUE_COLUMNS
+ROWS_PER_CHUNK = 1000
+
+FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows"),
+}
+COLUMNAR_FORMATS = frozenset({"parquet", "arrow"})
+
+PlanProjection = Tuple[int, str, Projection]
+
+
+def columnar_available() -> bool:
+    return pa is not None
+
+
+def iter_plan_projections(session_factory: Callable[[], Session], plan_ids: Sequence[int]) -> Iterator[PlanProjection]:
+    with session_factory() as db:
+        for plan_id in plan_ids:
+            plan = load_plan_for_projection(db, plan_id)
+            if plan is None:
+                continue
+            yield plan.id, plan.name, projection_for_plan(plan)
+            # drop the loaded plan graph before the next one
+            db.expunge_all()
+
+
+def all_plan_ids(db: Session) -> List[int]:
+    return [plan_id for (plan_id,) in db.query(LongtermPlan.id).order_by(LongtermPlan.id)]
+
+
+def _row_chunks(projection: Projection) -> Iterator[Tuple[List[str], List[list]]]:
+    values = np.column_stack([to_euros(getattr(projection, name)) for name in VALUE_COLUMNS])
+    for start in range(0, projection.months.size, ROWS_PER_CHUNK):
+        stop = start + ROWS_PER_CHUNK
+        yield [month_label(m) for m in projection.months[start:stop]], values[start:stop].tolist()
+
+
+def iter_csv(plans: Iterable[PlanProjection]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(COLUMNS)
+    for plan_id, plan_name, projection in plans:
+        for months, rows in _row_chunks(projection):
+            writer.writerows([plan_id, plan_name, month, *row] for month, row in zip(months, rows))
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def iter_ndjson(plans: Iterable[PlanProjection]) -> Iterator[str]:
+    for plan_id, plan_name, projection in plans:
+        for months, rows in _row_chunks(projection):
+            yield "".join(
+                json.dumps({"plan_id": plan_id, "plan_name": plan_name, "month": month, **dict(zip(VALUE_COLUMNS, row))})
+                + "\n"
+                for month, row in zip(months, rows)
+            )
+
+
+class _Drain(io.RawIOBase):
+    """Write-only sink whose contents are handed out (and released) after every batch."""
+
+    def __init__(self):
+        self._pieces = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._pieces.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def take(self) -> bytes:
+        data = b"".join(self._pieces)
+        self._pieces.clear()
+        return data
+
+
+def _schema():
+    return pa.schema(
+        [("plan_id", pa.int64()), ("plan_name", pa.string()), ("month", pa.string())]
+        + [(name, pa.float64()) for name in VALUE_COLUMNS]
+    )
+
+
+def _record_batch(schema, plan_id: int, plan_name: str, projection: Projection):
+    size = projection.months.size
+    return pa.RecordBatch.from_arrays(
+        [
+            pa.array(np.full(size, plan_id, dtype=np.int64)),
+            pa.array([plan_name] * size, type=pa.string()),
+            pa.array([month_label(m) for m in projection.months], type=pa.string()),
+        ]
+        + [pa.array(to_euros(getattr(projection, name))) for name in VALUE_COLUMNS],
+        schema=schema,
+    )
+
+
+def iter_columnar(plans: Iterable[PlanProjection], fmt: str) -> Iterator[bytes]:
+    """Parquet (one row group per plan) or Arrow IPC stream (one record batch per plan)."""
+    if pa is None:
+        raise RuntimeError("Columnar export requires pyarrow.")
+    schema = _schema()
+    sink = _Drain()
+    writer = pq.ParquetWriter(sink, schema) if fmt == "parquet" else pa.ipc.new_stream(sink, schema)
+    try:
+        for plan_id, plan_name, projection in plans:
+            batch = _record_batch(schema, plan_id, plan_name, projection)
+            if fmt == "parquet":
+                writer.write_batch(batch, row_group_size=max(batch.num_rows, 1))
+            else:
+                writer.write_batch(batch)
+            chunk = sink.take()
+            if chunk:
+                yield chunk
+    finally:
+        writer.close()
+    yield sink.take()
+
+
+def iter_export(plans: Iterable[PlanProjection], fmt: str) -> Iterator:
+    if fmt == "csv":
+        return iter_csv(plans)
+    if fmt == "ndjson":
+        return iter_ndjson(plans)
+    return iter_columnar(plans, fmt)
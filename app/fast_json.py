@@ -0,0 +1,123 @@
+"""Opt-in fast JSON responses.
+
+FastAPI validates a route's return value against its response model, dumps
+the result to Python objects and then encodes those with ``json.dumps``.
+With ``JSON_RESPONSE_MODE=fast`` routes of routers using FastJSONRoute skip
+that pipeline: the return value is validated once by a TypeAdapter cached
+per route and written straight to JSON bytes by pydantic-core. Return
+values without a response model are encoded with orjson when it is
+installed, bypassing ``jsonable_encoder``. app.main additionally
+gzip-compresses bodies of at least ``JSON_GZIP_MIN_SIZE`` bytes (0 turns
+that off).
+
+``JSON_DECIMALS`` sets how Decimal amounts are written in fast mode:
+``string`` (default, as in the standard mode) or ``float``.
+"""
+
+import asyncio
+import json
+import os
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable, Optional
+
+import numpy as np
+from fastapi import Response
+from fastapi.exceptions import ResponseValidationError
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+try:
+    import orjson
+except ImportError:  # optional, json is used instead
+    orjson = None
+
+JSON_RESPONSE_MODE = os.getenv("JSON_RESPONSE_MODE", "standard").lower()
+FAST_JSON = JSON_RESPONSE_MODE == "fast"
+JSON_DECIMALS = os.getenv("JSON_DECIMALS", "string").lower()
+JSON_GZIP_MIN_SIZE = int(os.getenv("JSON_GZIP_MIN_SIZE", "4096"))
+
+if JSON_RESPONSE_MODE not in ("standard", "fast"):
+    raise RuntimeError(f"JSON_RESPONSE_MODE must be 'standard' or 'fast', got {JSON_RESPONSE_MODE!r}")
+if JSON_DECIMALS not in ("string", "float"):
+    raise RuntimeError(f"JSON_DECIMALS must be 'string' or 'float', got {JSON_DECIMALS!r}")
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return float(value) if JSON_DECIMALS == "float" else str(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump(by_alias=True)
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(content, default=_default, separators=(",", ":")).encode()
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class FastJSONRoute(APIRoute):
+    """APIRoute that, in fast mode, renders the endpoint's return value itself.
+
+    Headers and status codes set on an injected ``Response`` are carried
+    over; endpoints returning a Response are left alone, as are routes
+    without a body (204).
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any) -> None:
+        super().__init__(path, endpoint, **kwargs)
+        self.adapter: Optional[TypeAdapter] = None
+        if not FAST_JSON or self.status_code == 204:
+            return
+        if self.response_model is not None:
+            self.adapter = TypeAdapter(self.response_model)
+        self.dependant.call = self._fast_call(self.dependant.call)
+
+    def _fast_call(self, call: Callable[..., Any]) -> Callable[..., Any]:
+        response_param = self.dependant.response_param_name
+
+        if asyncio.iscoroutinefunction(call):
+
+            async def fast_call(**values):
+                return self.render(await call(**values), values.get(response_param))
+
+        else:
+
+            def fast_call(**values):
+                return self.render(call(**values), values.get(response_param))
+
+        return fast_call
+
+    def render(self, content: Any, sub_response: Optional[Response]) -> Any:
+        if isinstance(content, Response):
+            return content
+        if self.adapter is None:
+            body = dumps(content)
+        else:
+            try:
+                value = self.adapter.validate_python(content, from_attributes=True)
+            except ValidationError as exc:
+                raise ResponseValidationError(errors=exc.errors(include_url=False), body=content)
+            if JSON_DECIMALS == "string":
+                body = self.adapter.dump_json(value, by_alias=True)
+            else:
+                body = dumps(self.adapter.dump_python(value, by_alias=True))
+
+        status_code = (sub_response.status_code if sub_response is not None else None) or self.status_code or 200
+        response = Response(body, status_code=status_code, media_type="application/json")
+        if sub_response is not None:
+            response.headers.raw.extend(sub_response.headers.raw)
+        return response
@@ -0,0 +1,131 @@
+"""Annuity loan math ("Sparkassenformel").
+
+A loan of ``principal`` paid back with ``term`` equal monthly ``payment``s at
+the end of each month, leaving ``balloon`` as final payment, satisfies
+
+    principal * q**term = payment * (q**term - 1) / (q - 1) + balloon
+
+with ``q = 1 + annual_rate / 100 / 12``. Each solver takes the other four
+quantities and returns the missing one. All arguments broadcast like NumPy
+arrays, so thousands of loan variants are priced in a single call. Rates are
+nominal annual percentages, as stored on LongtermPlan. The solvers work in
+floating point; solve() settles amounts (payment, principal, balloon) in
+whole cents.
+"""
+
+from typing import Tuple
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from app.money import quantize_euros
+
+UNKNOWNS = ("payment", "rate", "term", "principal", "balloon")
+AMOUNTS = frozenset({"payment", "principal", "balloon"})
+
+NEWTON_MAX_ITERATIONS = 100
+NEWTON_TOLERANCE = 1e-12
+
+
+def _monthly(annual_rate_percent: ArrayLike) -> np.ndarray:
+    return np.asarray(annual_rate_percent, dtype=np.float64) / 100 / 12
+
+
+def _annuity_factors(rate: np.ndarray, term: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Present value of 1 per month for ``term`` months and discount factor of the last month."""
+    discount = (1 + rate) ** -term
+    with np.errstate(divide="ignore", invalid="ignore"):
+        present_value = np.where(rate == 0, term, (1 - discount) / np.where(rate == 0, 1, rate))
+    return present_value, discount
+
+
+def solve_payment(principal: ArrayLike, rate: ArrayLike, term: ArrayLike, balloon: ArrayLike = 0) -> np.ndarray:
+    monthly_rate = _monthly(rate)
+    term = np.asarray(term, dtype=np.float64)
+    present_value, discount = _annuity_factors(monthly_rate, term)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result = (np.asarray(principal, dtype=np.float64) - np.asarray(balloon, dtype=np.float64) * discount) / present_value
+    return np.where(term > 0, result, 0.0)
+
+
+def solve_principal(payment: ArrayLike, rate: ArrayLike, term: ArrayLike, balloon: ArrayLike = 0) -> np.ndarray:
+    present_value, discount = _annuity_factors(_monthly(rate), np.asarray(term, dtype=np.float64))
+    return np.asarray(payment, dtype=np.float64) * present_value + np.asarray(balloon, dtype=np.float64) * discount
+
+
+def solve_balloon(principal: ArrayLike, payment: ArrayLike, rate: ArrayLike, term: ArrayLike) -> np.ndarray:
+    """Remaining debt after ``term`` payments, i.e. the classic Sparkassenformel."""
+    monthly_rate = _monthly(rate)
+    present_value, discount = _annuity_factors(monthly_rate, np.asarray(term, dtype=np.float64))
+    return (np.asarray(principal, dtype=np.float64) - np.asarray(payment, dtype=np.float64) * present_value) / discount
+
+
+def solve_term(principal: ArrayLike, payment: ArrayLike, rate: ArrayLike, balloon: ArrayLike = 0) -> np.ndarray:
+    """Number of months (fractional) until the debt is down to ``balloon``; ``nan`` if never."""
+    monthly_rate = _monthly(rate)
+    principal = np.asarray(principal, dtype=np.float64)
+    payment = np.asarray(payment, dtype=np.float64)
+    balloon = np.asarray(balloon, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # (1 + r)**-n = (payment - principal * r) / (payment - balloon * r)
+        ratio = (payment - principal * monthly_rate) / (payment - balloon * monthly_rate)
+        with_interest = -np.log(ratio) / np.log1p(monthly_rate)
+        without_interest = (principal - balloon) / payment
+        result = np.where(monthly_rate == 0, without_interest, with_interest)
+    return np.where(np.isfinite(result) & (result >= 0), result, np.nan)
+
+
+def solve_rate(
+    principal: ArrayLike,
+    payment: ArrayLike,
+    term: ArrayLike,
+    balloon: ArrayLike = 0,
+    guess: ArrayLike = 5.0,
+) -> np.ndarray:
+    """Annual rate in percent, found with Newton iterations over all inputs at once.
+
+    Entries that do not converge (e.g. payments that can never repay the
+    loan) are returned as ``nan``.
+    """
+    principal, payment, term, balloon, guess = np.broadcast_arrays(
+        *(np.asarray(v, dtype=np.float64) for v in (principal, payment, term, balloon, guess))
+    )
+    # the derivative is ill-conditioned around zero, so settle interest-free loans up front
+    converged = np.isclose(payment * term + balloon, principal, rtol=1e-12, atol=1e-9)
+    r = np.where(converged, 0.0, _monthly(guess))
+
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        for _ in range(NEWTON_MAX_ITERATIONS):
+            safe = np.where(np.abs(r) < 1e-9, 1e-9, r)
+            discount = (1 + safe) ** -term
+            present_value = (1 - discount) / safe
+            value = payment * present_value + balloon * discount - principal
+            d_discount = -term * discount / (1 + safe)
+            d_present_value = (-d_discount * safe - (1 - discount)) / safe**2
+            slope = payment * d_present_value + balloon * d_discount
+            step = np.where(converged, 0.0, value / slope)
+            r = np.maximum(r - step, -0.99)
+            converged |= np.abs(step) < NEWTON_TOLERANCE
+            if converged.all():
+                break
+
+    result = r * 12 * 100
+    return np.where(converged & np.isfinite(result), result, np.nan)
+
+
+def solve(unknown: str, **known: ArrayLike) -> np.ndarray:
+    """Solve for ``unknown`` (one of UNKNOWNS) given the other quantities by name."""
+    solvers = {
+        "payment": lambda: solve_payment(known["principal"], known["rate"], known["term"], known.get("balloon", 0)),
+        "principal": lambda: solve_principal(known["payment"], known["rate"], known["term"], known.get("balloon", 0)),
+        "balloon": lambda: solve_balloon(known["principal"], known["payment"], known["rate"], known["term"]),
+        "term": lambda: solve_term(known["principal"], known["payment"], known["rate"], known.get("balloon", 0)),
+        "rate": lambda: solve_rate(known["principal"], known["payment"], known["term"], known.get("balloon", 0)),
+    }
+    if unknown not in solvers:
+        raise ValueError(f"Unknown quantity {unknown!r}; expected one of {', '.join(UNKNOWNS)}.")
+    try:
+        result = solvers[unknown]()
+    except KeyError as exc:
+        raise ValueError(f"Missing {exc.args[0]!r} to solve for {unknown}.") from exc
+    return quantize_euros(result) if unknown in AMOUNTS else result
@@ -0,0 +1,127 @@
+"""Per-request SQL statistics.
+
+Engine event hooks time every statement and attribute it to the request
+currently being served (tracked in a context variable by
+``SQLInstrumentationMiddleware``). At the end of a request the totals are
+sent as ``X-DB-*`` response headers and kept in a small ring buffer for the
+``/api/debug/sql`` endpoint. The same statement text executed at least
+``SQL_N_PLUS_ONE_THRESHOLD`` times within one request is flagged as a likely
+N+1 pattern.
+"""
+
+import logging
+import os
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Deque, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+SQL_INSTRUMENTATION = os.getenv("SQL_INSTRUMENTATION", "0").lower() in ("1", "true", "yes")
+N_PLUS_ONE_THRESHOLD = int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", "5"))
+SLOWEST_STATEMENTS = int(os.getenv("SQL_SLOWEST_STATEMENTS", "5"))
+RECENT_REQUESTS = int(os.getenv("SQL_RECENT_REQUESTS", "100"))
+
+
+@dataclass
+class QueryStats:
+    method: str = ""
+    path: str = ""
+    count: int = 0
+    total_time: float = 0.0
+    statements: Counter = field(default_factory=Counter)
+    slowest: List[Tuple[float, str]] = field(default_factory=list)
+
+    def record(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.total_time += duration
+        self.statements[statement] += 1
+        if len(self.slowest) < SLOWEST_STATEMENTS or duration > self.slowest[-1][0]:
+            self.slowest.append((duration, statement))
+            self.slowest.sort(key=lambda item: item[0], reverse=True)
+            del self.slowest[SLOWEST_STATEMENTS:]
+
+    def repeated(self, threshold: int = N_PLUS_ONE_THRESHOLD) -> List[Tuple[str, int]]:
+        return [(statement, n) for statement, n in self.statements.most_common() if n >= threshold]
+
+    def to_dict(self) -> dict:
+        return {
+            "method": self.method,
+            "path": self.path,
+            "statement_count": self.count,
+            "db_time_ms": round(self.total_time * 1000, 3),
+            "slowest": [
+                {"duration_ms": round(duration * 1000, 3), "statement": statement}
+                for duration, statement in self.slowest
+            ],
+            "repeated": [{"statement": statement, "count": n} for statement, n in self.repeated()],
+        }
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("sql_query_stats", default=None)
+recent_requests: Deque[dict] = deque(maxlen=RECENT_REQUESTS)
+
+
+# the start time lives on the execution context, which is discarded with the
+# statement even when it raises and after_cursor_execute never runs
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_start_time = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = context._query_start_time
+    stats = _current.get()
+    if stats is not None:
+        stats.record(statement, time.perf_counter() - started)
+
+
+def instrument_engine(engine: Engine) -> None:
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class SQLInstrumentationMiddleware:
+    def __init__(self, app, threshold: int = N_PLUS_ONE_THRESHOLD):
+        self.app = app
+        self.threshold = threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(method=scope["method"], path=scope["path"])
+        token = _current.set(stats)
+
+        async def send_with_stats(message):
+            if message["type"] == "http.response.start":
+                repeated = stats.repeated(self.threshold)
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-query-count", str(stats.count).encode()))
+                headers.append((b"x-db-time-ms", f"{stats.total_time * 1000:.3f}".encode()))
+                headers.append((b"x-db-repeated-statements", str(len(repeated)).encode()))
+                message = {**message, "headers": headers}
+                if repeated:
+                    logger.warning(
+                        "Possible N+1 in %s %s: %s",
+                        stats.method,
+                        stats.path,
+                        "; ".join(f"{n}x {statement[:120]}" for statement, n in repeated),
+                    )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            _current.reset(token)
+            if stats.count:
+                recent_requests.append(stats.to_dict())
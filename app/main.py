@@ -1,28 +1,52 @@
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
-
-from app import models  # noqa: F401 - ensure models are imported for metadata
-from app.database import Base, engine
-from app.routes import expenses, incomes, longterm, savings, templates
-
-if engine is None:
-    raise RuntimeError("DATABASE_URL is not configured; cannot start API without a database")
-
-Base.metadata.create_all(bind=engine)
-
-app = FastAPI(title="FinanceFlow", version="0.1.0")
-
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Routes
-app.include_router(incomes.router)
-app.include_router(expenses.router)
-app.include_router(savings.router)
-app.include_router(templates.router)
-app.include_router(longterm.router)
+import logging
+import time
+
+_import_started = time.perf_counter()
+
+from fastapi import FastAPI  # noqa: E402
+from fastapi.middleware.cors import CORSMiddleware  # noqa: E402
+from fastapi.middleware.gzip import GZipMiddleware  # noqa: E402
+
+from app import models  # noqa: E402,F401 - ensure models are imported for metadata
+from app.fast_json import FAST_JSON, JSON_GZIP_MIN_SIZE  # noqa: E402
+from app.instrumentation import SQL_INSTRUMENTATION, SQLInstrumentationMiddleware  # noqa: E402
+from app.routes import debug, expenses, health, imports, incomes, longterm, savings, templates  # noqa: E402
+from app.startup import lifespan  # noqa: E402
+
+logger = logging.getLogger("financeflow.startup")
+
+
+def create_app() -> FastAPI:
+    app = FastAPI(title="FinanceFlow", version="0.1.0", lifespan=lifespan)
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=["X-DB-Query-Count", "X-DB-Time-Ms", "X-DB-Repeated-Statements", "X-Next-Cursor"],
+    )
+
+    if SQL_INSTRUMENTATION:
+        app.add_middleware(SQLInstrumentationMiddleware)
+
+    if FAST_JSON and JSON_GZIP_MIN_SIZE:
+        app.add_middleware(GZipMiddleware, minimum_size=JSON_GZIP_MIN_SIZE, compresslevel=6)
+
+    # Routes
+    app.include_router(health.router)
+    app.include_router(incomes.router)
+    app.include_router(expenses.router)
+    app.include_router(savings.router)
+    app.include_router(templates.router)
+    app.include_router(longterm.router)
+    app.include_router(imports.router)
+    if SQL_INSTRUMENTATION:
+        app.include_router(debug.router)
+    return app
+
+
+app = create_app()
+
+logger.info("Application imported in %.1f ms", (time.perf_counter() - _import_started) * 1000)
@@ -1,24 +1,34 @@
 from datetime import datetime
 
 from sqlalchemy import (
+    BigInteger,
     Column,
     Boolean,
     Date,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
+    JSON,
     Numeric,
     String,
     Text,
     UniqueConstraint,
+    event,
 )
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import Session, relationship
 
 from app.database import Base
+from app.versions import bump_flushed_table_versions
 
 
 class Income(Base):
     __tablename__ = "incomes"
+    __table_args__ = (
+        # keyset pagination (created_at, id) and name prefix filters, see app.pagination
+        Index("ix_incomes_created_at_id", "created_at", "id"),
+        Index("ix_incomes_name_pattern", "name", postgresql_ops={"name": "text_pattern_ops"}),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False)
@@ -35,6 +45,12 @@ class Income(Base):
 
 class Expense(Base):
     __tablename__ = "expenses"
+    __table_args__ = (
+        # keyset pagination (created_at, id) and name prefix filters, see app.pagination
+        Index("ix_expenses_created_at_id", "created_at", "id"),
+        Index("ix_expenses_category_created_at_id", "category", "created_at", "id"),
+        Index("ix_expenses_name_pattern", "name", postgresql_ops={"name": "text_pattern_ops"}),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False)
@@ -59,6 +75,8 @@ class IncomeTemplate(Base):
     name = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
     created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
+    # per calendar month sum of the linked entries, see app.template_totals
+    month_totals = Column(JSON, nullable=True)
 
     incomes = relationship(
         "TemplateIncomeLink",
@@ -97,6 +115,8 @@ class ExpenseTemplate(Base):
     name = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
     created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
+    # per calendar month sum of the linked entries, see app.template_totals
+    month_totals = Column(JSON, nullable=True)
 
     expenses = relationship(
         "TemplateExpenseLink",
@@ -148,6 +168,11 @@ class LongtermPlan(Base):
     car_tax_monthly = Column(Numeric(12, 2), nullable=False, default=0)
     car_interest_rate = Column(Numeric(5, 2), nullable=False, default=0)
     savings_return_rate = Column(Numeric(5, 2), nullable=False, default=7)
+    # account the financing is paid from, NULL for the main account; one of the plan's
+    # accounts, kept without a foreign key as longterm_accounts references this table
+    financing_account_id = Column(Integer, nullable=True)
+    # incremented by every save of the plan's periods; a save naming an older version is rejected
+    version = Column(Integer, nullable=False, default=1, server_default="1")
     created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
 
     periods = relationship(
@@ -156,6 +181,114 @@ class LongtermPlan(Base):
         cascade="all, delete-orphan",
         passive_deletes=True,
     )
+    accounts = relationship(
+        "LongtermAccount",
+        back_populates="plan",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        order_by="LongtermAccount.id",
+    )
+    transfers = relationship(
+        "LongtermTransfer",
+        back_populates="plan",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        order_by="LongtermTransfer.id",
+    )
+    # plans can have thousands of events; projections read them with app.projection.load_event_rows
+    events = relationship(
+        "LongtermEvent",
+        back_populates="plan",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        lazy="noload",
+    )
+
+    # read by the plan list only, see app.plan_summary
+    summary = relationship(
+        "LongtermPlanSummary",
+        back_populates="plan",
+        uselist=False,
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
+
+    # not persisted: (month, kind, amount, account_id) of the plan's events sorted by
+    # month; filled in by app.projection.load_plans_for_projection
+    event_rows = None
+
+
+# projection figures of a plan for the overview list, recomputed in the background by app.plan_summary
+class LongtermPlanSummary(Base):
+    __tablename__ = "longterm_plan_summaries"
+
+    plan_id = Column(Integer, ForeignKey("longterm_plans.id", ondelete="CASCADE"), primary_key=True)
+    # app.cache.plan_fingerprint of the inputs the figures were computed from
+    fingerprint = Column(String(32), nullable=False)
+    # all NULL when the plan has nothing to project
+    first_month = Column(Date, nullable=True)
+    last_month = Column(Date, nullable=True)
+    end_balance = Column(Numeric(14, 2), nullable=True)
+    end_wealth = Column(Numeric(14, 2), nullable=True)
+    min_balance = Column(Numeric(14, 2), nullable=True)
+    min_balance_month = Column(Date, nullable=True)
+    updated_at = Column(DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    plan = relationship("LongtermPlan", back_populates="summary")
+
+
+# bank account of a plan in addition to its main and savings balances
+class LongtermAccount(Base):
+    __tablename__ = "longterm_accounts"
+
+    id = Column(Integer, primary_key=True, index=True)
+    plan_id = Column(Integer, ForeignKey("longterm_plans.id", ondelete="CASCADE"), nullable=False, index=True)
+    name = Column(String(255), nullable=False)
+    starting_balance = Column(Numeric(12, 2), nullable=False, default=0)
+    # yearly interest in percent, compounded monthly; NULL for none
+    return_rate = Column(Numeric(5, 2), nullable=True)
+    created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
+
+    plan = relationship("LongtermPlan", back_populates="accounts")
+
+
+# fixed amount moved between two accounts of a plan in every month of a range
+class LongtermTransfer(Base):
+    __tablename__ = "longterm_transfers"
+
+    id = Column(Integer, primary_key=True, index=True)
+    plan_id = Column(Integer, ForeignKey("longterm_plans.id", ondelete="CASCADE"), nullable=False, index=True)
+    # NULL is the plan's main account
+    from_account_id = Column(Integer, ForeignKey("longterm_accounts.id", ondelete="CASCADE"), nullable=True)
+    to_account_id = Column(Integer, ForeignKey("longterm_accounts.id", ondelete="CASCADE"), nullable=True)
+    amount = Column(Numeric(12, 2), nullable=False)
+    start_month = Column(Date, nullable=False)
+    end_month = Column(Date, nullable=False)
+    created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
+
+    plan = relationship("LongtermPlan", back_populates="transfers")
+
+
+# one-off income or expense in a single month
+class LongtermEvent(Base):
+    __tablename__ = "longterm_events"
+    __table_args__ = (
+        # projections read a plan's events as one range of this index
+        Index("ix_longterm_events_plan_id_month", "plan_id", "month"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    plan_id = Column(Integer, ForeignKey("longterm_plans.id", ondelete="CASCADE"), nullable=False)
+    name = Column(String(255), nullable=True)
+    month = Column(Date, nullable=False)
+    # "income" or "expense"; the amount itself is positive
+    kind = Column(String(16), nullable=False)
+    amount = Column(Numeric(12, 2), nullable=False)
+    # account the amount is booked on, NULL for the main account
+    account_id = Column(Integer, ForeignKey("longterm_accounts.id", ondelete="SET NULL"), nullable=True)
+    created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
+
+    plan = relationship("LongtermPlan", back_populates="events")
 
 
 class LongtermPeriod(Base):
@@ -167,6 +300,10 @@ class LongtermPeriod(Base):
     end_month = Column(Date, nullable=False)
     created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
 
+    # not persisted: month totals of entries reached through more than one of the
+    # period's templates, by kind; filled in by app.projection.load_plan_for_projection
+    shared_month_totals = None
+
     plan = relationship("LongtermPlan", back_populates="periods")
     income_templates = relationship(
         "LongtermPeriodIncomeTemplateLink",
@@ -202,6 +339,8 @@ class LongtermPeriodIncomeTemplateLink(Base):
         ForeignKey("income_templates.id"),
         nullable=False,
     )
+    # account the template's amounts are booked on, NULL for the default one
+    account_id = Column(Integer, ForeignKey("longterm_accounts.id", ondelete="SET NULL"), nullable=True)
     created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
 
     period = relationship("LongtermPeriod", back_populates="income_templates")
@@ -225,6 +364,8 @@ class LongtermPeriodExpenseTemplateLink(Base):
         ForeignKey("expense_templates.id"),
         nullable=False,
     )
+    # account the template's amounts are booked on, NULL for the default one
+    account_id = Column(Integer, ForeignKey("longterm_accounts.id", ondelete="SET NULL"), nullable=True)
     created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
 
     period = relationship("LongtermPeriod", back_populates="expense_templates")
@@ -233,6 +374,11 @@ class LongtermPeriodExpenseTemplateLink(Base):
 
 class Saving(Base):
     __tablename__ = "savings"
+    __table_args__ = (
+        # keyset pagination (created_at, id) and name prefix filters, see app.pagination
+        Index("ix_savings_created_at_id", "created_at", "id"),
+        Index("ix_savings_name_pattern", "name", postgresql_ops={"name": "text_pattern_ops"}),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False)
@@ -254,6 +400,8 @@ class SavingTemplate(Base):
     name = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
     created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
+    # per calendar month sum of the linked entries, see app.template_totals
+    month_totals = Column(JSON, nullable=True)
 
     savings = relationship(
         "TemplateSavingLink",
@@ -302,7 +450,24 @@ class LongtermPeriodSavingTemplateLink(Base):
         ForeignKey("saving_templates.id"),
         nullable=False,
     )
+    # account the template's amounts are booked on, NULL for the default one
+    account_id = Column(Integer, ForeignKey("longterm_accounts.id", ondelete="SET NULL"), nullable=True)
     created_at = Column(DateTime(timezone=True), default=datetime.utcnow)
 
     period = relationship("LongtermPeriod", back_populates="savings_templates")
     template = relationship("SavingTemplate")
+
+
+class TableVersion(Base):
+    __tablename__ = "table_versions"
+
+    table_name = Column(String(255), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), default=datetime.utcnow)
+
+
+# keep table_versions in step with every ORM write
+event.listen(Session, "after_flush", bump_flushed_table_versions)
+
+# registers the template month totals hook; imported late because it needs the models above
+import app.template_totals  # noqa: E402,F401
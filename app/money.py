@@ -0,0 +1,59 @@
+"""Money as integer cents.
+
+Amounts are stored as Numeric(12, 2). Inside the projection and financing
+code they are int64 cents, so sums over any number of month-cells are exact
+and NumPy aggregates them at integer speed. Decimal is converted to and from
+cents only at the ORM boundary (to_cents, from_cents); float euros are only
+produced for API and export output (to_euros).
+"""
+
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Iterable, Optional, Union
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+CENTS = 100
+
+Amount = Union[Decimal, int, float, str]
+
+
+def to_cents(value: Optional[Amount]) -> int:
+    """Whole cents of an amount, rounding half away from zero like Numeric(12, 2)."""
+    if value is None:
+        return 0
+    if isinstance(value, float):
+        # str() gives the shortest decimal that round-trips, i.e. what the user typed
+        value = str(value)
+    cents = Decimal(value).scaleb(2)
+    whole = int(cents)
+    if whole == cents:  # the common case, at most two decimal places
+        return whole
+    return int(cents.quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def from_cents(cents: int) -> Decimal:
+    return Decimal(int(cents)).scaleb(-2)
+
+
+def cents_array(values: Iterable[Optional[Amount]]) -> np.ndarray:
+    return np.fromiter((to_cents(value) for value in values), dtype=np.int64)
+
+
+def round_cents(values: ArrayLike) -> np.ndarray:
+    """Fractional cents (interest, annuity payments) rounded to int64 cents."""
+    return np.rint(np.asarray(values, dtype=np.float64)).astype(np.int64)
+
+
+def euros_to_cents(values: ArrayLike) -> np.ndarray:
+    """Float euro amounts from API input (sweep grids) as int64 cents."""
+    return round_cents(np.asarray(values, dtype=np.float64) * CENTS)
+
+
+def quantize_euros(values: ArrayLike) -> np.ndarray:
+    """Float euro amounts rounded to whole cents; nan and inf pass through."""
+    return np.rint(np.asarray(values, dtype=np.float64) * CENTS) / CENTS
+
+
+def to_euros(cents: ArrayLike) -> np.ndarray:
+    return np.asarray(cents, dtype=np.float64) / CENTS
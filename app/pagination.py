@@ -0,0 +1,89 @@
+"""Keyset pagination and shared filters for the entry lists.
+
+Entries are ordered newest first by ``(created_at, id)``. A cursor encodes the
+last row of the previous page, so every page is an index range scan no
+matter how deep it is.
+"""
+
+import base64
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException, Query, status
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query as OrmQuery
+
+MAX_PAGE_SIZE = 1000
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, row_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise ValueError("Invalid cursor.") from exc
+
+
+@dataclass
+class PageParams:
+    limit: Optional[int] = None
+    cursor: Optional[Tuple[datetime, int]] = None
+
+
+def page_params(
+    limit: Optional[int] = Query(default=None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(default=None),
+) -> PageParams:
+    try:
+        decoded = decode_cursor(cursor) if cursor else None
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc)) from exc
+    return PageParams(limit=limit, cursor=decoded)
+
+
+@dataclass
+class EntryFilters:
+    min_amount: Optional[Decimal] = None
+    max_amount: Optional[Decimal] = None
+    name_prefix: Optional[str] = None
+
+
+def entry_filters(
+    min_amount: Optional[Decimal] = Query(default=None, ge=0),
+    max_amount: Optional[Decimal] = Query(default=None, ge=0),
+    name_prefix: Optional[str] = Query(default=None, min_length=1, max_length=255),
+) -> EntryFilters:
+    return EntryFilters(min_amount=min_amount, max_amount=max_amount, name_prefix=name_prefix)
+
+
+def apply_entry_filters(query: OrmQuery, model, filters: EntryFilters) -> OrmQuery:
+    if filters.min_amount is not None:
+        query = query.filter(model.amount >= filters.min_amount)
+    if filters.max_amount is not None:
+        query = query.filter(model.amount <= filters.max_amount)
+    if filters.name_prefix:
+        query = query.filter(model.name.startswith(filters.name_prefix, autoescape=True))
+    return query
+
+
+def paginate(query: OrmQuery, model, page: PageParams) -> Tuple[List, Optional[str]]:
+    """Return one page of ``query`` and the cursor of the next page, if any."""
+    query = query.order_by(model.created_at.desc(), model.id.desc())
+    if page.cursor is not None:
+        query = query.filter(tuple_(model.created_at, model.id) < tuple_(*page.cursor))
+    if page.limit is None:
+        return query.all(), None
+
+    rows = query.limit(page.limit + 1).all()
+    if len(rows) <= page.limit:
+        return rows, None
+    last = rows[page.limit - 1]
+    return rows[: page.limit], encode_cursor(last.created_at, last.id)
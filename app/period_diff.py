@@ -0,0 +1,141 @@
+"""Minimal set of changes that turns a plan's stored periods into submitted ones.
+
+Submitted periods are matched to stored ones by id when the client sends
+one, then by identical month range; periods left over on both sides are
+paired in date order and updated in place. Only what is still unmatched
+is inserted or deleted, and template links are added or removed one by
+one, so saving a plan in which one checkbox changed writes a single row.
+"""
+
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app.models import (
+    LongtermPeriod,
+    LongtermPeriodExpenseTemplateLink,
+    LongtermPeriodIncomeTemplateLink,
+    LongtermPeriodSavingTemplateLink,
+    LongtermPlan,
+)
+
+# kind -> (relationship on LongtermPeriod, link model)
+PERIOD_LINKS = {
+    "income": ("income_templates", LongtermPeriodIncomeTemplateLink),
+    "expense": ("expense_templates", LongtermPeriodExpenseTemplateLink),
+    "saving": ("savings_templates", LongtermPeriodSavingTemplateLink),
+}
+
+
+@dataclass
+class PeriodSpec:
+    start_month: date
+    end_month: date
+    # kind -> template ids, in submitted order
+    template_ids: Dict[str, List[int]]
+    id: Optional[int] = None
+    # kind -> {template id: account id} for links not booked on the default account;
+    # links of kinds left out keep the accounts they have
+    accounts: Dict[str, Dict[int, int]] = field(default_factory=dict)
+
+
+@dataclass
+class PeriodChanges:
+    periods_inserted: int = 0
+    periods_updated: int = 0
+    periods_deleted: int = 0
+    links_inserted: int = 0
+    links_updated: int = 0
+    links_deleted: int = 0
+
+
+@dataclass
+class PeriodDiff:
+    matched: List[Tuple[LongtermPeriod, PeriodSpec]] = field(default_factory=list)
+    inserted: List[PeriodSpec] = field(default_factory=list)
+    deleted: List[LongtermPeriod] = field(default_factory=list)
+
+
+def _range(item) -> Tuple[date, date]:
+    return item.start_month, item.end_month
+
+
+def match_periods(existing: Sequence[LongtermPeriod], specs: Sequence[PeriodSpec]) -> PeriodDiff:
+    """Pair stored periods with submitted ones; raises ValueError for ids of other plans."""
+    by_id = {period.id: period for period in existing}
+    unknown = sorted(spec.id for spec in specs if spec.id is not None and spec.id not in by_id)
+    if unknown:
+        raise ValueError(f"Periods not found in this plan: {unknown}")
+
+    diff = PeriodDiff()
+    claimed = set()
+    pending = []
+    for spec in specs:
+        if spec.id is not None and spec.id not in claimed:
+            diff.matched.append((by_id[spec.id], spec))
+            claimed.add(spec.id)
+        else:
+            pending.append(spec)
+
+    free: Dict[Tuple[date, date], List[LongtermPeriod]] = {}
+    for period in sorted(existing, key=lambda p: (_range(p), p.id)):
+        if period.id not in claimed:
+            free.setdefault(_range(period), []).append(period)
+    unmatched = []
+    for spec in pending:
+        candidates = free.get(_range(spec))
+        if candidates:
+            diff.matched.append((candidates.pop(0), spec))
+        else:
+            unmatched.append(spec)
+
+    leftovers = sorted((p for group in free.values() for p in group), key=lambda p: (_range(p), p.id))
+    unmatched.sort(key=_range)
+    diff.matched.extend(zip(leftovers, unmatched))
+    diff.deleted = leftovers[len(unmatched):]
+    diff.inserted = unmatched[len(leftovers):]
+    return diff
+
+
+def _sync_links(period: LongtermPeriod, spec: PeriodSpec, templates: Dict[str, dict], changes: PeriodChanges) -> None:
+    for kind, (attr, link_model) in PERIOD_LINKS.items():
+        links = getattr(period, attr)
+        wanted = list(dict.fromkeys(spec.template_ids.get(kind, ())))
+        accounts = spec.accounts.get(kind)
+        current = {link.template_id for link in links}
+        for link in list(links):
+            if link.template_id not in wanted:
+                links.remove(link)
+                changes.links_deleted += 1
+            elif accounts is not None and link.account_id != accounts.get(link.template_id):
+                link.account_id = accounts.get(link.template_id)
+                changes.links_updated += 1
+        for template_id in wanted:
+            if template_id not in current:
+                links.append(
+                    link_model(
+                        template_id=template_id,
+                        template=templates[kind].get(template_id),
+                        account_id=(accounts or {}).get(template_id),
+                    )
+                )
+                changes.links_inserted += 1
+
+
+def apply_period_diff(plan: LongtermPlan, diff: PeriodDiff, templates: Dict[str, dict]) -> PeriodChanges:
+    """Apply ``diff`` to ``plan``'s loaded periods; ``templates`` maps kind -> {id: template}."""
+    changes = PeriodChanges()
+    for period in diff.deleted:
+        plan.periods.remove(period)
+        changes.periods_deleted += 1
+    for period, spec in diff.matched:
+        if _range(period) != _range(spec):
+            period.start_month, period.end_month = spec.start_month, spec.end_month
+            changes.periods_updated += 1
+        _sync_links(period, spec, templates, changes)
+    for spec in diff.inserted:
+        period = LongtermPeriod(start_month=spec.start_month, end_month=spec.end_month)
+        _sync_links(period, spec, templates, changes)
+        plan.periods.append(period)
+        changes.periods_inserted += 1
+    return changes
@@ -0,0 +1,234 @@
+"""Persisted projection summaries for the plan list.
+
+The overview shows every plan with its time range and end figures.
+Running all projections on each request would make the list as slow as
+comparing every plan, so each plan has a LongtermPlanSummary row instead
+and list_plans reads it with the same SELECT as the plans.
+
+Write paths report the tags they drop from the projection cache to
+``schedule_refresh`` (after their commit) or ``schedule_refresh_after_commit``
+(inside their transaction). One background thread collects them and
+recomputes the affected plans in batches. A summary records the
+fingerprint of the inputs it was computed from, so refreshing an
+unchanged plan writes nothing.
+"""
+
+import logging
+import threading
+from datetime import date
+from typing import Iterable, List, Optional, Set
+
+from sqlalchemy import delete, event, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app import database
+from app.cache import Tag, plan_fingerprint
+from app.comparison import compare_plans
+from app.models import LongtermPeriod, LongtermPlan, LongtermPlanSummary
+from app.money import from_cents
+from app.period_diff import PERIOD_LINKS
+from app.projection import load_plans_for_projection
+
+logger = logging.getLogger("financeflow.plan_summary")
+
+# plans loaded and projected per transaction
+REFRESH_BATCH = 256
+
+_SESSION_KEY = "plan_summary_tags"
+
+
+def _month_date(index: int) -> date:
+    year, month = divmod(int(index), 12)
+    return date(year, month + 1, 1)
+
+
+def affected_plan_ids(db: Session, tags: Iterable[Tag]) -> Set[int]:
+    """Plans whose projection depends on any of ``tags``."""
+    plan_ids = set()
+    templates = {}
+    for kind, object_id in tags:
+        if kind == "plan":
+            plan_ids.add(object_id)
+        elif kind.endswith("_template"):
+            templates.setdefault(kind[: -len("_template")], set()).add(object_id)
+    for kind, template_ids in templates.items():
+        link = PERIOD_LINKS[kind][1]
+        plan_ids.update(
+            db.scalars(
+                select(LongtermPeriod.plan_id)
+                .join(link, link.period_id == LongtermPeriod.id)
+                .where(link.template_id.in_(template_ids))
+                .distinct()
+            )
+        )
+    return plan_ids
+
+
+def plans_without_summary(db: Session) -> List[int]:
+    return list(
+        db.scalars(
+            select(LongtermPlan.id)
+            .outerjoin(LongtermPlanSummary, LongtermPlanSummary.plan_id == LongtermPlan.id)
+            .where(LongtermPlanSummary.plan_id.is_(None))
+        )
+    )
+
+
+def refresh_summaries(db: Session, plan_ids: Iterable[int], workers: Optional[int] = None) -> int:
+    """Recompute the summaries of ``plan_ids``; returns how many rows changed."""
+    plan_ids = sorted(set(plan_ids))
+    changed = 0
+    for start in range(0, len(plan_ids), REFRESH_BATCH):
+        batch = plan_ids[start : start + REFRESH_BATCH]
+        try:
+            changed += _refresh_batch(db, batch, workers)
+        except IntegrityError:
+            # another worker inserted some of the rows first; they are updated on the retry
+            db.rollback()
+            changed += _refresh_batch(db, batch, workers)
+    return changed
+
+
+def _refresh_batch(db: Session, batch: List[int], workers: Optional[int]) -> int:
+    changed = 0
+    plans = load_plans_for_projection(db, batch)
+    existing = {
+        summary.plan_id: summary
+        for summary in db.scalars(select(LongtermPlanSummary).where(LongtermPlanSummary.plan_id.in_(batch)))
+    }
+    fingerprints = {plan.id: plan_fingerprint(plan)[0] for plan in plans}
+    stale = [
+        plan
+        for plan in plans
+        if plan.id not in existing or existing[plan.id].fingerprint != fingerprints[plan.id]
+    ]
+    for comparison in compare_plans(stale, workers):
+        summary = existing.get(comparison.plan_id)
+        if summary is None:
+            summary = LongtermPlanSummary(plan_id=comparison.plan_id)
+            db.add(summary)
+        summary.fingerprint = fingerprints[comparison.plan_id]
+        projection = comparison.projection
+        if len(projection):
+            summary.first_month = _month_date(projection.months[0])
+            summary.last_month = _month_date(projection.months[-1])
+            summary.end_balance = from_cents(projection.balance[-1])
+            summary.end_wealth = from_cents(projection.total_wealth[-1])
+            summary.min_balance = from_cents(projection.balance.min())
+            summary.min_balance_month = _month_date(comparison.lowest_balance_month)
+        else:
+            summary.first_month = summary.last_month = None
+            summary.end_balance = summary.end_wealth = None
+            summary.min_balance = summary.min_balance_month = None
+        changed += 1
+
+    # plans deleted since they were scheduled
+    gone = set(batch) - set(fingerprints)
+    if gone:
+        db.execute(delete(LongtermPlanSummary).where(LongtermPlanSummary.plan_id.in_(gone)))
+    db.commit()
+    return changed
+
+
+def backfill_summaries(workers: Optional[int] = None) -> int:
+    """Summarize every plan that has no summary yet, in the calling thread."""
+    with database.SessionLocal() as db:
+        return refresh_summaries(db, plans_without_summary(db), workers)
+
+
+class SummaryRefresher:
+    """Background thread that refreshes the summaries of changed plans.
+
+    Tags scheduled while a refresh runs are handled together in the next
+    one, so a burst of writes costs one batch per plan.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._tags: Set[Tag] = set()
+        self._missing = False
+        self._busy = False
+        self._thread: Optional[threading.Thread] = None
+        self.refreshed = 0
+        self.failures = 0
+
+    def schedule(self, tags: Iterable[Tag]) -> None:
+        with self._condition:
+            self._tags.update(tags)
+            self._start()
+
+    def schedule_missing(self) -> None:
+        """Refresh every plan that has no summary yet, e.g. after a migration or an import."""
+        with self._condition:
+            self._missing = True
+            self._start()
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Block until nothing is scheduled or running; False on timeout."""
+        with self._condition:
+            return self._condition.wait_for(lambda: not (self._tags or self._missing or self._busy), timeout)
+
+    def _start(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="plan-summaries", daemon=True)
+            self._thread.start()
+        self._condition.notify_all()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._tags or self._missing)
+                tags, self._tags = self._tags, set()
+                missing, self._missing = self._missing, False
+                self._busy = True
+            try:
+                self._refresh(tags, missing)
+            except Exception:
+                self.failures += 1
+                logger.exception("Refreshing plan summaries failed")
+            finally:
+                with self._condition:
+                    self._busy = False
+                    self._condition.notify_all()
+
+    def _refresh(self, tags: Set[Tag], missing: bool) -> None:
+        if database.SessionLocal is None:
+            return
+        with database.SessionLocal() as db:
+            plan_ids = affected_plan_ids(db, tags)
+            if missing:
+                plan_ids.update(plans_without_summary(db))
+            self.refreshed += refresh_summaries(db, plan_ids)
+
+
+summary_refresher = SummaryRefresher()
+
+
+def schedule_refresh(*tags: Tag) -> None:
+    summary_refresher.schedule(tags)
+
+
+def schedule_refresh_after_commit(db: Session, *tags: Tag) -> None:
+    """Like schedule_refresh, but only once ``db`` commits what it changed.
+
+    Template tags are resolved to plans right away, while the links of a
+    template that is about to be deleted still exist.
+    """
+    plan_ids = affected_plan_ids(db, tags)
+    if plan_ids:
+        db.info.setdefault(_SESSION_KEY, set()).update(("plan", plan_id) for plan_id in plan_ids)
+
+
+def _schedule_committed(session: Session) -> None:
+    tags = session.info.pop(_SESSION_KEY, None)
+    if tags:
+        summary_refresher.schedule(tags)
+
+
+def _discard_rolled_back(session: Session) -> None:
+    session.info.pop(_SESSION_KEY, None)
+
+
+event.listen(Session, "after_commit", _schedule_committed)
+event.listen(Session, "after_rollback", _discard_rolled_back)
@@ -0,0 +1,22 @@
+import atexit
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+_pool: Optional[ProcessPoolExecutor] = None
+_lock = threading.Lock()
+
+
+def pool_size() -> int:
+    return int(os.getenv("PROCESS_POOL_WORKERS", "0")) or os.cpu_count() or 1
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Shared process pool for CPU-bound work, created on first use."""
+    global _pool
+    with _lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=pool_size())
+            atexit.register(_pool.shutdown, wait=False, cancel_futures=True)
+        return _pool
@@ -0,0 +1,668 @@
+"""Month-by-month projection of a long-term plan.
+
+The plan detail page renders this projection (GET /projection) instead of
+computing its own in the browser. All series are built as month-indexed
+NumPy arrays in a single pass over the plan's periods instead of walking
+every template entry for every projected month. Amounts are int64 cents (see
+app.money); only balances that earn interest are compounded in floating
+point and rounded back to cents.
+
+Balances are kept per account as one accounts x months matrix: row 0 is
+the plan's main balance, row 1 its invested savings, further rows the
+plan's LongtermAccounts. Incomes, expenses and the financing are booked on
+the main account and savings contributions move money from it to the
+savings account unless a link or the plan names another account; such
+bookings, like the plan's transfer rules, are TransferInputs between rows.
+
+One-off events are read for the plan's projection_window only, arrive
+sorted by month and are merged into the monthly arrays with a sorted
+scatter-add (add_sorted), so their number hardly matters.
+"""
+
+from dataclasses import dataclass, field
+from datetime import date
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from numpy.typing import ArrayLike
+from sqlalchemy import and_, or_, select
+from sqlalchemy.orm import Session, selectinload
+
+from app.cache import plan_fingerprint, projection_cache
+from app.models import (
+    LongtermPeriod,
+    LongtermPeriodExpenseTemplateLink,
+    LongtermPeriodIncomeTemplateLink,
+    LongtermPeriodSavingTemplateLink,
+    LongtermEvent,
+    LongtermPlan,
+    LongtermTransfer,
+)
+from app.money import cents_array, round_cents, to_cents, to_euros
+from app.template_totals import parse_totals, shared_month_totals
+
+
+def month_index(value: date) -> int:
+    return value.year * 12 + value.month - 1
+
+
+def month_label(index: int) -> str:
+    year, month = divmod(int(index), 12)
+    return f"{year:04d}-{month + 1:02d}"
+
+
+def month_date(index: int) -> date:
+    year, month = divmod(int(index), 12)
+    return date(year, month + 1, 1)
+
+
+MAIN_ACCOUNT = 0
+SAVINGS_ACCOUNT = 1
+# rows of the plan's LongtermAccounts start here
+FIRST_ACCOUNT = 2
+
+
+# all amounts below are in cents
+@dataclass(frozen=True)
+class PeriodInput:
+    start: int
+    end: int
+    income: int = 0
+    savings: int = 0
+    # expense total per month of year, January first
+    expense_by_month: Tuple[int, ...] = (0,) * 12
+
+
+@dataclass(frozen=True)
+class FinancingInput:
+    start: Optional[int] = None
+    term_months: int = 0
+    monthly_rate: int = 0
+    running_costs: int = 0
+    down_payment: int = 0
+    final_payment: int = 0
+    account: int = MAIN_ACCOUNT
+
+    @property
+    def active(self) -> bool:
+        return self.start is not None and self.term_months > 0
+
+
+@dataclass(frozen=True)
+class AccountInput:
+    id: int
+    starting_balance: int = 0
+    return_rate: float = 0.0
+
+
+@dataclass(frozen=True)
+class TransferInput:
+    """Amount moved from account row ``source`` to row ``target`` in every month of a range."""
+
+    start: int
+    end: int
+    source: int
+    target: int
+    # amount per month of year, January first
+    amount_by_month: Tuple[int, ...] = (0,) * 12
+
+
+@dataclass(frozen=True)
+class EventsInput:
+    """One-off amounts as columns, sorted by month."""
+
+    months: Tuple[int, ...] = ()
+    # incomes positive, expenses negative
+    amounts: Tuple[int, ...] = ()
+    # account rows the amounts are booked on
+    accounts: Tuple[int, ...] = ()
+
+    def __len__(self) -> int:
+        return len(self.months)
+
+    @property
+    def off_main(self) -> bool:
+        return any(row != MAIN_ACCOUNT for row in self.accounts)
+
+
+@dataclass(frozen=True)
+class ProjectionInput:
+    starting_balance: int = 0
+    starting_saving_balance: int = 0
+    savings_return_rate: float = 0.0
+    periods: Tuple[PeriodInput, ...] = ()
+    financing: FinancingInput = field(default_factory=FinancingInput)
+    accounts: Tuple[AccountInput, ...] = ()
+    transfers: Tuple[TransferInput, ...] = ()
+    events: EventsInput = field(default_factory=EventsInput)
+
+    @property
+    def account_count(self) -> int:
+        return FIRST_ACCOUNT + len(self.accounts)
+
+
+@dataclass
+class Projection:
+    """Month indexes and int64 cent series of one plan."""
+
+    months: np.ndarray
+    income: np.ndarray
+    expense: np.ndarray
+    savings: np.ndarray
+    net: np.ndarray
+    balance: np.ndarray
+    saving_total: np.ndarray
+    invested_balance: np.ndarray
+    total_wealth: np.ndarray
+    # ids and balances (accounts x months) of the plan's LongtermAccounts
+    account_ids: np.ndarray
+    account_balances: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.months.size)
+
+    def to_dict(self) -> Dict[str, list]:
+        return {
+            "months": [month_label(m) for m in self.months],
+            "income": to_euros(self.income).tolist(),
+            "expense": to_euros(self.expense).tolist(),
+            "savings": to_euros(self.savings).tolist(),
+            "net": to_euros(self.net).tolist(),
+            "balance": to_euros(self.balance).tolist(),
+            "saving_total": to_euros(self.saving_total).tolist(),
+            "invested_balance": to_euros(self.invested_balance).tolist(),
+            "total_wealth": to_euros(self.total_wealth).tolist(),
+            "accounts": [
+                {"id": int(account_id), "balance": to_euros(balance).tolist()}
+                for account_id, balance in zip(self.account_ids, self.account_balances)
+            ],
+        }
+
+
+def _account_ids(data: ProjectionInput) -> np.ndarray:
+    return np.fromiter((account.id for account in data.accounts), dtype=np.int64, count=len(data.accounts))
+
+
+def _empty_projection(data: ProjectionInput) -> Projection:
+    empty = np.zeros(0, dtype=np.int64)
+    return Projection(
+        months=np.zeros(0, dtype=np.int64),
+        income=empty,
+        expense=empty,
+        savings=empty,
+        net=empty,
+        balance=empty,
+        saving_total=empty,
+        invested_balance=empty,
+        total_wealth=empty,
+        account_ids=_account_ids(data),
+        account_balances=np.zeros((len(data.accounts), 0), dtype=np.int64),
+    )
+
+
+def compound_monthly(start: ArrayLike, contributions: np.ndarray, annual_rate_percent: ArrayLike) -> np.ndarray:
+    """Vectorised form of ``invested = (invested + contribution) * (1 + r)``, unrounded.
+
+    Also takes one row of contributions per account with matching arrays of
+    starts and rates.
+    """
+    if np.ndim(annual_rate_percent):
+        growth = 1 + np.maximum(np.asarray(annual_rate_percent, dtype=np.float64), 0)[:, None] / 100 / 12
+        start = np.asarray(start, dtype=np.float64)[:, None]
+    else:
+        growth = 1 + max(0.0, annual_rate_percent) / 100 / 12
+    steps = np.arange(1, contributions.shape[-1] + 1, dtype=np.float64)
+    # invested_t = g^t * (start + sum_{k<=t} c_k * g^(1-k))
+    return growth ** steps * (start + np.cumsum(contributions * growth ** (1 - steps), axis=-1))
+
+
+def account_balances(starts: Sequence[int], flows: np.ndarray, rates: Sequence[float]) -> np.ndarray:
+    """Balances of all accounts (rows of ``flows``); accounts without interest stay exact."""
+    balances = np.cumsum(flows, axis=1)
+    balances += np.asarray(starts, dtype=np.int64)[:, None]
+    growing = [row for row, rate in enumerate(rates) if rate > 0]
+    if len(growing) == 1:
+        # usually only the savings account earns interest; spares the fancy indexing
+        row = growing[0]
+        balances[row] = round_cents(compound_monthly(starts[row], flows[row], rates[row]))
+    elif growing:
+        balances[growing] = round_cents(
+            compound_monthly([starts[row] for row in growing], flows[growing], [rates[row] for row in growing])
+        )
+    return balances
+
+
+def month_span(data: ProjectionInput, term_months: Optional[int] = None) -> Tuple[int, int]:
+    """First month index and number of months touched by the periods, transfers, events and the financing."""
+    financing = data.financing
+    term = financing.term_months if term_months is None else term_months
+    starts = [p.start for p in data.periods] + [t.start for t in data.transfers]
+    ends = [p.end for p in data.periods] + [t.end for t in data.transfers]
+    if data.events:
+        starts.append(data.events.months[0])
+        ends.append(data.events.months[-1])
+    if financing.start is not None and term > 0:
+        starts.append(financing.start)
+        ends.append(financing.start + term - 1)
+    if not starts:
+        return 0, 0
+    return min(starts), max(ends) - min(starts) + 1
+
+
+def period_series(
+    periods: Tuple[PeriodInput, ...], first: int, size: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Income, expense and savings per month plus a mask of months covered by a period."""
+    month_of_year = np.arange(first, first + size, dtype=np.int64) % 12
+
+    income = np.zeros(size + 1, dtype=np.int64)
+    savings = np.zeros(size + 1, dtype=np.int64)
+    coverage = np.zeros(size + 1, dtype=np.int64)
+    expense_by_month = np.zeros((size + 1, 12), dtype=np.int64)
+
+    if periods:
+        period_starts = np.fromiter((p.start - first for p in periods), dtype=np.int64)
+        period_stops = np.fromiter((p.end - first + 1 for p in periods), dtype=np.int64)
+        period_income = np.fromiter((p.income for p in periods), dtype=np.int64)
+        period_savings = np.fromiter((p.savings for p in periods), dtype=np.int64)
+        period_expenses = np.array([p.expense_by_month for p in periods], dtype=np.int64)
+
+        # difference arrays: +value where a period starts, -value after it ends
+        np.add.at(income, period_starts, period_income)
+        np.add.at(income, period_stops, -period_income)
+        np.add.at(savings, period_starts, period_savings)
+        np.add.at(savings, period_stops, -period_savings)
+        np.add.at(coverage, period_starts, 1)
+        np.add.at(coverage, period_stops, -1)
+        np.add.at(expense_by_month, period_starts, period_expenses)
+        np.add.at(expense_by_month, period_stops, -period_expenses)
+
+    income = np.cumsum(income[:size])
+    savings = np.cumsum(savings[:size])
+    covered = np.cumsum(coverage[:size]) > 0
+    expense = np.cumsum(expense_by_month[:size], axis=0)[np.arange(size), month_of_year]
+    return income, expense, savings, covered
+
+
+def transfer_series(
+    transfers: Tuple[TransferInput, ...], accounts: int, first: int, size: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Net amount moved into each account per month (accounts x months) plus a mask of months with transfers."""
+    month_of_year = np.arange(first, first + size, dtype=np.int64) % 12
+    moved = np.zeros((accounts, size + 1, 12), dtype=np.int64)
+    coverage = np.zeros(size + 1, dtype=np.int64)
+    starts = np.fromiter((t.start - first for t in transfers), dtype=np.int64)
+    stops = np.fromiter((t.end - first + 1 for t in transfers), dtype=np.int64)
+    sources = np.fromiter((t.source for t in transfers), dtype=np.int64)
+    targets = np.fromiter((t.target for t in transfers), dtype=np.int64)
+    amounts = np.array([t.amount_by_month for t in transfers], dtype=np.int64).reshape(-1, 12)
+
+    # the difference arrays of period_series with one row per account
+    np.add.at(moved, (sources, starts), -amounts)
+    np.add.at(moved, (sources, stops), amounts)
+    np.add.at(moved, (targets, starts), amounts)
+    np.add.at(moved, (targets, stops), -amounts)
+    np.add.at(coverage, starts, 1)
+    np.add.at(coverage, stops, -1)
+
+    moved = np.cumsum(moved[:, :size], axis=1)[:, np.arange(size), month_of_year]
+    return moved, np.cumsum(coverage[:size]) > 0
+
+
+def add_sorted(series: np.ndarray, index: np.ndarray, values: np.ndarray) -> None:
+    """``series[index] += values`` for ascending ``index``, summing runs of equal indexes first."""
+    if not index.size:
+        return
+    runs = np.flatnonzero(np.concatenate(([True], index[1:] != index[:-1])))
+    series[index[runs]] += np.add.reduceat(values, runs)
+
+
+def apply_events(
+    events: EventsInput,
+    first: int,
+    income: np.ndarray,
+    expense: np.ndarray,
+    covered: np.ndarray,
+    flows: Optional[np.ndarray],
+) -> None:
+    """Add ``events`` to the monthly series in place; ``flows`` is needed when any is booked off the main account."""
+    if not events:
+        return
+    index = np.fromiter(events.months, dtype=np.int64, count=len(events)) - first
+    amounts = np.fromiter(events.amounts, dtype=np.int64, count=len(events))
+    incoming = amounts > 0
+    add_sorted(income, index[incoming], amounts[incoming])
+    add_sorted(expense, index[~incoming], -amounts[~incoming])
+    covered[index] = True
+
+    rows = np.fromiter(events.accounts, dtype=np.int64, count=len(events))
+    booked = rows != MAIN_ACCOUNT
+    if booked.any():
+        # move them from the main account to theirs; selecting by row keeps the months sorted
+        index, rows, amounts = index[booked], rows[booked], amounts[booked]
+        add_sorted(flows[MAIN_ACCOUNT], index, -amounts)
+        for row in np.unique(rows):
+            mine = rows == row
+            add_sorted(flows[row], index[mine], amounts[mine])
+
+
+def compute_projection(data: ProjectionInput) -> Projection:
+    financing = data.financing
+    first, size = month_span(data)
+    if not size:
+        return _empty_projection(data)
+
+    month_numbers = np.arange(first, first + size, dtype=np.int64)
+    income, expense, savings, covered = period_series(data.periods, first, size)
+    if data.transfers or financing.account != MAIN_ACCOUNT or data.events.off_main:
+        flows, transferred = transfer_series(data.transfers, data.account_count, first, size)
+        covered |= transferred
+    else:
+        flows = None
+    apply_events(data.events, first, income, expense, covered, flows)
+
+    if financing.active:
+        offset = financing.start - first
+        term = slice(offset, offset + financing.term_months)
+        expense[term] += financing.monthly_rate + financing.running_costs
+        expense[offset] += financing.down_payment
+        expense[offset + financing.term_months - 1] += financing.final_payment
+        covered[term] = True
+        if financing.account != MAIN_ACCOUNT:
+            paid = np.zeros(size, dtype=np.int64)
+            paid[term] = financing.monthly_rate + financing.running_costs
+            paid[offset] += financing.down_payment
+            paid[offset + financing.term_months - 1] += financing.final_payment
+            flows[MAIN_ACCOUNT] += paid
+            flows[financing.account] -= paid
+
+    # months not touched by any period, transfer or the financing are skipped entirely
+    months = month_numbers[covered]
+    income = income[covered]
+    expense = expense[covered]
+    savings = savings[covered]
+    if flows is None:
+        flows = np.zeros((data.account_count, months.size), dtype=np.int64)
+    else:
+        flows = flows[:, covered]
+
+    net = income - expense - savings
+    flows[MAIN_ACCOUNT] += net
+    flows[SAVINGS_ACCOUNT] += savings
+    balances = account_balances(
+        [data.starting_balance, data.starting_saving_balance, *(a.starting_balance for a in data.accounts)],
+        flows,
+        [0.0, data.savings_return_rate, *(a.return_rate for a in data.accounts)],
+    )
+
+    return Projection(
+        months=months,
+        income=income,
+        expense=expense,
+        savings=savings,
+        net=net,
+        balance=balances[MAIN_ACCOUNT],
+        saving_total=data.starting_saving_balance + np.cumsum(flows[SAVINGS_ACCOUNT]),
+        invested_balance=balances[SAVINGS_ACCOUNT],
+        total_wealth=balances.sum(axis=0),
+        account_ids=_account_ids(data),
+        account_balances=balances[FIRST_ACCOUNT:],
+    )
+
+
+@lru_cache(maxsize=4096)
+def _totals_cents(month_totals: Tuple[str, ...]) -> np.ndarray:
+    # templates are shared by many periods and plans, so their vectors are parsed once
+    cents = cents_array(parse_totals(month_totals))
+    cents.flags.writeable = False
+    return cents
+
+
+def _period_totals(period: LongtermPeriod, links_attr: str, kind: str) -> np.ndarray:
+    totals = np.zeros(12, dtype=np.int64)
+    for link in getattr(period, links_attr) or []:
+        if link.template is not None:
+            totals += _totals_cents(tuple(link.template.month_totals or ()))
+    shared = (period.shared_month_totals or {}).get(kind)
+    if shared:
+        totals -= cents_array(shared)
+    return totals
+
+
+def period_input(period: LongtermPeriod) -> PeriodInput:
+    # incomes and savings recur every month, so all twelve slots hold the same total
+    return PeriodInput(
+        start=month_index(period.start_month),
+        end=month_index(period.end_month),
+        income=int(_period_totals(period, "income_templates", "income")[0]),
+        savings=int(_period_totals(period, "savings_templates", "saving")[0]),
+        expense_by_month=tuple(_period_totals(period, "expense_templates", "expense").tolist()),
+    )
+
+
+def account_rows(plan: LongtermPlan) -> Dict[int, int]:
+    """Row of each of the plan's LongtermAccounts in the balance matrix, by account id."""
+    return {account.id: FIRST_ACCOUNT + row for row, account in enumerate(plan.accounts or [])}
+
+
+# kind -> (links attribute, account row the kind is booked on unless a link names another)
+DEFAULT_BOOKINGS = {
+    "income": ("income_templates", MAIN_ACCOUNT),
+    "expense": ("expense_templates", MAIN_ACCOUNT),
+    "saving": ("savings_templates", SAVINGS_ACCOUNT),
+}
+
+
+def period_transfers(period: LongtermPeriod, rows: Dict[int, int]) -> List[TransferInput]:
+    """Moves of the amounts of templates linked to another account than their kind's default."""
+    transfers = []
+    start, end = month_index(period.start_month), month_index(period.end_month)
+    for kind, (links_attr, default) in DEFAULT_BOOKINGS.items():
+        for link in getattr(period, links_attr) or []:
+            row = rows.get(link.account_id)
+            if row is None or link.template is None:
+                continue
+            amounts = tuple(_totals_cents(tuple(link.template.month_totals or ())).tolist())
+            # expenses leave the account they are booked on, incomes and savings arrive there
+            source, target = (row, default) if kind == "expense" else (default, row)
+            transfers.append(TransferInput(start, end, source, target, amounts))
+    return transfers
+
+
+def transfer_input(transfer: LongtermTransfer, rows: Dict[int, int]) -> TransferInput:
+    return TransferInput(
+        start=month_index(transfer.start_month),
+        end=month_index(transfer.end_month),
+        source=rows.get(transfer.from_account_id, MAIN_ACCOUNT),
+        target=rows.get(transfer.to_account_id, MAIN_ACCOUNT),
+        amount_by_month=(to_cents(transfer.amount),) * 12,
+    )
+
+
+def events_input(plan: LongtermPlan, rows: Dict[int, int]) -> EventsInput:
+    event_rows = plan.event_rows or ()
+    return EventsInput(
+        months=tuple(month_index(month) for month, _, _, _ in event_rows),
+        amounts=tuple(
+            to_cents(amount) if kind == "income" else -to_cents(amount) for _, kind, amount, _ in event_rows
+        ),
+        accounts=tuple(rows.get(account_id, MAIN_ACCOUNT) for _, _, _, account_id in event_rows),
+    )
+
+
+def financing_input(plan: LongtermPlan, rows: Optional[Dict[int, int]] = None) -> FinancingInput:
+    return FinancingInput(
+        start=month_index(plan.financing_start_month) if plan.financing_start_month else None,
+        term_months=plan.car_term_months or 0,
+        monthly_rate=to_cents(plan.car_monthly_rate),
+        running_costs=(
+            to_cents(plan.car_insurance_monthly)
+            + to_cents(plan.car_fuel_monthly)
+            + to_cents(plan.car_maintenance_monthly)
+            + to_cents(plan.car_tax_monthly)
+        ),
+        down_payment=to_cents(plan.car_down_payment),
+        final_payment=to_cents(plan.car_final_payment),
+        account=(rows or {}).get(plan.financing_account_id, MAIN_ACCOUNT),
+    )
+
+
+def projection_input(plan: LongtermPlan) -> ProjectionInput:
+    periods = sorted(plan.periods or [], key=lambda p: (p.start_month, p.id))
+    rows = account_rows(plan)
+    transfers = [transfer_input(t, rows) for t in plan.transfers or []]
+    for period in periods:
+        transfers.extend(period_transfers(period, rows))
+    return ProjectionInput(
+        starting_balance=to_cents(plan.starting_balance),
+        starting_saving_balance=to_cents(plan.starting_saving_balance),
+        savings_return_rate=float(plan.savings_return_rate or 0),
+        periods=tuple(period_input(p) for p in periods),
+        financing=financing_input(plan, rows),
+        accounts=tuple(
+            AccountInput(
+                id=account.id,
+                starting_balance=to_cents(account.starting_balance),
+                return_rate=float(account.return_rate or 0),
+            )
+            for account in plan.accounts or []
+        ),
+        transfers=tuple(transfers),
+        events=events_input(plan, rows),
+    )
+
+
+PERIOD_TEMPLATE_LINKS = (
+    ("income_templates", "income"),
+    ("expense_templates", "expense"),
+    ("savings_templates", "saving"),
+)
+
+
+# plans whose event windows are combined into one query
+EVENT_WINDOWS_PER_QUERY = 500
+
+
+def projection_window(plan: LongtermPlan, term_months: Optional[int] = None) -> Optional[Tuple[date, date]]:
+    """First and last month of the plan's periods, transfers and financing, or None.
+
+    Events are only projected within this window. ``term_months`` replaces
+    the financing term, e.g. with the longest term of a sweep.
+    """
+    starts = [month_index(p.start_month) for p in plan.periods or []]
+    starts += [month_index(t.start_month) for t in plan.transfers or []]
+    ends = [month_index(p.end_month) for p in plan.periods or []]
+    ends += [month_index(t.end_month) for t in plan.transfers or []]
+    term = (plan.car_term_months or 0) if term_months is None else term_months
+    if plan.financing_start_month is not None and term > 0:
+        starts.append(month_index(plan.financing_start_month))
+        ends.append(starts[-1] + term - 1)
+    if not starts:
+        return None
+    return month_date(min(starts)), month_date(max(ends))
+
+
+def load_event_rows(db: Session, windows: Dict[int, Tuple[date, date]]) -> Dict[int, List[tuple]]:
+    """(month, kind, amount, account_id) of the events in each plan's window, by plan, sorted by month.
+
+    ``windows`` maps plan ids to their first and last month. Each window is
+    one range of ix_longterm_events_plan_id_month; up to
+    EVENT_WINDOWS_PER_QUERY of them are read with one query.
+    """
+    events: Dict[int, List[tuple]] = {}
+    items = sorted(windows.items())
+    for offset in range(0, len(items), EVENT_WINDOWS_PER_QUERY):
+        ranges = [
+            and_(LongtermEvent.plan_id == plan_id, LongtermEvent.month.between(start, end))
+            for plan_id, (start, end) in items[offset : offset + EVENT_WINDOWS_PER_QUERY]
+        ]
+        query = (
+            select(
+                LongtermEvent.plan_id,
+                LongtermEvent.month,
+                LongtermEvent.kind,
+                LongtermEvent.amount,
+                LongtermEvent.account_id,
+            )
+            .where(or_(*ranges))
+            .order_by(LongtermEvent.plan_id, LongtermEvent.month, LongtermEvent.id)
+        )
+        for plan_id, *row in db.connection().execute(query):
+            events.setdefault(plan_id, []).append(tuple(row))
+    return events
+
+
+def load_plans_for_projection(
+    db: Session,
+    plan_ids: Optional[Sequence[int]] = None,
+    term_months: Optional[int] = None,
+) -> List[LongtermPlan]:
+    """Load plans (all if ``plan_ids`` is None) with everything projections need.
+
+    That is their accounts, transfers, periods, the events within their
+    projection_window (``term_months`` as there) and the month totals of the
+    linked templates; the number of queries does not depend on how many plans
+    are loaded.
+    """
+    query = db.query(LongtermPlan).options(
+        selectinload(LongtermPlan.accounts),
+        selectinload(LongtermPlan.transfers),
+        selectinload(LongtermPlan.periods)
+        .selectinload(LongtermPeriod.income_templates)
+        .selectinload(LongtermPeriodIncomeTemplateLink.template),
+        selectinload(LongtermPlan.periods)
+        .selectinload(LongtermPeriod.expense_templates)
+        .selectinload(LongtermPeriodExpenseTemplateLink.template),
+        selectinload(LongtermPlan.periods)
+        .selectinload(LongtermPeriod.savings_templates)
+        .selectinload(LongtermPeriodSavingTemplateLink.template),
+    )
+    if plan_ids is not None:
+        query = query.filter(LongtermPlan.id.in_(plan_ids))
+    plans = query.order_by(LongtermPlan.id).all()
+
+    windows = {plan.id: window for plan in plans if (window := projection_window(plan, term_months)) is not None}
+    events = load_event_rows(db, windows)
+    for plan in plans:
+        plan.event_rows = events.get(plan.id, [])
+
+    periods = {period.id: period for plan in plans for period in plan.periods}
+    for period in periods.values():
+        period.shared_month_totals = {}
+    # entries can only be counted twice where a period links several templates of a kind
+    for links_attr, kind in PERIOD_TEMPLATE_LINKS:
+        period_ids = [period.id for period in periods.values() if len(getattr(period, links_attr)) > 1]
+        for period_id, totals in shared_month_totals(db, kind, period_ids).items():
+            periods[period_id].shared_month_totals[kind] = totals
+    return plans
+
+
+def load_plan_for_projection(
+    db: Session, plan_id: int, term_months: Optional[int] = None
+) -> Optional[LongtermPlan]:
+    plans = load_plans_for_projection(db, [plan_id], term_months)
+    return plans[0] if plans else None
+
+
+def freeze(projection: Projection) -> Projection:
+    # cached results are shared between requests
+    for value in vars(projection).values():
+        value.flags.writeable = False
+    return projection
+
+
+def _compute_frozen(plan: LongtermPlan) -> Projection:
+    return freeze(compute_projection(projection_input(plan)))
+
+
+def projection_for_plan(plan: LongtermPlan) -> Projection:
+    key, tags = plan_fingerprint(plan)
+    return projection_cache.get_or_compute(key, tags, lambda: _compute_frozen(plan))
+
+
+def project_plan(db: Session, plan_id: int) -> Optional[Projection]:
+    plan = load_plan_for_projection(db, plan_id)
+    if plan is None:
+        return None
+    return projection_for_plan(plan)
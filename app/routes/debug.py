@@ -0,0 +1,18 @@
+from typing import List
+
+from fastapi import APIRouter
+
+from app.instrumentation import N_PLUS_ONE_THRESHOLD, recent_requests
+
+router = APIRouter(prefix="/api/debug", tags=["debug"])
+
+
+@router.get("/sql")
+async def list_sql_stats(limit: int = 20, repeated_only: bool = False) -> dict:
+    requests: List[dict] = list(recent_requests)
+    if repeated_only:
+        requests = [r for r in requests if r["repeated"]]
+    return {
+        "n_plus_one_threshold": N_PLUS_ONE_THRESHOLD,
+        "requests": requests[-limit:][::-1],
+    }
@@ -1,13 +1,26 @@
 from datetime import datetime
 from decimal import Decimal
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from pydantic import BaseModel, ConfigDict, Field, model_validator
 from sqlalchemy.orm import Session
 
-from app.database import get_db
-from app.models import Expense
+from app.bulk import (
+    BulkCreatePayload,
+    BulkDeletePayload,
+    BulkDeleteRead,
+    BulkItemError,
+    bulk_delete,
+    bulk_insert,
+    validate_items,
+)
+from app.database import DbSession, get_db
+from app.fast_json import FastJSONRoute
+from app.http_cache import etag_matches, not_modified, set_etag
+from app.models import Expense, TemplateExpenseLink
+from app.pagination import EntryFilters, PageParams, apply_entry_filters, entry_filters, page_params, paginate
+from app.versions import table_etag
 
 
 class ExpenseCreate(BaseModel):
@@ -41,16 +54,24 @@ class ExpenseRead(BaseModel):
     created_at: datetime
 
 
-router = APIRouter(prefix="/api/expenses", tags=["expenses"])
+class ExpenseBulkCreateRead(BaseModel):
+    created: List[ExpenseRead]
+    errors: List[BulkItemError]
 
 
-@router.get("", response_model=List[ExpenseRead])
-def list_expenses(db: Session = Depends(get_db)) -> List[Expense]:
-    return db.query(Expense).order_by(Expense.created_at.desc()).all()
+router = APIRouter(prefix="/api/expenses", tags=["expenses"], route_class=FastJSONRoute)
 
 
-@router.post("", response_model=ExpenseRead, status_code=status.HTTP_201_CREATED)
-def create_expense(payload: ExpenseCreate, db: Session = Depends(get_db)) -> Expense:
+def _list_expenses(db: Session, page: PageParams, filters: EntryFilters, category: Optional[str], is_annual_payment: Optional[bool]) -> Tuple[List[Expense], Optional[str]]:
+    query = apply_entry_filters(db.query(Expense), Expense, filters)
+    if category is not None:
+        query = query.filter(Expense.category == category)
+    if is_annual_payment is not None:
+        query = query.filter(Expense.is_annual_payment == is_annual_payment)
+    return paginate(query, Expense, page)
+
+
+def _create_expense(db: Session, payload: ExpenseCreate) -> Expense:
     expense = Expense(**payload.model_dump())
     db.add(expense)
     db.commit()
@@ -58,10 +79,59 @@ def create_expense(payload: ExpenseCreate, db: Session = Depends(get_db)) -> Exp
     return expense
 
 
-@router.delete("/{expense_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_expense(expense_id: int, db: Session = Depends(get_db)) -> None:
+def _delete_expense(db: Session, expense_id: int) -> None:
     expense = db.get(Expense, expense_id)
     if expense is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Expense not found")
     db.delete(expense)
     db.commit()
+
+
+def _bulk_create_expenses(db: Session, items: List) -> ExpenseBulkCreateRead:
+    rows, errors = validate_items(ExpenseCreate, items)
+    created = bulk_insert(db, Expense, rows)
+    return ExpenseBulkCreateRead(created=created, errors=errors)
+
+
+def _bulk_delete_expenses(db: Session, ids: List[int]) -> BulkDeleteRead:
+    return bulk_delete(db, Expense, TemplateExpenseLink.expense_id, ids, not_found="Expense not found")
+
+
+@router.get("", response_model=List[ExpenseRead])
+async def list_expenses(
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(page_params),
+    filters: EntryFilters = Depends(entry_filters),
+    category: Optional[str] = Query(default=None, max_length=255),
+    is_annual_payment: Optional[bool] = None,
+    db: DbSession = Depends(get_db),
+) -> List[Expense]:
+    etag = await db.run_sync(table_etag, ("expenses",), request.url.query)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    rows, next_cursor = await db.run_sync(_list_expenses, page, filters, category, is_annual_payment)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return rows
+
+
+@router.post("", response_model=ExpenseRead, status_code=status.HTTP_201_CREATED)
+async def create_expense(payload: ExpenseCreate, db: DbSession = Depends(get_db)) -> Expense:
+    return await db.run_sync(_create_expense, payload)
+
+
+@router.delete("/{expense_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_expense(expense_id: int, db: DbSession = Depends(get_db)) -> None:
+    await db.run_sync(_delete_expense, expense_id)
+
+
+@router.post("/bulk", response_model=ExpenseBulkCreateRead)
+async def bulk_create_expenses(payload: BulkCreatePayload, db: DbSession = Depends(get_db)) -> ExpenseBulkCreateRead:
+    return await db.run_sync(_bulk_create_expenses, payload.items)
+
+
+@router.post("/bulk-delete", response_model=BulkDeleteRead)
+async def bulk_delete_expenses(payload: BulkDeletePayload, db: DbSession = Depends(get_db)) -> BulkDeleteRead:
+    return await db.run_sync(_bulk_delete_expenses, payload.ids)
@@ -0,0 +1,40 @@
+import logging
+import os
+import time
+
+from fastapi import APIRouter, Depends, status
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
+
+from app.database import DbSession, get_db
+
+logger = logging.getLogger("financeflow.health")
+
+router = APIRouter(prefix="/api/health", tags=["health"])
+
+STARTED_AT = time.time()
+
+
+def _worker() -> dict:
+    return {"pid": os.getpid(), "uptime_seconds": round(time.time() - STARTED_AT, 3)}
+
+
+@router.get("/live")
+def live() -> dict:
+    """The worker process is up and serving requests."""
+    return {"status": "ok", **_worker()}
+
+
+@router.get("/ready")
+async def ready(db: DbSession = Depends(get_db)) -> JSONResponse:
+    """The worker answering this request can reach the database."""
+    try:
+        await db.run_sync(lambda session: session.execute(text("SELECT 1")))
+    except Exception:  # any driver error means not ready
+        # the driver's message can name hosts and users; it stays in the log
+        logger.exception("Readiness check failed")
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"status": "unavailable", "detail": "database unavailable", **_worker()},
+        )
+    return JSONResponse(content={"status": "ready", **_worker()})
@@ -0,0 +1,115 @@
+import json
+import logging
+from typing import AsyncIterator, Iterable, Iterator, Optional, Union
+
+import anyio
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.database import SessionLocal, get_sync_db
+from app.statement_import import ImportRules, ImportSummary, StatementImporter, decode_lines, load_rules
+
+router = APIRouter(prefix="/api/imports", tags=["imports"])
+logger = logging.getLogger("financeflow.imports")
+
+
+def _resolve_rules(rules: Optional[str]) -> ImportRules:
+    try:
+        resolved = ImportRules.model_validate(json.loads(rules)) if rules else load_rules()
+    except (ValueError, ValidationError) as exc:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=f"Invalid import rules: {exc}") from exc
+    if resolved is None:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="No import rules configured; pass them as the 'rules' query parameter.",
+        )
+    return resolved
+
+
+def _body_chunks(stream: AsyncIterator[bytes]) -> Iterator[bytes]:
+    """Pull request body chunks from the event loop while running in a worker thread."""
+
+    async def next_chunk() -> Optional[bytes]:
+        try:
+            return await stream.__anext__()
+        except StopAsyncIteration:
+            return None
+
+    while (chunk := anyio.from_thread.run(next_chunk)) is not None:
+        yield chunk
+
+
+def _committed(summary: ImportSummary) -> dict:
+    return {"chunks": summary.chunks, "incomes": summary.incomes, "expenses": summary.expenses}
+
+
+def _import(importer: StatementImporter, db: Session, lines: Iterable[str], summary: ImportSummary) -> None:
+    for _ in importer.import_chunks(db, lines, summary):
+        pass
+
+
+def _progress_records(importer: StatementImporter, lines: Iterable[str]) -> Iterator[str]:
+    """NDJSON records: one per committed chunk, then "done" or "failed"."""
+    summary = ImportSummary()
+    try:
+        # the response body outlives the dependency session
+        with SessionLocal() as db:
+            for _ in importer.import_chunks(db, lines, summary):
+                yield json.dumps({"status": "progress", **summary.model_dump(exclude={"errors"})}) + "\n"
+    except ValueError as exc:
+        yield json.dumps({"status": "failed", "detail": str(exc), **summary.model_dump(mode="json")}) + "\n"
+    except SQLAlchemyError:
+        logger.exception("Bank statement import failed after %d chunks", summary.chunks)
+        yield json.dumps({"status": "failed", "detail": "Import failed", **summary.model_dump(mode="json")}) + "\n"
+    else:
+        yield json.dumps({"status": "done", **summary.model_dump(mode="json")}) + "\n"
+
+
+class UploadStreamingResponse(StreamingResponse):
+    """StreamingResponse that leaves ``receive`` to the request body.
+
+    StreamingResponse listens on ``receive`` for a disconnect while it
+    streams, which would swallow the chunks of a body still being uploaded.
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+@router.post("/bank-statement", response_model=ImportSummary)
+async def import_bank_statement(
+    request: Request,
+    rules: Optional[str] = Query(default=None, description="ImportRules as JSON; defaults to $STATEMENT_IMPORT_RULES"),
+    progress: bool = Query(default=False, description="Stream NDJSON progress records, one per committed chunk"),
+    db: Session = Depends(get_sync_db),
+) -> Union[ImportSummary, StreamingResponse]:
+    """Import a raw CSV request body (not multipart) chunk by chunk.
+
+    Every chunk is committed on its own. A failed import reports how many
+    chunks and rows were committed before it; with ``progress=true`` the
+    response streams that count after every chunk.
+    """
+    importer = StatementImporter(_resolve_rules(rules))
+    lines = decode_lines(_body_chunks(request.stream().__aiter__()), importer.rules.encoding)
+    if progress:
+        return UploadStreamingResponse(_progress_records(importer, lines), media_type="application/x-ndjson")
+
+    summary = ImportSummary()
+    try:
+        await run_in_threadpool(_import, importer, db, lines, summary)
+    except ValueError as exc:
+        # only raised for the header, before anything is written
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc)) from exc
+    except SQLAlchemyError as exc:
+        logger.exception("Bank statement import failed after %d chunks", summary.chunks)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail={"message": "Import failed", "committed": _committed(summary)},
+        ) from exc
+    return summary
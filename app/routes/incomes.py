@@ -1,13 +1,26 @@
 from datetime import datetime
 from decimal import Decimal
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from pydantic import BaseModel, ConfigDict, Field
 from sqlalchemy.orm import Session
 
-from app.database import get_db
-from app.models import Income
+from app.bulk import (
+    BulkCreatePayload,
+    BulkDeletePayload,
+    BulkDeleteRead,
+    BulkItemError,
+    bulk_delete,
+    bulk_insert,
+    validate_items,
+)
+from app.database import DbSession, get_db
+from app.fast_json import FastJSONRoute
+from app.http_cache import etag_matches, not_modified, set_etag
+from app.models import Income, TemplateIncomeLink
+from app.pagination import EntryFilters, PageParams, apply_entry_filters, entry_filters, page_params, paginate
+from app.versions import table_etag
 
 
 class IncomeCreate(BaseModel):
@@ -26,16 +39,20 @@ class IncomeRead(BaseModel):
     created_at: datetime
 
 
-router = APIRouter(prefix="/api/incomes", tags=["incomes"])
+class IncomeBulkCreateRead(BaseModel):
+    created: List[IncomeRead]
+    errors: List[BulkItemError]
 
 
-@router.get("", response_model=List[IncomeRead])
-def list_incomes(db: Session = Depends(get_db)) -> List[Income]:
-    return db.query(Income).order_by(Income.created_at.desc()).all()
+router = APIRouter(prefix="/api/incomes", tags=["incomes"], route_class=FastJSONRoute)
 
 
-@router.post("", response_model=IncomeRead, status_code=status.HTTP_201_CREATED)
-def create_income(payload: IncomeCreate, db: Session = Depends(get_db)) -> Income:
+def _list_incomes(db: Session, page: PageParams, filters: EntryFilters) -> Tuple[List[Income], Optional[str]]:
+    query = apply_entry_filters(db.query(Income), Income, filters)
+    return paginate(query, Income, page)
+
+
+def _create_income(db: Session, payload: IncomeCreate) -> Income:
     income = Income(**payload.model_dump())
     db.add(income)
     db.commit()
@@ -43,10 +60,57 @@ def create_income(payload: IncomeCreate, db: Session = Depends(get_db)) -> Incom
     return income
 
 
-@router.delete("/{income_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_income(income_id: int, db: Session = Depends(get_db)) -> None:
+def _delete_income(db: Session, income_id: int) -> None:
     income = db.get(Income, income_id)
     if income is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Income not found")
     db.delete(income)
     db.commit()
+
+
+def _bulk_create_incomes(db: Session, items: List) -> IncomeBulkCreateRead:
+    rows, errors = validate_items(IncomeCreate, items)
+    created = bulk_insert(db, Income, rows)
+    return IncomeBulkCreateRead(created=created, errors=errors)
+
+
+def _bulk_delete_incomes(db: Session, ids: List[int]) -> BulkDeleteRead:
+    return bulk_delete(db, Income, TemplateIncomeLink.income_id, ids, not_found="Income not found")
+
+
+@router.get("", response_model=List[IncomeRead])
+async def list_incomes(
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(page_params),
+    filters: EntryFilters = Depends(entry_filters),
+    db: DbSession = Depends(get_db),
+) -> List[Income]:
+    etag = await db.run_sync(table_etag, ("incomes",), request.url.query)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    rows, next_cursor = await db.run_sync(_list_incomes, page, filters)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return rows
+
+
+@router.post("", response_model=IncomeRead, status_code=status.HTTP_201_CREATED)
+async def create_income(payload: IncomeCreate, db: DbSession = Depends(get_db)) -> Income:
+    return await db.run_sync(_create_income, payload)
+
+
+@router.delete("/{income_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_income(income_id: int, db: DbSession = Depends(get_db)) -> None:
+    await db.run_sync(_delete_income, income_id)
+
+
+@router.post("/bulk", response_model=IncomeBulkCreateRead)
+async def bulk_create_incomes(payload: BulkCreatePayload, db: DbSession = Depends(get_db)) -> IncomeBulkCreateRead:
+    return await db.run_sync(_bulk_create_incomes, payload.items)
+
+
+@router.post("/bulk-delete", response_model=BulkDeleteRead)
+async def bulk_delete_incomes(payload: BulkDeletePayload, db: DbSession = Depends(get_db)) -> BulkDeleteRead:
+    return await db.run_sync(_bulk_delete_incomes, payload.ids)
@@ -1,22 +1,71 @@
 from datetime import date, datetime
 from decimal import Decimal
-from typing import List, Optional
+from typing import Dict, List, Literal, Optional, Union
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from pydantic import BaseModel, ConfigDict, Field, field_validator, ValidationInfo
-from sqlalchemy.orm import Session, joinedload
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator, ValidationInfo
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+from starlette.concurrency import run_in_threadpool
 
-from app.database import get_db
+from app.bulk import BulkCreatePayload, BulkItemError, bulk_insert, validate_items
+from app.cache import projection_cache
+from app.comparison import aligned_series, compare_plans, month_axis
+from app.database import DbSession, SessionLocal, get_db
+from app.export import (
+    COLUMNAR_FORMATS,
+    FORMATS,
+    all_plan_ids,
+    columnar_available,
+    iter_export,
+    iter_plan_projections,
+)
+from app.fast_json import FastJSONRoute
+from app.finance import solve as solve_financing
+from app.http_cache import etag_matches, not_modified, set_etag
 from app.models import (
     ExpenseTemplate,
     IncomeTemplate,
+    LongtermAccount,
+    LongtermEvent,
     LongtermPeriod,
     LongtermPeriodExpenseTemplateLink,
     LongtermPeriodIncomeTemplateLink,
     LongtermPeriodSavingTemplateLink,
     LongtermPlan,
+    LongtermPlanSummary,
+    LongtermTransfer,
     SavingTemplate,
 )
+from app.period_diff import PeriodSpec, apply_period_diff, match_periods
+from app.plan_summary import schedule_refresh
+from app.projection import (
+    load_plan_for_projection,
+    load_plans_for_projection,
+    month_label,
+    projection_for_plan,
+    projection_input,
+)
+from app.routes.templates import (
+    EXPENSE_TEMPLATE_TABLES,
+    INCOME_TEMPLATE_TABLES,
+    SAVING_TEMPLATE_TABLES,
+    ExpenseTemplateRead,
+    IncomeTemplateRead,
+    SavingTemplateRead,
+    query_expense_templates,
+    query_income_templates,
+    query_saving_templates,
+    serialize_expense_template,
+    serialize_income_template,
+    serialize_saving_template,
+)
+from app.simulation import DEFAULT_PERCENTILES, simulate_wealth
+from app.sweep import MAX_SCENARIOS, SWEEP_FIELDS, grid_size, run_sweep, sweep_base
+from app.versions import bump_versions, table_etag
 
 
 def _month_to_date(month_value: str) -> date:
@@ -40,11 +89,16 @@ def _parse_optional_month(value: Optional[str]) -> Optional[date]:
 
 
 class LongtermPeriodPayload(BaseModel):
+    id: Optional[int] = None
     start_month: str = Field(..., pattern=r"^\d{4}-\d{2}$")
     end_month: str = Field(..., pattern=r"^\d{4}-\d{2}$")
     income_template_ids: List[int] = Field(default_factory=list)
     expense_template_ids: List[int] = Field(default_factory=list)
     saving_template_ids: List[int] = Field(default_factory=list)
+    # template id -> id of the plan account its amounts are booked on, for templates not using the default
+    income_template_accounts: Dict[int, int] = Field(default_factory=dict)
+    expense_template_accounts: Dict[int, int] = Field(default_factory=dict)
+    saving_template_accounts: Dict[int, int] = Field(default_factory=dict)
 
     @field_validator("income_template_ids", "expense_template_ids", "saving_template_ids")
     @classmethod
@@ -70,6 +124,97 @@ class LongtermPeriodPayload(BaseModel):
                 raise ValueError("End month must be the same or after start month.")
         return end_month
 
+    @model_validator(mode="after")
+    def validate_template_accounts(self):
+        for kind in ("income", "expense", "saving"):
+            unlinked = set(getattr(self, f"{kind}_template_accounts")) - set(getattr(self, f"{kind}_template_ids"))
+            if unlinked:
+                raise ValueError(f"Accounts given for unlinked {kind} templates: {sorted(unlinked)}")
+        return self
+
+
+class LongtermAccountPayload(BaseModel):
+    name: str = Field(..., max_length=255)
+    starting_balance: Decimal = Field(default=0)
+    return_rate: Optional[Decimal] = Field(default=None, ge=0)
+
+
+class LongtermAccountRead(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    plan_id: int
+    name: str
+    starting_balance: Decimal
+    return_rate: Optional[Decimal]
+
+
+class LongtermTransferPayload(BaseModel):
+    # None is the plan's main account
+    from_account_id: Optional[int] = None
+    to_account_id: Optional[int] = None
+    amount: Decimal = Field(..., gt=0)
+    start_month: str = Field(..., pattern=r"^\d{4}-\d{2}$")
+    end_month: str = Field(..., pattern=r"^\d{4}-\d{2}$")
+
+    @field_validator("end_month")
+    @classmethod
+    def validate_range(cls, end_month: str, info: ValidationInfo) -> str:
+        start_month = info.data.get("start_month")
+        if start_month and _month_to_date(start_month) > _month_to_date(end_month):
+            raise ValueError("End month must be the same or after start month.")
+        return end_month
+
+    @model_validator(mode="after")
+    def validate_accounts(self):
+        if self.from_account_id == self.to_account_id:
+            raise ValueError("A transfer needs two different accounts.")
+        return self
+
+
+class LongtermTransferRead(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    plan_id: int
+    from_account_id: Optional[int]
+    to_account_id: Optional[int]
+    amount: Decimal
+    start_month: date
+    end_month: date
+
+
+class LongtermEventPayload(BaseModel):
+    name: Optional[str] = Field(default=None, max_length=255)
+    month: str = Field(..., pattern=r"^\d{4}-\d{2}$")
+    kind: Literal["income", "expense"]
+    amount: Decimal = Field(..., gt=0)
+    # None is the plan's main account
+    account_id: Optional[int] = None
+
+    @field_validator("month")
+    @classmethod
+    def validate_month(cls, month: str) -> str:
+        _month_to_date(month)
+        return month
+
+
+class LongtermEventRead(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    plan_id: int
+    name: Optional[str]
+    month: date
+    kind: str
+    amount: Decimal
+    account_id: Optional[int]
+
+
+class LongtermEventBulkCreateRead(BaseModel):
+    created: List[LongtermEventRead]
+    errors: List[BulkItemError]
+
 
 class LongtermPlanCreate(BaseModel):
     name: str = Field(..., max_length=255)
@@ -111,6 +256,25 @@ class LongtermPlanRead(BaseModel):
     created_at: datetime
     car_interest_rate: Decimal
     savings_return_rate: Decimal
+    financing_account_id: Optional[int] = None
+    version: int
+
+
+class LongtermPlanSummaryRead(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    first_month: Optional[date]
+    last_month: Optional[date]
+    end_balance: Optional[Decimal]
+    end_wealth: Optional[Decimal]
+    min_balance: Optional[Decimal]
+    min_balance_month: Optional[date]
+    updated_at: Optional[datetime]
+
+
+class LongtermPlanListItem(LongtermPlanRead):
+    # None until the background refresh has computed it
+    summary: Optional[LongtermPlanSummaryRead] = None
 
 
 class TemplateSummary(BaseModel):
@@ -131,10 +295,146 @@ class LongtermPeriodRead(BaseModel):
     saving_template_ids: List[int] = Field(default_factory=list)
     income_templates: List[TemplateSummary] = Field(default_factory=list)
     expense_templates: List[TemplateSummary] = Field(default_factory=list)
+    income_template_accounts: Dict[int, int] = Field(default_factory=dict)
+    expense_template_accounts: Dict[int, int] = Field(default_factory=dict)
+    saving_template_accounts: Dict[int, int] = Field(default_factory=dict)
 
 
 class LongtermPlanDetail(LongtermPlanRead):
     periods: List[LongtermPeriodRead]
+    accounts: List[LongtermAccountRead] = Field(default_factory=list)
+    transfers: List[LongtermTransferRead] = Field(default_factory=list)
+
+
+class LongtermAccountSeries(BaseModel):
+    id: int
+    balance: List[float]
+
+
+class LongtermProjectionRead(BaseModel):
+    plan_id: int
+    months: List[str]
+    income: List[float]
+    expense: List[float]
+    savings: List[float]
+    net: List[float]
+    balance: List[float]
+    saving_total: List[float]
+    invested_balance: List[float]
+    total_wealth: List[float]
+    # balances of the plan's accounts besides the main and savings balances
+    accounts: List[LongtermAccountSeries] = Field(default_factory=list)
+
+
+class LongtermSimulationPayload(BaseModel):
+    paths: int = Field(default=1000, ge=1, le=100_000)
+    # yearly, in percent
+    mean_return: Optional[Decimal] = Field(default=None, ge=-100, le=100)
+    volatility: Decimal = Field(default=15, ge=0, le=100)
+    # monthly, in percent
+    historical_returns: List[float] = Field(default_factory=list)
+    percentiles: List[float] = Field(default_factory=lambda: list(DEFAULT_PERCENTILES), min_length=1)
+    seed: Optional[int] = Field(default=None, ge=0)
+    workers: int = Field(default=1, ge=1, le=64)
+
+    @field_validator("percentiles")
+    @classmethod
+    def validate_percentiles(cls, values: List[float]) -> List[float]:
+        if any(value < 0 or value > 100 for value in values):
+            raise ValueError("Percentiles must be between 0 and 100.")
+        return values
+
+    @field_validator("historical_returns")
+    @classmethod
+    def validate_historical_returns(cls, values: List[float]) -> List[float]:
+        if any(not -100 <= value <= 100 for value in values):
+            raise ValueError("Historical returns must be between -100 and 100 percent.")
+        return values
+
+
+class LongtermSimulationBand(BaseModel):
+    percentile: float
+    total_wealth: List[float]
+
+
+class LongtermSimulationRead(BaseModel):
+    plan_id: int
+    paths: int
+    months: List[str]
+    mean_total_wealth: List[float]
+    bands: List[LongtermSimulationBand]
+
+
+class LongtermSweepPayload(BaseModel):
+    grid: Dict[str, List[float]] = Field(..., min_length=1)
+
+    @field_validator("grid")
+    @classmethod
+    def validate_grid(cls, grid: Dict[str, List[float]]) -> Dict[str, List[float]]:
+        unknown = set(grid) - set(SWEEP_FIELDS)
+        if unknown:
+            raise ValueError(f"Fields cannot be swept: {sorted(unknown)}")
+        if any(not values for values in grid.values()):
+            raise ValueError("Every swept field needs at least one value.")
+        if grid_size(grid) > MAX_SCENARIOS:
+            raise ValueError(f"Grid exceeds {MAX_SCENARIOS} scenarios.")
+        return grid
+
+
+class LongtermSweepRead(BaseModel):
+    plan_id: int
+    scenarios: int
+    parameters: Dict[str, List[float]]
+    end_wealth: List[float]
+    min_balance: List[float]
+    min_balance_month: List[str]
+
+
+ProjectionSeries = Literal[
+    "income", "expense", "savings", "net", "balance", "saving_total", "invested_balance", "total_wealth"
+]
+
+
+class LongtermComparePayload(BaseModel):
+    plan_ids: Union[Literal["all"], List[int]] = Field(..., description='Plan ids or "all"')
+    series: List[ProjectionSeries] = Field(default_factory=lambda: ["balance", "total_wealth"])
+    workers: Optional[int] = Field(default=None, ge=1, le=64)
+
+    @field_validator("plan_ids")
+    @classmethod
+    def validate_plan_ids(cls, plan_ids):
+        if isinstance(plan_ids, list) and not plan_ids:
+            raise ValueError("Select at least one plan.")
+        return plan_ids
+
+
+class LongtermCompareSummary(BaseModel):
+    plan_id: int
+    name: str
+    end_wealth: Optional[float]
+    lowest_balance: Optional[float]
+    lowest_balance_month: Optional[str]
+    total_car_cost: float
+    series: Dict[str, List[Optional[float]]]
+
+
+class LongtermCompareRead(BaseModel):
+    months: List[str]
+    plans: List[LongtermCompareSummary]
+
+
+class FinancingSolvePayload(BaseModel):
+    solve_for: Literal["payment", "rate", "term", "principal", "balloon"]
+    principal: Optional[Union[float, List[float]]] = None
+    payment: Optional[Union[float, List[float]]] = None
+    rate: Optional[Union[float, List[float]]] = None
+    term: Optional[Union[float, List[float]]] = None
+    balloon: Optional[Union[float, List[float]]] = None
+
+
+class FinancingSolveRead(BaseModel):
+    solve_for: str
+    values: List[Optional[float]]
 
 
 class LongtermPeriodReplacePayload(BaseModel):
@@ -153,9 +453,16 @@ class LongtermPeriodReplacePayload(BaseModel):
     periods: List[LongtermPeriodPayload] = Field(default_factory=list)
     car_interest_rate: Decimal = Field(default=0, ge=0)
     savings_return_rate: Decimal = Field(default=7, ge=0)
+    # None pays the financing from the main account; omitted, the current account is kept
+    financing_account_id: Optional[int] = None
+    # version of the plan the edit is based on; omitted, the save is unconditional
+    version: Optional[int] = None
+
 
+ExportFormat = Literal["csv", "ndjson", "parquet", "arrow"]
 
-router = APIRouter(prefix="/api/longterm", tags=["longterm"])
+
+router = APIRouter(prefix="/api/longterm", tags=["longterm"], route_class=FastJSONRoute)
 
 
 def _serialize_period(period: LongtermPeriod) -> dict:
@@ -181,9 +488,16 @@ def _serialize_period(period: LongtermPeriod) -> dict:
             for link in (period.savings_templates or [])
             if link.template
         ],
+        "income_template_accounts": _link_accounts(period.income_templates),
+        "expense_template_accounts": _link_accounts(period.expense_templates),
+        "saving_template_accounts": _link_accounts(period.savings_templates),
     }
 
 
+def _link_accounts(links) -> Dict[int, int]:
+    return {link.template_id: link.account_id for link in links or [] if link.account_id is not None}
+
+
 def _serialize_plan(plan: LongtermPlan) -> dict:
     periods = sorted(plan.periods or [], key=lambda p: (p.start_month, p.id))
     return {
@@ -205,17 +519,24 @@ def _serialize_plan(plan: LongtermPlan) -> dict:
         "car_interest_rate": _decimal_to_float(plan.car_interest_rate),
         "savings_return_rate": _decimal_to_float(plan.savings_return_rate),
         "created_at": plan.created_at,
+        "financing_account_id": plan.financing_account_id,
+        "version": plan.version,
         "periods": [_serialize_period(p) for p in periods],
+        "accounts": [LongtermAccountRead.model_validate(a).model_dump() for a in plan.accounts or []],
+        "transfers": [LongtermTransferRead.model_validate(t).model_dump() for t in plan.transfers or []],
     }
 
 
-@router.get("/plans", response_model=List[LongtermPlanRead])
-def list_plans(db: Session = Depends(get_db)) -> List[LongtermPlan]:
-    return db.query(LongtermPlan).order_by(LongtermPlan.created_at.desc()).all()
+def _list_plans(db: Session) -> List[LongtermPlan]:
+    return (
+        db.query(LongtermPlan)
+        .options(joinedload(LongtermPlan.summary))
+        .order_by(LongtermPlan.created_at.desc())
+        .all()
+    )
 
 
-@router.post("/plans", response_model=LongtermPlanRead, status_code=status.HTTP_201_CREATED)
-def create_plan(payload: LongtermPlanCreate, db: Session = Depends(get_db)) -> LongtermPlan:
+def _create_plan(db: Session, payload: LongtermPlanCreate) -> LongtermPlan:
     try:
         financing_start_month = _parse_optional_month(payload.financing_start_month)
     except ValueError as exc:
@@ -245,20 +566,26 @@ def create_plan(payload: LongtermPlanCreate, db: Session = Depends(get_db)) -> L
     return plan
 
 
-@router.get("/plans/{plan_id}", response_model=LongtermPlanDetail)
-def get_plan(plan_id: int, db: Session = Depends(get_db)) -> dict:
+def _get_plan(db: Session, plan_id: int, templates_loaded: bool = False) -> dict:
+    """Serialized plan detail; with ``templates_loaded`` the linked templates are
+    already in the session and resolve from its identity map instead of being joined."""
+    links = [
+        joinedload(LongtermPlan.periods).joinedload(LongtermPeriod.income_templates),
+        joinedload(LongtermPlan.periods).joinedload(LongtermPeriod.expense_templates),
+        joinedload(LongtermPlan.periods).joinedload(LongtermPeriod.savings_templates),
+    ]
+    if not templates_loaded:
+        links = [
+            links[0].joinedload(LongtermPeriodIncomeTemplateLink.template),
+            links[1].joinedload(LongtermPeriodExpenseTemplateLink.template),
+            links[2].joinedload(LongtermPeriodSavingTemplateLink.template),
+        ]
     plan = (
         db.query(LongtermPlan)
         .options(
-            joinedload(LongtermPlan.periods)
-            .joinedload(LongtermPeriod.income_templates)
-            .joinedload(LongtermPeriodIncomeTemplateLink.template),
-            joinedload(LongtermPlan.periods)
-            .joinedload(LongtermPeriod.expense_templates)
-            .joinedload(LongtermPeriodExpenseTemplateLink.template),
-            joinedload(LongtermPlan.periods)
-            .joinedload(LongtermPeriod.savings_templates)
-            .joinedload(LongtermPeriodSavingTemplateLink.template),
+            selectinload(LongtermPlan.accounts),
+            selectinload(LongtermPlan.transfers),
+            *links,
         )
         .filter(LongtermPlan.id == plan_id)
         .first()
@@ -268,24 +595,554 @@ def get_plan(plan_id: int, db: Session = Depends(get_db)) -> dict:
     return _serialize_plan(plan)
 
 
-@router.delete("/plans/{plan_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_plan(plan_id: int, db: Session = Depends(get_db)) -> None:
+# everything _get_plan_bundle reads
+PLAN_BUNDLE_TABLES = (
+    "longterm_plans",
+    "longterm_periods",
+    "longterm_period_income_template_links",
+    "longterm_period_expense_template_links",
+    "longterm_period_saving_template_links",
+    "longterm_accounts",
+    "longterm_transfers",
+) + INCOME_TEMPLATE_TABLES + EXPENSE_TEMPLATE_TABLES + SAVING_TEMPLATE_TABLES
+
+
+def _plan_bundle_etag(db: Session, plan_id: int) -> str:
+    version = db.query(LongtermPlan.version).filter(LongtermPlan.id == plan_id).scalar()
+    if version is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Plan not found")
+    return table_etag(db, PLAN_BUNDLE_TABLES, variant=f"plan={plan_id};version={version}")
+
+
+def _get_plan_bundle(db: Session, plan_id: int) -> dict:
+    # templates first, and kept referenced: the identity map only holds weak
+    # references, and the plan query resolves the linked templates from it
+    income_templates = query_income_templates(db)
+    expense_templates = query_expense_templates(db)
+    saving_templates = query_saving_templates(db)
+    plan = _get_plan(db, plan_id, templates_loaded=True)
+    return {
+        "plan": LongtermPlanDetail.model_validate(plan).model_dump(mode="json"),
+        "income_templates": [
+            IncomeTemplateRead.model_validate(serialize_income_template(t)).model_dump(mode="json")
+            for t in income_templates
+        ],
+        "expense_templates": [
+            ExpenseTemplateRead.model_validate(serialize_expense_template(t)).model_dump(mode="json")
+            for t in expense_templates
+        ],
+        "saving_templates": [
+            SavingTemplateRead.model_validate(serialize_saving_template(t)).model_dump(mode="json")
+            for t in saving_templates
+        ],
+    }
+
+
+def _delete_plan(db: Session, plan_id: int) -> None:
     plan = db.get(LongtermPlan, plan_id)
     if plan is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Plan not found")
+    # events are never loaded through the relationship, so the ORM cascade does not see them
+    db.query(LongtermEvent).filter(LongtermEvent.plan_id == plan_id).delete(synchronize_session=False)
+    db.query(LongtermPlanSummary).filter(LongtermPlanSummary.plan_id == plan_id).delete(synchronize_session=False)
     db.delete(plan)
     db.commit()
 
 
-@router.put("/plans/{plan_id}/periods", response_model=LongtermPlanDetail)
-def replace_periods(
+def _plan_changed(plan_id: int) -> None:
+    projection_cache.invalidate(("plan", plan_id))
+    schedule_refresh(("plan", plan_id))
+
+
+async def _load_plan_for_projection(db: DbSession, plan_id: int, term_months: Optional[int] = None) -> LongtermPlan:
+    plan = await db.run_sync(load_plan_for_projection, plan_id, term_months)
+    if plan is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Plan not found")
+    return plan
+
+
+@router.get("/plans", response_model=List[LongtermPlanListItem])
+async def list_plans(request: Request, response: Response, db: DbSession = Depends(get_db)) -> List[LongtermPlan]:
+    etag = await db.run_sync(table_etag, ("longterm_plans", "longterm_plan_summaries"))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    return await db.run_sync(_list_plans)
+
+
+@router.post("/plans", response_model=LongtermPlanRead, status_code=status.HTTP_201_CREATED)
+async def create_plan(payload: LongtermPlanCreate, db: DbSession = Depends(get_db)) -> LongtermPlan:
+    plan = await db.run_sync(_create_plan, payload)
+    schedule_refresh(("plan", plan.id))
+    return plan
+
+
+@router.post("/financing/solve", response_model=FinancingSolveRead)
+def solve_financing_terms(payload: FinancingSolvePayload) -> dict:
+    known = payload.model_dump(exclude={"solve_for"}, exclude_none=True)
+    known.pop(payload.solve_for, None)
+    try:
+        values = np.atleast_1d(solve_financing(payload.solve_for, **known))
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc)) from exc
+    return {
+        "solve_for": payload.solve_for,
+        "values": [None if np.isnan(value) else float(value) for value in values],
+    }
+
+
+def _load_plans_for_comparison(db: Session, plan_ids: Union[str, List[int]]) -> List[LongtermPlan]:
+    if plan_ids == "all":
+        return load_plans_for_projection(db)
+    plans = load_plans_for_projection(db, plan_ids)
+    found = {plan.id for plan in plans}
+    missing = [plan_id for plan_id in dict.fromkeys(plan_ids) if plan_id not in found]
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Plan not found: {', '.join(str(plan_id) for plan_id in missing)}",
+        )
+    order = {plan_id: position for position, plan_id in enumerate(dict.fromkeys(plan_ids))}
+    return sorted(plans, key=lambda plan: order[plan.id])
+
+
+def _comparison_response(plans: List[LongtermPlan], payload: LongtermComparePayload) -> dict:
+    comparisons = compare_plans(plans, payload.workers)
+    axis = month_axis(comparisons)
+    return {
+        "months": [month_label(m) for m in axis],
+        "plans": [
+            {
+                "plan_id": comparison.plan_id,
+                "name": comparison.name,
+                "end_wealth": comparison.end_wealth,
+                "lowest_balance": comparison.lowest_balance,
+                "lowest_balance_month": (
+                    month_label(comparison.lowest_balance_month)
+                    if comparison.lowest_balance_month is not None
+                    else None
+                ),
+                "total_car_cost": comparison.total_car_cost,
+                "series": aligned_series(comparison, axis, payload.series),
+            }
+            for comparison in comparisons
+        ],
+    }
+
+
+@router.post("/plans/compare", response_model=LongtermCompareRead)
+async def compare_longterm_plans(payload: LongtermComparePayload, db: DbSession = Depends(get_db)) -> dict:
+    plans = await db.run_sync(_load_plans_for_comparison, payload.plan_ids)
+    return await run_in_threadpool(_comparison_response, plans, payload)
+
+
+@router.get("/plans/{plan_id}", response_model=LongtermPlanDetail)
+async def get_plan(plan_id: int, db: DbSession = Depends(get_db)) -> dict:
+    return await db.run_sync(_get_plan, plan_id)
+
+
+@router.get("/plans/{plan_id}/bundle")
+async def get_plan_bundle(plan_id: int, request: Request, response: Response, db: DbSession = Depends(get_db)) -> dict:
+    # the ETag comes from the table counters, so a 304 loads nothing
+    etag = await db.run_sync(_plan_bundle_etag, plan_id)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    return await db.run_sync(_get_plan_bundle, plan_id)
+
+
+@router.get("/projection-cache")
+def get_projection_cache_stats() -> dict:
+    return projection_cache.stats()
+
+
+@router.get("/plans/{plan_id}/projection", response_model=LongtermProjectionRead)
+async def get_plan_projection(plan_id: int, db: DbSession = Depends(get_db)) -> dict:
+    plan = await _load_plan_for_projection(db, plan_id)
+    projection = await run_in_threadpool(projection_for_plan, plan)
+    return {"plan_id": plan_id, **projection.to_dict()}
+
+
+def _existing_plan_ids(db: Session, plan_ids: List[int]) -> List[int]:
+    if not plan_ids:
+        return all_plan_ids(db)
+    found = {plan_id for (plan_id,) in db.query(LongtermPlan.id).filter(LongtermPlan.id.in_(plan_ids))}
+    missing = [plan_id for plan_id in plan_ids if plan_id not in found]
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Plan not found: {', '.join(str(plan_id) for plan_id in missing)}",
+        )
+    return list(dict.fromkeys(plan_ids))
+
+
+def _export_response(plan_ids: List[int], fmt: str, filename: str) -> StreamingResponse:
+    if fmt in COLUMNAR_FORMATS and not columnar_available():
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail=f"{fmt} export requires the pyarrow package.",
+        )
+    media_type, extension = FORMATS[fmt]
+    # the generator opens its own session: dependency sessions are closed before the body is streamed
+    return StreamingResponse(
+        iter_export(iter_plan_projections(SessionLocal, plan_ids), fmt),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{extension}"'},
+    )
+
+
+@router.get("/plans/{plan_id}/projection/export")
+async def export_plan_projection(
     plan_id: int,
-    payload: LongtermPeriodReplacePayload,
-    db: Session = Depends(get_db),
+    fmt: ExportFormat = Query(default="csv", alias="format"),
+    db: DbSession = Depends(get_db),
+) -> StreamingResponse:
+    plan_ids = await db.run_sync(_existing_plan_ids, [plan_id])
+    return _export_response(plan_ids, fmt, f"plan-{plan_id}-projection")
+
+
+@router.get("/projections/export")
+async def export_projections(
+    plan_ids: List[int] = Query(default=[], alias="plan_id"),
+    fmt: ExportFormat = Query(default="csv", alias="format"),
+    db: DbSession = Depends(get_db),
+) -> StreamingResponse:
+    """Projections of the given plans (all plans if none are given) in one table."""
+    return _export_response(await db.run_sync(_existing_plan_ids, plan_ids), fmt, "projections")
+
+
+@router.post("/plans/{plan_id}/simulation", response_model=LongtermSimulationRead)
+async def simulate_plan(
+    plan_id: int,
+    payload: LongtermSimulationPayload,
+    db: DbSession = Depends(get_db),
 ) -> dict:
+    plan = await _load_plan_for_projection(db, plan_id)
+    projection = await run_in_threadpool(projection_for_plan, plan)
+
+    mean_return = payload.mean_return if payload.mean_return is not None else plan.savings_return_rate
+    simulation = await run_in_threadpool(
+        simulate_wealth,
+        projection,
+        starting_saving_balance=_decimal_to_float(plan.starting_saving_balance),
+        paths=payload.paths,
+        mean_return=_decimal_to_float(mean_return),
+        volatility=_decimal_to_float(payload.volatility),
+        historical_returns=payload.historical_returns,
+        percentiles=payload.percentiles,
+        seed=payload.seed,
+        workers=payload.workers,
+    )
+    return {
+        "plan_id": plan_id,
+        "paths": payload.paths,
+        "months": [month_label(m) for m in simulation.months],
+        "mean_total_wealth": simulation.mean.tolist(),
+        "bands": [
+            {"percentile": percentile, "total_wealth": band.tolist()}
+            for percentile, band in zip(simulation.percentiles, simulation.bands)
+        ],
+    }
+
+
+@router.post("/plans/{plan_id}/sweep", response_model=LongtermSweepRead)
+async def sweep_plan(plan_id: int, payload: LongtermSweepPayload, db: DbSession = Depends(get_db)) -> dict:
+    # events are loaded for the longest swept financing term, rounded as run_sweep does
+    terms = payload.grid.get("car_term_months")
+    plan = await _load_plan_for_projection(db, plan_id, max(round(max(terms)), 0) if terms else None)
+
+    try:
+        result = await run_in_threadpool(run_sweep, projection_input(plan), sweep_base(plan), payload.grid)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc)) from exc
+    return {
+        "plan_id": plan_id,
+        "scenarios": len(result.end_wealth),
+        "parameters": {name: result.values[:, i].tolist() for i, name in enumerate(result.fields)},
+        "end_wealth": result.end_wealth.tolist(),
+        "min_balance": result.min_balance.tolist(),
+        "min_balance_month": [month_label(m) for m in result.min_balance_month],
+    }
+
+
+@router.delete("/plans/{plan_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_plan(plan_id: int, db: DbSession = Depends(get_db)) -> None:
+    await db.run_sync(_delete_plan, plan_id)
+    projection_cache.invalidate(("plan", plan_id))
+
+
+def _plan_or_404(db: Session, plan_id: int) -> LongtermPlan:
+    plan = db.get(LongtermPlan, plan_id)
+    if plan is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Plan not found")
+    return plan
+
+
+def _account_or_404(db: Session, plan_id: int, account_id: int) -> LongtermAccount:
+    account = db.get(LongtermAccount, account_id)
+    if account is None or account.plan_id != plan_id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Account not found")
+    return account
+
+
+def _create_account(db: Session, plan_id: int, payload: LongtermAccountPayload) -> LongtermAccount:
+    _plan_or_404(db, plan_id)
+    account = LongtermAccount(plan_id=plan_id, **payload.model_dump())
+    db.add(account)
+    db.commit()
+    db.refresh(account)
+    return account
+
+
+def _update_account(db: Session, plan_id: int, account_id: int, payload: LongtermAccountPayload) -> LongtermAccount:
+    account = _account_or_404(db, plan_id, account_id)
+    for name, value in payload.model_dump().items():
+        setattr(account, name, value)
+    db.commit()
+    db.refresh(account)
+    return account
+
+
+def _delete_account(db: Session, plan_id: int, account_id: int) -> None:
+    account = _account_or_404(db, plan_id, account_id)
+    # what was booked on the account goes back to the default accounts; not every
+    # backend enforces the ON DELETE rules, so they are applied here as well
+    written = [LongtermEvent, LongtermTransfer, LongtermPlan]
+    for link_model in (
+        LongtermPeriodIncomeTemplateLink,
+        LongtermPeriodExpenseTemplateLink,
+        LongtermPeriodSavingTemplateLink,
+    ):
+        db.query(link_model).filter(link_model.account_id == account_id).update(
+            {link_model.account_id: None}, synchronize_session=False
+        )
+        written.append(link_model)
+    db.query(LongtermEvent).filter(LongtermEvent.account_id == account_id).update(
+        {LongtermEvent.account_id: None}, synchronize_session=False
+    )
+    db.query(LongtermTransfer).filter(
+        (LongtermTransfer.from_account_id == account_id) | (LongtermTransfer.to_account_id == account_id)
+    ).delete(synchronize_session=False)
+    db.query(LongtermPlan).filter(
+        LongtermPlan.id == plan_id, LongtermPlan.financing_account_id == account_id
+    ).update({LongtermPlan.financing_account_id: None}, synchronize_session=False)
+    # Core writes bypass the flush hook that maintains the counters
+    bump_versions(db, [model.__tablename__ for model in written])
+    db.delete(account)
+    db.commit()
+
+
+def _create_transfer(db: Session, plan_id: int, payload: LongtermTransferPayload) -> LongtermTransfer:
+    _plan_or_404(db, plan_id)
+    for account_id in {payload.from_account_id, payload.to_account_id} - {None}:
+        _account_or_404(db, plan_id, account_id)
+    transfer = LongtermTransfer(
+        plan_id=plan_id,
+        from_account_id=payload.from_account_id,
+        to_account_id=payload.to_account_id,
+        amount=payload.amount,
+        start_month=_month_to_date(payload.start_month),
+        end_month=_month_to_date(payload.end_month),
+    )
+    db.add(transfer)
+    db.commit()
+    db.refresh(transfer)
+    return transfer
+
+
+def _delete_transfer(db: Session, plan_id: int, transfer_id: int) -> None:
+    transfer = db.get(LongtermTransfer, transfer_id)
+    if transfer is None or transfer.plan_id != plan_id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Transfer not found")
+    db.delete(transfer)
+    db.commit()
+
+
+def _list_events(db: Session, plan_id: int, start: Optional[str], end: Optional[str]) -> List[LongtermEvent]:
+    _plan_or_404(db, plan_id)
+    try:
+        start_month, end_month = _parse_optional_month(start), _parse_optional_month(end)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc)) from exc
+    query = db.query(LongtermEvent).filter(LongtermEvent.plan_id == plan_id)
+    if start_month is not None:
+        query = query.filter(LongtermEvent.month >= start_month)
+    if end_month is not None:
+        query = query.filter(LongtermEvent.month <= end_month)
+    return query.order_by(LongtermEvent.month, LongtermEvent.id).all()
+
+
+def _event_row(plan_id: int, values: dict) -> dict:
+    return {**values, "plan_id": plan_id, "month": _month_to_date(values["month"])}
+
+
+def _create_event(db: Session, plan_id: int, payload: LongtermEventPayload) -> LongtermEvent:
+    _plan_or_404(db, plan_id)
+    if payload.account_id is not None:
+        _account_or_404(db, plan_id, payload.account_id)
+    event = LongtermEvent(**_event_row(plan_id, payload.model_dump()))
+    db.add(event)
+    db.commit()
+    db.refresh(event)
+    return event
+
+
+def _bulk_create_events(db: Session, plan_id: int, items: List) -> LongtermEventBulkCreateRead:
+    _plan_or_404(db, plan_id)
+    rows, errors = validate_items(LongtermEventPayload, items)
+    invalid = {error.index for error in errors}
+    accounts = set(db.scalars(select(LongtermAccount.id).where(LongtermAccount.plan_id == plan_id)))
+    valid = []
+    for index, row in zip((index for index in range(len(items)) if index not in invalid), rows):
+        if row["account_id"] is not None and row["account_id"] not in accounts:
+            errors.append(
+                BulkItemError(
+                    index=index,
+                    errors=[{"loc": ["account_id"], "msg": "Account not found", "type": "value_error"}],
+                )
+            )
+        else:
+            valid.append(_event_row(plan_id, row))
+    errors.sort(key=lambda error: error.index)
+    created = bulk_insert(db, LongtermEvent, valid)
+    return LongtermEventBulkCreateRead(created=created, errors=errors)
+
+
+def _delete_event(db: Session, plan_id: int, event_id: int) -> None:
+    event = db.get(LongtermEvent, event_id)
+    if event is None or event.plan_id != plan_id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Event not found")
+    db.delete(event)
+    db.commit()
+
+
+@router.post("/plans/{plan_id}/accounts", response_model=LongtermAccountRead, status_code=status.HTTP_201_CREATED)
+async def create_account(plan_id: int, payload: LongtermAccountPayload, db: DbSession = Depends(get_db)) -> LongtermAccount:
+    account = await db.run_sync(_create_account, plan_id, payload)
+    _plan_changed(plan_id)
+    return account
+
+
+@router.put("/plans/{plan_id}/accounts/{account_id}", response_model=LongtermAccountRead)
+async def update_account(
+    plan_id: int,
+    account_id: int,
+    payload: LongtermAccountPayload,
+    db: DbSession = Depends(get_db),
+) -> LongtermAccount:
+    account = await db.run_sync(_update_account, plan_id, account_id, payload)
+    _plan_changed(plan_id)
+    return account
+
+
+@router.delete("/plans/{plan_id}/accounts/{account_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_account(plan_id: int, account_id: int, db: DbSession = Depends(get_db)) -> None:
+    await db.run_sync(_delete_account, plan_id, account_id)
+    _plan_changed(plan_id)
+
+
+@router.post("/plans/{plan_id}/transfers", response_model=LongtermTransferRead, status_code=status.HTTP_201_CREATED)
+async def create_transfer(
+    plan_id: int,
+    payload: LongtermTransferPayload,
+    db: DbSession = Depends(get_db),
+) -> LongtermTransfer:
+    transfer = await db.run_sync(_create_transfer, plan_id, payload)
+    _plan_changed(plan_id)
+    return transfer
+
+
+@router.delete("/plans/{plan_id}/transfers/{transfer_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_transfer(plan_id: int, transfer_id: int, db: DbSession = Depends(get_db)) -> None:
+    await db.run_sync(_delete_transfer, plan_id, transfer_id)
+    _plan_changed(plan_id)
+
+
+@router.get("/plans/{plan_id}/events", response_model=List[LongtermEventRead])
+async def list_events(
+    plan_id: int,
+    start: Optional[str] = Query(default=None, pattern=r"^\d{4}-\d{2}$"),
+    end: Optional[str] = Query(default=None, pattern=r"^\d{4}-\d{2}$"),
+    db: DbSession = Depends(get_db),
+) -> List[LongtermEvent]:
+    return await db.run_sync(_list_events, plan_id, start, end)
+
+
+@router.post("/plans/{plan_id}/events", response_model=LongtermEventRead, status_code=status.HTTP_201_CREATED)
+async def create_event(plan_id: int, payload: LongtermEventPayload, db: DbSession = Depends(get_db)) -> LongtermEvent:
+    event = await db.run_sync(_create_event, plan_id, payload)
+    _plan_changed(plan_id)
+    return event
+
+
+@router.post("/plans/{plan_id}/events/bulk", response_model=LongtermEventBulkCreateRead)
+async def bulk_create_events(
+    plan_id: int,
+    payload: BulkCreatePayload,
+    db: DbSession = Depends(get_db),
+) -> LongtermEventBulkCreateRead:
+    result = await db.run_sync(_bulk_create_events, plan_id, payload.items)
+    _plan_changed(plan_id)
+    return result
+
+
+@router.delete("/plans/{plan_id}/events/{event_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_event(plan_id: int, event_id: int, db: DbSession = Depends(get_db)) -> None:
+    await db.run_sync(_delete_event, plan_id, event_id)
+    _plan_changed(plan_id)
+
+
+def _load_templates(db: Session, model, template_ids: set, label: str) -> Dict[int, object]:
+    if not template_ids:
+        return {}
+    templates = {t.id: t for t in db.query(model).filter(model.id.in_(template_ids))}
+    missing = template_ids - templates.keys()
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"{label} templates not found: {sorted(missing)}",
+        )
+    return templates
+
+
+def _claim_plan_version(db: Session, plan: LongtermPlan, expected: Optional[int]) -> None:
+    """Compare-and-swap the plan's version, so of two saves based on the same version one fails."""
+    if expected is None:
+        expected = plan.version
+    stale = HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="The plan was changed in the meantime. Reload it and apply your changes again.",
+    )
+    if expected != plan.version:
+        raise stale
+    result = db.execute(
+        update(LongtermPlan)
+        .where(LongtermPlan.id == plan.id, LongtermPlan.version == expected)
+        .values(version=expected + 1)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        raise stale
+    set_committed_value(plan, "version", expected + 1)
+    bump_versions(db, ("longterm_plans",))
+
+
+def _replace_periods(db: Session, plan_id: int, payload: LongtermPeriodReplacePayload) -> dict:
     plan = (
         db.query(LongtermPlan)
-        .options(joinedload(LongtermPlan.periods))
+        .options(
+            selectinload(LongtermPlan.accounts),
+            selectinload(LongtermPlan.transfers),
+            selectinload(LongtermPlan.periods)
+            .selectinload(LongtermPeriod.income_templates)
+            .selectinload(LongtermPeriodIncomeTemplateLink.template),
+            selectinload(LongtermPlan.periods)
+            .selectinload(LongtermPeriod.expense_templates)
+            .selectinload(LongtermPeriodExpenseTemplateLink.template),
+            selectinload(LongtermPlan.periods)
+            .selectinload(LongtermPeriod.savings_templates)
+            .selectinload(LongtermPeriodSavingTemplateLink.template),
+        )
         .filter(LongtermPlan.id == plan_id)
         .first()
     )
@@ -298,43 +1155,62 @@ def replace_periods(
             detail="At least one period is required.",
         )
 
-    income_template_ids = {template_id for item in payload.periods for template_id in item.income_template_ids}
-    expense_template_ids = {template_id for item in payload.periods for template_id in item.expense_template_ids}
-    saving_template_ids = {template_id for item in payload.periods for template_id in item.saving_template_ids}
-
-    if income_template_ids:
-        found_income_templates = {t.id for t in db.query(IncomeTemplate).filter(IncomeTemplate.id.in_(income_template_ids))}
-        missing_incomes = income_template_ids - found_income_templates
-        if missing_incomes:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Income templates not found: {sorted(missing_incomes)}",
-            )
+    account_ids = {account.id for account in plan.accounts}
+    unknown_accounts = {
+        account_id
+        for item in payload.periods
+        for accounts in (item.income_template_accounts, item.expense_template_accounts, item.saving_template_accounts)
+        for account_id in accounts.values()
+    } | ({payload.financing_account_id} - {None})
+    unknown_accounts -= account_ids
+    if unknown_accounts:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Accounts not found in this plan: {sorted(unknown_accounts)}",
+        )
 
-    if expense_template_ids:
-        found_expense_templates = {t.id for t in db.query(ExpenseTemplate).filter(ExpenseTemplate.id.in_(expense_template_ids))}
-        missing_expenses = expense_template_ids - found_expense_templates
-        if missing_expenses:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Expense templates not found: {sorted(missing_expenses)}",
+    try:
+        specs = [
+            PeriodSpec(
+                id=item.id,
+                start_month=_month_to_date(item.start_month),
+                end_month=_month_to_date(item.end_month),
+                template_ids={
+                    "income": item.income_template_ids,
+                    "expense": item.expense_template_ids,
+                    "saving": item.saving_template_ids,
+                },
+                # clients that do not send a kind's accounts keep its bookings
+                accounts={
+                    kind: getattr(item, f"{kind}_template_accounts")
+                    for kind in ("income", "expense", "saving")
+                    if f"{kind}_template_accounts" in item.model_fields_set
+                },
             )
+            for item in payload.periods
+        ]
+        financing_start_month = _parse_optional_month(payload.financing_start_month)
+        diff = match_periods(plan.periods, specs)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc)) from exc
 
-    if saving_template_ids:
-        found_saving_templates = {t.id for t in db.query(SavingTemplate).filter(SavingTemplate.id.in_(saving_template_ids))}
-        missing_savings = saving_template_ids - found_saving_templates
-        if missing_savings:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Saving templates not found: {sorted(missing_savings)}",
-            )
+    templates = {
+        "income": _load_templates(
+            db, IncomeTemplate, {t for item in payload.periods for t in item.income_template_ids}, "Income"
+        ),
+        "expense": _load_templates(
+            db, ExpenseTemplate, {t for item in payload.periods for t in item.expense_template_ids}, "Expense"
+        ),
+        "saving": _load_templates(
+            db, SavingTemplate, {t for item in payload.periods for t in item.saving_template_ids}, "Saving"
+        ),
+    }
+
+    _claim_plan_version(db, plan, payload.version)
 
     plan.starting_balance = payload.starting_balance
     plan.starting_saving_balance = payload.starting_saving_balance
-    try:
-        plan.financing_start_month = _parse_optional_month(payload.financing_start_month)
-    except ValueError as exc:
-        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc)) from exc
+    plan.financing_start_month = financing_start_month
     plan.car_purchase_price = payload.car_purchase_price
     plan.car_down_payment = payload.car_down_payment
     plan.car_final_payment = payload.car_final_payment
@@ -346,47 +1222,23 @@ def replace_periods(
     plan.car_tax_monthly = payload.car_tax_monthly
     plan.car_interest_rate = payload.car_interest_rate
     plan.savings_return_rate = payload.savings_return_rate
-    plan.periods.clear()
-    for period_payload in payload.periods:
-        try:
-            start_month = _month_to_date(period_payload.start_month)
-            end_month = _month_to_date(period_payload.end_month)
-        except ValueError as exc:
-            raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(exc)) from exc
-
-        period = LongtermPeriod(
-            start_month=start_month,
-            end_month=end_month,
-            income_templates=[
-                LongtermPeriodIncomeTemplateLink(template_id=template_id)
-                for template_id in period_payload.income_template_ids
-            ],
-            expense_templates=[
-                LongtermPeriodExpenseTemplateLink(template_id=template_id)
-                for template_id in period_payload.expense_template_ids
-            ],
-            savings_templates=[
-                LongtermPeriodSavingTemplateLink(template_id=template_id)
-                for template_id in period_payload.saving_template_ids
-            ],
-        )
-        plan.periods.append(period)
+    if "financing_account_id" in payload.model_fields_set:
+        plan.financing_account_id = payload.financing_account_id
+    apply_period_diff(plan, diff, templates)
 
-    db.add(plan)
+    # flushed rows already carry their ids, so the plan is serialized without reloading it
+    db.flush()
+    result = _serialize_plan(plan)
     db.commit()
-    db.refresh(plan)
-    plan.periods = (
-        db.query(LongtermPeriod)
-        .options(
-            joinedload(LongtermPeriod.income_templates)
-            .joinedload(LongtermPeriodIncomeTemplateLink.template),
-            joinedload(LongtermPeriod.expense_templates)
-            .joinedload(LongtermPeriodExpenseTemplateLink.template),
-            joinedload(LongtermPeriod.savings_templates)
-            .joinedload(LongtermPeriodSavingTemplateLink.template),
-        )
-        .filter(LongtermPeriod.plan_id == plan.id)
-        .order_by(LongtermPeriod.start_month, LongtermPeriod.id)
-        .all()
-    )
-    return _serialize_plan(plan)
+    return result
+
+
+@router.put("/plans/{plan_id}/periods", response_model=LongtermPlanDetail)
+async def replace_periods(
+    plan_id: int,
+    payload: LongtermPeriodReplacePayload,
+    db: DbSession = Depends(get_db),
+) -> dict:
+    result = await db.run_sync(_replace_periods, plan_id, payload)
+    _plan_changed(plan_id)
+    return result
@@ -1,13 +1,26 @@
 from datetime import datetime
 from decimal import Decimal
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from pydantic import BaseModel, ConfigDict, Field
 from sqlalchemy.orm import Session
 
-from app.database import get_db
-from app.models import Saving
+from app.bulk import (
+    BulkCreatePayload,
+    BulkDeletePayload,
+    BulkDeleteRead,
+    BulkItemError,
+    bulk_delete,
+    bulk_insert,
+    validate_items,
+)
+from app.database import DbSession, get_db
+from app.fast_json import FastJSONRoute
+from app.http_cache import etag_matches, not_modified, set_etag
+from app.models import Saving, TemplateSavingLink
+from app.pagination import EntryFilters, PageParams, apply_entry_filters, entry_filters, page_params, paginate
+from app.versions import table_etag
 
 
 class SavingCreate(BaseModel):
@@ -26,16 +39,20 @@ class SavingRead(BaseModel):
     created_at: datetime
 
 
-router = APIRouter(prefix="/api/savings", tags=["savings"])
+class SavingBulkCreateRead(BaseModel):
+    created: List[SavingRead]
+    errors: List[BulkItemError]
 
 
-@router.get("", response_model=List[SavingRead])
-def list_savings(db: Session = Depends(get_db)) -> List[Saving]:
-    return db.query(Saving).order_by(Saving.created_at.desc()).all()
+router = APIRouter(prefix="/api/savings", tags=["savings"], route_class=FastJSONRoute)
 
 
-@router.post("", response_model=SavingRead, status_code=status.HTTP_201_CREATED)
-def create_saving(payload: SavingCreate, db: Session = Depends(get_db)) -> Saving:
+def _list_savings(db: Session, page: PageParams, filters: EntryFilters) -> Tuple[List[Saving], Optional[str]]:
+    query = apply_entry_filters(db.query(Saving), Saving, filters)
+    return paginate(query, Saving, page)
+
+
+def _create_saving(db: Session, payload: SavingCreate) -> Saving:
     saving = Saving(**payload.model_dump())
     db.add(saving)
     db.commit()
@@ -43,10 +60,57 @@ def create_saving(payload: SavingCreate, db: Session = Depends(get_db)) -> Savin
     return saving
 
 
-@router.delete("/{saving_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_saving(saving_id: int, db: Session = Depends(get_db)) -> None:
+def _delete_saving(db: Session, saving_id: int) -> None:
     saving = db.get(Saving, saving_id)
     if saving is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Saving not found")
     db.delete(saving)
     db.commit()
+
+
+def _bulk_create_savings(db: Session, items: List) -> SavingBulkCreateRead:
+    rows, errors = validate_items(SavingCreate, items)
+    created = bulk_insert(db, Saving, rows)
+    return SavingBulkCreateRead(created=created, errors=errors)
+
+
+def _bulk_delete_savings(db: Session, ids: List[int]) -> BulkDeleteRead:
+    return bulk_delete(db, Saving, TemplateSavingLink.saving_id, ids, not_found="Saving not found")
+
+
+@router.get("", response_model=List[SavingRead])
+async def list_savings(
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(page_params),
+    filters: EntryFilters = Depends(entry_filters),
+    db: DbSession = Depends(get_db),
+) -> List[Saving]:
+    etag = await db.run_sync(table_etag, ("savings",), request.url.query)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    rows, next_cursor = await db.run_sync(_list_savings, page, filters)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return rows
+
+
+@router.post("", response_model=SavingRead, status_code=status.HTTP_201_CREATED)
+async def create_saving(payload: SavingCreate, db: DbSession = Depends(get_db)) -> Saving:
+    return await db.run_sync(_create_saving, payload)
+
+
+@router.delete("/{saving_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_saving(saving_id: int, db: DbSession = Depends(get_db)) -> None:
+    await db.run_sync(_delete_saving, saving_id)
+
+
+@router.post("/bulk", response_model=SavingBulkCreateRead)
+async def bulk_create_savings(payload: BulkCreatePayload, db: DbSession = Depends(get_db)) -> SavingBulkCreateRead:
+    return await db.run_sync(_bulk_create_savings, payload.items)
+
+
+@router.post("/bulk-delete", response_model=BulkDeleteRead)
+async def bulk_delete_savings(payload: BulkDeletePayload, db: DbSession = Depends(get_db)) -> BulkDeleteRead:
+    return await db.run_sync(_bulk_delete_savings, payload.ids)
@@ -1,11 +1,14 @@
 from datetime import datetime
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from pydantic import BaseModel, ConfigDict, Field
 from sqlalchemy.orm import Session, joinedload
 
-from app.database import get_db
+from app.cache import projection_cache
+from app.database import DbSession, get_db
+from app.fast_json import FastJSONRoute
+from app.http_cache import etag_matches, not_modified, set_etag
 from app.models import (
     Expense,
     ExpenseTemplate,
@@ -17,9 +20,11 @@ from app.models import (
     Saving,
     SavingTemplate,
 )
+from app.plan_summary import schedule_refresh_after_commit
 from app.routes.expenses import ExpenseRead
 from app.routes.incomes import IncomeRead
 from app.routes.savings import SavingRead
+from app.versions import table_etag
 
 
 class TemplateBase(BaseModel):
@@ -69,23 +74,37 @@ class SavingTemplateRead(BaseModel):
     savings: List["SavingRead"]
 
 
-router = APIRouter(prefix="/api/templates", tags=["templates"])
+router = APIRouter(prefix="/api/templates", tags=["templates"], route_class=FastJSONRoute)
 
+INCOME_TEMPLATE_TABLES = ("income_templates", "template_income_links", "incomes")
+EXPENSE_TEMPLATE_TABLES = ("expense_templates", "template_expense_links", "expenses")
+SAVING_TEMPLATE_TABLES = ("saving_templates", "template_saving_links", "savings")
 
-@router.get("/income", response_model=List[IncomeTemplateRead])
-def list_income_templates(db: Session = Depends(get_db)) -> List[dict]:
-    templates = (
+
+def query_income_templates(db: Session) -> List[IncomeTemplate]:
+    return (
         db.query(IncomeTemplate)
         .options(joinedload(IncomeTemplate.incomes).joinedload(TemplateIncomeLink.income))
         .order_by(IncomeTemplate.created_at.desc())
         .all()
     )
+
+
+def load_income_templates(db: Session) -> List[dict]:
+    templates = query_income_templates(db)
     return [serialize_income_template(t) for t in templates]
 
 
+@router.get("/income", response_model=List[IncomeTemplateRead])
+async def list_income_templates(request: Request, response: Response, db: DbSession = Depends(get_db)) -> List[dict]:
+    etag = await db.run_sync(table_etag, INCOME_TEMPLATE_TABLES)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    return await db.run_sync(load_income_templates)
 
-@router.post("/income", response_model=IncomeTemplateRead, status_code=status.HTTP_201_CREATED)
-def create_income_template(payload: IncomeTemplateCreate, db: Session = Depends(get_db)) -> dict:
+
+def _create_income_template(db: Session, payload: IncomeTemplateCreate) -> dict:
     incomes = db.query(Income).filter(Income.id.in_(payload.income_ids)).all()
     if len(incomes) != len(set(payload.income_ids)):
         raise HTTPException(status_code=404, detail="One or more income IDs were not found")
@@ -107,39 +126,50 @@ def create_income_template(payload: IncomeTemplateCreate, db: Session = Depends(
     return serialize_income_template(template)
 
 
+@router.post("/income", response_model=IncomeTemplateRead, status_code=status.HTTP_201_CREATED)
+async def create_income_template(payload: IncomeTemplateCreate, db: DbSession = Depends(get_db)) -> dict:
+    return await db.run_sync(_create_income_template, payload)
 
-@router.delete("/income/{template_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_income_template(template_id: int, db: Session = Depends(get_db)) -> None:
+
+def _delete_income_template(db: Session, template_id: int) -> None:
     template = db.get(IncomeTemplate, template_id)
     if template is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Template not found")
+    schedule_refresh_after_commit(db, ("income_template", template_id))
     db.delete(template)
     db.commit()
 
 
-@router.get("/expense", response_model=List[ExpenseTemplateRead])
-def list_expense_templates(db: Session = Depends(get_db)) -> List[dict]:
-    templates = (
+@router.delete("/income/{template_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_income_template(template_id: int, db: DbSession = Depends(get_db)) -> None:
+    await db.run_sync(_delete_income_template, template_id)
+    projection_cache.invalidate(("income_template", template_id))
+
+
+def query_expense_templates(db: Session) -> List[ExpenseTemplate]:
+    return (
         db.query(ExpenseTemplate)
         .options(joinedload(ExpenseTemplate.expenses).joinedload(TemplateExpenseLink.expense))
         .order_by(ExpenseTemplate.created_at.desc())
         .all()
     )
 
-    result = []
-    for t in templates:
-        result.append({
-            "id": t.id,
-            "name": t.name,
-            "description": t.description,
-            "created_at": t.created_at,
-            "expenses": [link.expense for link in t.expenses],
-        })
-    return result
 
+def load_expense_templates(db: Session) -> List[dict]:
+    templates = query_expense_templates(db)
+    return [serialize_expense_template(t) for t in templates]
 
-@router.post("/expense", response_model=ExpenseTemplateRead, status_code=status.HTTP_201_CREATED)
-def create_expense_template(payload: ExpenseTemplateCreate, db: Session = Depends(get_db)) -> dict:
+
+@router.get("/expense", response_model=List[ExpenseTemplateRead])
+async def list_expense_templates(request: Request, response: Response, db: DbSession = Depends(get_db)) -> List[dict]:
+    etag = await db.run_sync(table_etag, EXPENSE_TEMPLATE_TABLES)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    return await db.run_sync(load_expense_templates)
+
+
+def _create_expense_template(db: Session, payload: ExpenseTemplateCreate) -> dict:
     expenses = db.query(Expense).filter(Expense.id.in_(payload.expense_ids)).all()
     if len(expenses) != len(set(payload.expense_ids)):
         raise HTTPException(status_code=404, detail="One or more expense IDs were not found")
@@ -160,39 +190,50 @@ def create_expense_template(payload: ExpenseTemplateCreate, db: Session = Depend
     return serialize_expense_template(template)
 
 
+@router.post("/expense", response_model=ExpenseTemplateRead, status_code=status.HTTP_201_CREATED)
+async def create_expense_template(payload: ExpenseTemplateCreate, db: DbSession = Depends(get_db)) -> dict:
+    return await db.run_sync(_create_expense_template, payload)
 
-@router.delete("/expense/{template_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_expense_template(template_id: int, db: Session = Depends(get_db)) -> None:
+
+def _delete_expense_template(db: Session, template_id: int) -> None:
     template = db.get(ExpenseTemplate, template_id)
     if template is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Template not found")
+    schedule_refresh_after_commit(db, ("expense_template", template_id))
     db.delete(template)
     db.commit()
 
 
-@router.get("/saving", response_model=List[SavingTemplateRead])
-def list_saving_templates(db: Session = Depends(get_db)) -> List[dict]:
-    templates = (
+@router.delete("/expense/{template_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_expense_template(template_id: int, db: DbSession = Depends(get_db)) -> None:
+    await db.run_sync(_delete_expense_template, template_id)
+    projection_cache.invalidate(("expense_template", template_id))
+
+
+def query_saving_templates(db: Session) -> List[SavingTemplate]:
+    return (
         db.query(SavingTemplate)
         .options(joinedload(SavingTemplate.savings).joinedload(TemplateSavingLink.saving))
         .order_by(SavingTemplate.created_at.desc())
         .all()
     )
 
-    return [
-        {
-            "id": t.id,
-            "name": t.name,
-            "description": t.description,
-            "created_at": t.created_at,
-            "savings": [link.saving for link in t.savings],
-        }
-        for t in templates
-    ]
 
+def load_saving_templates(db: Session) -> List[dict]:
+    templates = query_saving_templates(db)
+    return [serialize_saving_template(t) for t in templates]
 
-@router.post("/saving", response_model=SavingTemplateRead, status_code=status.HTTP_201_CREATED)
-def create_saving_template(payload: SavingTemplateCreate, db: Session = Depends(get_db)) -> dict:
+
+@router.get("/saving", response_model=List[SavingTemplateRead])
+async def list_saving_templates(request: Request, response: Response, db: DbSession = Depends(get_db)) -> List[dict]:
+    etag = await db.run_sync(table_etag, SAVING_TEMPLATE_TABLES)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    return await db.run_sync(load_saving_templates)
+
+
+def _create_saving_template(db: Session, payload: SavingTemplateCreate) -> dict:
     savings = db.query(Saving).filter(Saving.id.in_(payload.saving_ids)).all()
     if len(savings) != len(set(payload.saving_ids)):
         raise HTTPException(status_code=404, detail="One or more saving IDs were not found")
@@ -219,15 +260,26 @@ def create_saving_template(payload: SavingTemplateCreate, db: Session = Depends(
     }
 
 
-@router.delete("/saving/{template_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_saving_template(template_id: int, db: Session = Depends(get_db)) -> None:
+@router.post("/saving", response_model=SavingTemplateRead, status_code=status.HTTP_201_CREATED)
+async def create_saving_template(payload: SavingTemplateCreate, db: DbSession = Depends(get_db)) -> dict:
+    return await db.run_sync(_create_saving_template, payload)
+
+
+def _delete_saving_template(db: Session, template_id: int) -> None:
     template = db.get(SavingTemplate, template_id)
     if template is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Template not found")
+    schedule_refresh_after_commit(db, ("saving_template", template_id))
     db.delete(template)
     db.commit()
 
 
+@router.delete("/saving/{template_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_saving_template(template_id: int, db: DbSession = Depends(get_db)) -> None:
+    await db.run_sync(_delete_saving_template, template_id)
+    projection_cache.invalidate(("saving_template", template_id))
+
+
 def serialize_income_template(t: IncomeTemplate) -> dict:
     return {
         "id": t.id,
@@ -245,3 +297,13 @@ def serialize_expense_template(t: ExpenseTemplate) -> dict:
         "created_at": t.created_at,
         "expenses": [link.expense for link in (t.expenses or [])],
     }
+
+
+def serialize_saving_template(t: SavingTemplate) -> dict:
+    return {
+        "id": t.id,
+        "name": t.name,
+        "description": t.description,
+        "created_at": t.created_at,
+        "savings": [link.saving for link in (t.savings or [])],
+    }
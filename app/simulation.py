@@ -0,0 +1,112 @@
+"""Monte Carlo simulation of a plan's invested savings.
+
+The deterministic projection compounds the invested balance with a fixed
+``savings_return_rate``. Here every month gets a stochastic return instead,
+either drawn from a normal distribution (annual mean/volatility) or
+bootstrapped from a series of historical monthly returns. All paths are
+evaluated at once as a paths x months matrix.
+"""
+
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from app.money import to_cents, to_euros
+from app.pool import get_process_pool
+from app.projection import Projection
+
+DEFAULT_PERCENTILES = (5.0, 25.0, 50.0, 75.0, 95.0)
+
+# a month cannot lose more than everything; keeps the cumulative product invertible
+_MIN_GROWTH = 1e-6
+# paths whose product over- or underflows are capped here instead of becoming inf/NaN
+_MAX_INVESTED = 1e12
+
+
+@dataclass
+class Simulation:
+    months: np.ndarray
+    percentiles: List[float]
+    # one row per requested percentile, one column per month
+    bands: np.ndarray
+    mean: np.ndarray
+
+
+def _monthly_returns(
+    rng: np.random.Generator,
+    paths: int,
+    months: int,
+    mean_return: float,
+    volatility: float,
+    historical_returns: Optional[np.ndarray],
+) -> np.ndarray:
+    if historical_returns is not None and historical_returns.size:
+        return rng.choice(historical_returns / 100, size=(paths, months))
+    return rng.normal(mean_return / 100 / 12, volatility / 100 / np.sqrt(12), size=(paths, months))
+
+
+def simulate_invested(start: float, contributions: np.ndarray, returns: np.ndarray) -> np.ndarray:
+    """Evaluate ``invested = (invested + contribution) * (1 + r)`` for every path at once."""
+    growth = np.maximum(1 + returns, _MIN_GROWTH)
+    with np.errstate(over="ignore", under="ignore", divide="ignore", invalid="ignore"):
+        cumulative = np.cumprod(growth, axis=1)
+        previous = np.ones_like(cumulative)
+        previous[:, 1:] = cumulative[:, :-1]
+        # invested_t = G_t * (start + sum_{k<=t} c_k / G_{k-1})
+        invested = cumulative * (start + np.cumsum(contributions / previous, axis=1))
+    # a path that lost (almost) everything ends up as 0 * inf
+    invested = np.nan_to_num(invested, nan=0.0, posinf=_MAX_INVESTED, neginf=-_MAX_INVESTED)
+    return np.clip(invested, -_MAX_INVESTED, _MAX_INVESTED)
+
+
+def _simulate_chunk(
+    seed: np.random.SeedSequence,
+    paths: int,
+    balance: np.ndarray,
+    contributions: np.ndarray,
+    starting_saving_balance: float,
+    mean_return: float,
+    volatility: float,
+    historical_returns: Optional[np.ndarray],
+) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    returns = _monthly_returns(rng, paths, contributions.size, mean_return, volatility, historical_returns)
+    return balance + simulate_invested(starting_saving_balance, contributions, returns)
+
+
+def simulate_wealth(
+    projection: Projection,
+    starting_saving_balance: float,
+    paths: int,
+    mean_return: float,
+    volatility: float,
+    historical_returns: Optional[Sequence[float]] = None,
+    percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+    seed: Optional[int] = None,
+    workers: int = 1,
+) -> Simulation:
+    history = np.asarray(historical_returns, dtype=np.float64) if historical_returns else None
+    # accounts other than the invested savings keep their deterministic balances
+    balance = to_euros(projection.total_wealth - projection.invested_balance)
+    # what reaches the savings account, i.e. savings contributions less what links route elsewhere
+    contributions = to_euros(np.diff(projection.saving_total, prepend=to_cents(starting_saving_balance)))
+
+    chunks = max(1, min(workers, paths))
+    sizes = [len(part) for part in np.array_split(np.arange(paths), chunks)]
+    seeds = np.random.SeedSequence(seed).spawn(chunks)
+    args = (balance, contributions, starting_saving_balance, mean_return, volatility, history)
+
+    if chunks == 1:
+        wealth = _simulate_chunk(seeds[0], sizes[0], *args)
+    else:
+        pool = get_process_pool()
+        futures = [pool.submit(_simulate_chunk, s, n, *args) for s, n in zip(seeds, sizes)]
+        wealth = np.concatenate([f.result() for f in futures])
+
+    return Simulation(
+        months=projection.months,
+        percentiles=list(percentiles),
+        bands=np.percentile(wealth, list(percentiles), axis=0),
+        mean=wealth.mean(axis=0),
+    )
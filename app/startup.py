@@ -0,0 +1,126 @@
+"""Application startup and shutdown.
+
+Nothing touches the database at import time. The lifespan handler prepares
+the schema according to ``SCHEMA_MODE`` and opens the first pooled
+connection before the worker accepts requests:
+
+* ``create`` (default) - create missing tables, convenient for local
+  development
+* ``check`` - compare the database's Alembic revision with the migration
+  head and refuse to start on a mismatch; creates nothing
+* ``off`` - leave the schema alone; serve.py checks once in the parent
+  process and starts its workers with this mode
+
+Once the worker is ready, plans without a stored summary (app.plan_summary)
+are summarized in the background unless ``SUMMARY_BACKFILL=off``; serve.py
+does that once in the parent process instead. Shutdown waits for pending
+refreshes.
+"""
+
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Set
+
+from fastapi import FastAPI
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from starlette.concurrency import run_in_threadpool
+
+from app import database
+from app.plan_summary import summary_refresher
+
+logger = logging.getLogger("financeflow.startup")
+
+SCHEMA_MODES = ("create", "check", "off")
+ALEMBIC_INI = Path(__file__).resolve().parent.parent / "alembic.ini"
+# seconds shutdown waits for scheduled plan summary refreshes
+SUMMARY_DRAIN_TIMEOUT = 10
+
+
+def summary_backfill() -> bool:
+    return os.getenv("SUMMARY_BACKFILL", "on").lower() != "off"
+
+
+def schema_mode() -> str:
+    mode = os.getenv("SCHEMA_MODE", "create").lower()
+    if mode not in SCHEMA_MODES:
+        raise RuntimeError(f"SCHEMA_MODE must be one of {', '.join(SCHEMA_MODES)}, got {mode!r}")
+    return mode
+
+
+def head_revisions() -> Set[str]:
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+
+    config = Config(str(ALEMBIC_INI))
+    config.set_main_option("script_location", str(ALEMBIC_INI.parent / "alembic"))
+    return set(ScriptDirectory.from_config(config).get_heads())
+
+
+def current_revisions(engine: Engine) -> Set[str]:
+    from alembic.runtime.migration import MigrationContext
+
+    with engine.connect() as connection:
+        return set(MigrationContext.configure(connection).get_current_heads())
+
+
+def check_schema_revision(engine: Engine) -> None:
+    expected, current = head_revisions(), current_revisions(engine)
+    if current != expected:
+        raise RuntimeError(
+            f"Database schema is at revision {', '.join(sorted(current)) or '<none>'}, "
+            f"expected {', '.join(sorted(expected))}; run 'alembic upgrade head'"
+        )
+
+
+def prepare_schema(engine: Engine, mode: str) -> None:
+    if mode == "create":
+        database.Base.metadata.create_all(bind=engine)
+    elif mode == "check":
+        check_schema_revision(engine)
+
+
+async def _warm_pool() -> None:
+    if database.async_engine is not None:
+        async with database.async_engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+    else:
+        await run_in_threadpool(_ping, database.engine)
+
+
+def _ping(engine: Engine) -> None:
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if database.engine is None:
+        raise RuntimeError("DATABASE_URL is not configured; cannot start API without a database")
+    started = time.perf_counter()
+    mode = schema_mode()
+    if mode != "off":
+        await run_in_threadpool(prepare_schema, database.engine, mode)
+    schema_done = time.perf_counter()
+    await _warm_pool()
+    ready = time.perf_counter()
+    logger.info(
+        "Worker %d ready in %.1f ms (schema %s: %.1f ms, connection: %.1f ms)",
+        os.getpid(),
+        (ready - started) * 1000,
+        mode,
+        (schema_done - started) * 1000,
+        (ready - schema_done) * 1000,
+    )
+    if summary_backfill():
+        summary_refresher.schedule_missing()
+    try:
+        yield
+    finally:
+        await run_in_threadpool(summary_refresher.wait_idle, SUMMARY_DRAIN_TIMEOUT)
+        if database.async_engine is not None:
+            await database.async_engine.dispose()
+        database.engine.dispose()
@@ -0,0 +1,312 @@
+"""Streaming import of bank statement CSV exports into incomes and expenses.
+
+The file is read as a stream of lines and parsed with ``csv.reader``, so
+only the rows of the current chunk are held in memory. Each row becomes an
+Income (positive amount) or an Expense (negative amount) unless a mapping
+rule says otherwise; rows are written per chunk with one executemany INSERT
+per table, without building ORM objects.
+
+Usable from the API (``POST /api/imports/bank-statement``) and from the
+command line::
+
+    python -m app.statement_import export.csv --rules rules.json
+"""
+
+import argparse
+import codecs
+import csv
+import json
+import os
+import re
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from typing import Callable, Dict, Iterable, Iterator, List, Literal, Optional
+
+from pydantic import BaseModel, Field, field_validator
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.models import Expense, Income
+from app.versions import bump_versions
+
+CHUNK_SIZE = int(os.getenv("STATEMENT_IMPORT_CHUNK_SIZE", "5000"))
+RULES_PATH = os.getenv("STATEMENT_IMPORT_RULES")
+MAX_REPORTED_ERRORS = 50
+
+
+class CategoryRule(BaseModel):
+    # regular expression, searched case-insensitively in ``column`` (default: the name column)
+    match: str
+    column: Optional[str] = None
+    category: Optional[str] = Field(default=None, max_length=255)
+    kind: Optional[Literal["income", "expense", "skip"]] = None
+
+    @field_validator("match")
+    @classmethod
+    def validate_match(cls, value: str) -> str:
+        try:
+            re.compile(value)
+        except re.error as exc:
+            raise ValueError(f"Invalid pattern {value!r}: {exc}") from exc
+        return value
+
+
+class StatementColumns(BaseModel):
+    name: str
+    amount: str
+    description: Optional[str] = None
+    # booking date, stored as created_at
+    date: Optional[str] = None
+
+
+class ImportRules(BaseModel):
+    columns: StatementColumns
+    delimiter: str = Field(default=";", min_length=1, max_length=1)
+    decimal_separator: str = Field(default=",", min_length=1, max_length=1)
+    thousands_separator: Optional[str] = Field(default=".", max_length=1)
+    date_format: str = "%d.%m.%Y"
+    encoding: str = "utf-8-sig"
+    default_category: str = Field(default="other", max_length=255)
+    rules: List[CategoryRule] = Field(default_factory=list)
+
+    @field_validator("encoding")
+    @classmethod
+    def validate_encoding(cls, value: str) -> str:
+        try:
+            codecs.lookup(value)
+        except LookupError as exc:
+            raise ValueError(f"Unknown encoding {value!r}") from exc
+        return value
+
+
+class ImportRowError(BaseModel):
+    line: int
+    detail: str
+
+
+class ImportSummary(BaseModel):
+    rows: int = 0
+    incomes: int = 0
+    expenses: int = 0
+    skipped: int = 0
+    chunks: int = 0
+    error_count: int = 0
+    errors: List[ImportRowError] = Field(default_factory=list)
+
+
+def load_rules(path: Optional[str] = None) -> Optional[ImportRules]:
+    path = path or RULES_PATH
+    if not path:
+        return None
+    with open(path, encoding="utf-8") as handle:
+        return ImportRules.model_validate(json.load(handle))
+
+
+@dataclass
+class _CompiledRule:
+    pattern: re.Pattern
+    column: str
+    category: Optional[str]
+    kind: Optional[str]
+
+
+@dataclass
+class _Chunk:
+    incomes: List[Dict] = field(default_factory=list)
+    expenses: List[Dict] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.incomes) + len(self.expenses)
+
+
+def decode_lines(chunks: Iterable[bytes], encoding: str) -> Iterator[str]:
+    """Split a byte stream into text lines (with line endings) without reading it all.
+
+    Lines end at "\n" only ("\r\n" keeps its "\r"); str.splitlines would also
+    break rows at characters such as U+0085 or U+2028 inside a field.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    pending = ""
+    for chunk in chunks:
+        pending += decoder.decode(chunk)
+        # everything after the last "\n" may be an incomplete line
+        complete, newline, pending = pending.rpartition("\n")
+        if newline:
+            for line in complete.split("\n"):
+                yield line + "\n"
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+class StatementImporter:
+    def __init__(self, rules: ImportRules):
+        self.rules = rules
+        self.compiled = [
+            _CompiledRule(
+                re.compile(rule.match, re.IGNORECASE),
+                rule.column or rules.columns.name,
+                rule.category,
+                rule.kind,
+            )
+            for rule in rules.rules
+        ]
+
+    def parse_amount(self, raw: str) -> Decimal:
+        text = raw.strip().replace(" ", "").replace("\u00a0", "")
+        if self.rules.thousands_separator:
+            text = text.replace(self.rules.thousands_separator, "")
+        text = text.replace(self.rules.decimal_separator, ".")
+        if text.endswith("-"):
+            text = "-" + text[:-1]
+        try:
+            return Decimal(text)
+        except InvalidOperation as exc:
+            raise ValueError(f"Invalid amount {raw!r}") from exc
+
+    def classify(self, row: Dict[str, str], amount: Decimal):
+        kind = "income" if amount > 0 else "expense"
+        for rule in self.compiled:
+            if rule.pattern.search(row.get(rule.column) or ""):
+                return rule.kind or kind, rule.category or self.rules.default_category
+        return kind, self.rules.default_category
+
+    def convert(self, row: Dict[str, str], chunk: _Chunk) -> bool:
+        """Add ``row`` to ``chunk``; returns False if the row is skipped."""
+        columns = self.rules.columns
+        amount = self.parse_amount(row.get(columns.amount) or "")
+        if amount == 0:
+            return False
+        kind, category = self.classify(row, amount)
+        if kind == "skip":
+            return False
+
+        description = (row.get(columns.description) or "").strip() if columns.description else ""
+        values = {
+            "name": (row.get(columns.name) or "").strip()[:255] or category,
+            "amount": abs(amount).quantize(Decimal("0.01")),
+            "description": description or None,
+        }
+        if columns.date:
+            values["created_at"] = datetime.strptime((row.get(columns.date) or "").strip(), self.rules.date_format)
+        else:
+            values["created_at"] = datetime.utcnow()
+
+        if kind == "income":
+            chunk.incomes.append(values)
+        else:
+            chunk.expenses.append(
+                {**values, "category": category, "is_annual_payment": False, "annual_month": None}
+            )
+        return True
+
+    def write(self, db: Session, chunk: _Chunk, summary: ImportSummary) -> None:
+        written = []
+        if chunk.incomes:
+            db.execute(insert(Income), chunk.incomes)
+            written.append(Income.__tablename__)
+        if chunk.expenses:
+            db.execute(insert(Expense), chunk.expenses)
+            written.append(Expense.__tablename__)
+        if written:
+            # Core inserts bypass the flush hook that maintains the counters
+            bump_versions(db, written)
+        db.commit()
+        summary.incomes += len(chunk.incomes)
+        summary.expenses += len(chunk.expenses)
+        summary.chunks += 1
+
+    def run(
+        self,
+        db: Session,
+        lines: Iterable[str],
+        chunk_size: int = CHUNK_SIZE,
+        progress: Optional[Callable[[ImportSummary], None]] = None,
+    ) -> ImportSummary:
+        summary = ImportSummary()
+        for _ in self.import_chunks(db, lines, summary, chunk_size):
+            if progress is not None:
+                progress(summary)
+        return summary
+
+    def import_chunks(
+        self,
+        db: Session,
+        lines: Iterable[str],
+        summary: ImportSummary,
+        chunk_size: int = CHUNK_SIZE,
+    ) -> Iterator[ImportSummary]:
+        """Import ``lines`` into ``summary``, yielding it after every committed chunk.
+
+        ``chunks``, ``incomes`` and ``expenses`` only count committed rows, so
+        they tell what was written when a later chunk fails.
+        """
+        reader = csv.reader(lines, delimiter=self.rules.delimiter)
+        header = next(reader, None)
+        if header is None:
+            return
+        header = [name.strip() for name in header]
+        columns = self.rules.columns
+        missing = [
+            name
+            for name in (columns.name, columns.amount, columns.description, columns.date)
+            if name and name not in header
+        ]
+        if missing:
+            raise ValueError(f"Missing columns in CSV header: {', '.join(missing)}")
+
+        chunk = _Chunk()
+        for values in reader:
+            if not any(value.strip() for value in values):
+                continue
+            summary.rows += 1
+            try:
+                if not self.convert(dict(zip(header, values)), chunk):
+                    summary.skipped += 1
+            except ValueError as exc:
+                summary.error_count += 1
+                if len(summary.errors) < MAX_REPORTED_ERRORS:
+                    summary.errors.append(ImportRowError(line=reader.line_num, detail=str(exc)))
+            if len(chunk) >= chunk_size:
+                self.write(db, chunk, summary)
+                chunk = _Chunk()
+                yield summary
+
+        if len(chunk):
+            self.write(db, chunk, summary)
+            yield summary
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from app.database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Import a bank statement CSV into incomes and expenses.")
+    parser.add_argument("path", help="CSV file exported from the bank")
+    parser.add_argument("--rules", help="JSON file with column mapping and category rules (default: $STATEMENT_IMPORT_RULES)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    rules = load_rules(args.rules)
+    if rules is None:
+        parser.error("No rules given; pass --rules or set STATEMENT_IMPORT_RULES.")
+    if SessionLocal is None:
+        parser.error("DATABASE_URL is not configured.")
+
+    def report(summary: ImportSummary) -> None:
+        print(
+            f"{summary.rows} rows: {summary.incomes} incomes, {summary.expenses} expenses, "
+            f"{summary.skipped} skipped, {summary.error_count} errors",
+            flush=True,
+        )
+
+    importer = StatementImporter(rules)
+    with open(args.path, encoding=rules.encoding, newline="") as handle, SessionLocal() as db:
+        summary = importer.run(db, handle, chunk_size=args.chunk_size, progress=report)
+    for error in summary.errors:
+        print(f"line {error.line}: {error.detail}")
+    report(summary)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""Fingerprinted, precompressed static assets.
+
+Every CSS and JS file in ``public/`` is also served under a name that
+contains a hash of its content (``js/common.3f9a0c1d2e.js``) with an
+immutable Cache-Control header, and the HTML pages are rewritten to
+reference those names. The pages themselves keep their names and are
+revalidated on every load (``no-cache`` plus ETag), so a deploy is picked
+up immediately while a repeat visit only costs a 304 per page.
+
+All files are read, rewritten and compressed once when the assets are
+loaded; requests are answered from memory. gzip variants are always
+generated, brotli variants when the optional ``brotli`` package is
+installed, and the smallest variant the client accepts is sent.
+
+Set ``STATIC_RELOAD=1`` (run.py does) to pick up edits without a restart.
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import posixpath
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Set, Tuple
+
+from starlette._utils import get_route_path
+from starlette.datastructures import Headers
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse, Response
+from starlette.types import Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # optional, gzip is always available
+    brotli = None
+
+HASH_LENGTH = 10
+FINGERPRINTED_EXTENSIONS = frozenset({".css", ".js"})
+MIN_COMPRESS_SIZE = 512
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+STATIC_RELOAD = os.getenv("STATIC_RELOAD", "0").lower() in ("1", "true", "yes")
+# preferred first
+CODINGS = ("br", "gzip", "identity")
+
+REFERENCE = re.compile(rb'(?P<attr>href|src)="(?P<path>[^"#?:]+)"')
+
+
+@dataclass
+class Asset:
+    media_type: str
+    cache_control: str
+    digest: str
+    variants: Dict[str, bytes]  # content coding -> body, always contains "identity"
+
+    def etag(self, coding: str) -> str:
+        return f'"{self.digest}"' if coding == "identity" else f'"{self.digest}-{coding}"'
+
+    def negotiate(self, accept_encoding: str) -> str:
+        accepted = accepted_codings(accept_encoding)
+        for coding in CODINGS:
+            if coding in self.variants and (coding in accepted or "*" in accepted or coding == "identity"):
+                return coding
+        return "identity"
+
+
+def accepted_codings(header: str) -> Set[str]:
+    accepted = set()
+    for part in header.split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip().lower()
+        quality = params.strip()
+        if quality.startswith("q="):
+            try:
+                if float(quality[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        if coding:
+            accepted.add(coding)
+    return accepted
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+
+
+def fingerprinted_name(name: str, digest: str) -> str:
+    stem, extension = posixpath.splitext(name)
+    return f"{stem}.{digest}{extension}"
+
+
+def _media_type(name: str) -> str:
+    # Response appends the charset to text/* itself
+    media_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+    if media_type == "application/javascript":
+        media_type += "; charset=utf-8"
+    return media_type
+
+
+def _compress(data: bytes) -> Dict[str, bytes]:
+    variants = {"identity": data}
+    if len(data) < MIN_COMPRESS_SIZE:
+        return variants
+    candidates = {"gzip": gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        candidates["br"] = brotli.compress(data, quality=11)
+    variants.update((coding, body) for coding, body in candidates.items() if len(body) < len(data))
+    return variants
+
+
+def _rewrite_references(name: str, data: bytes, fingerprints: Dict[str, str]) -> bytes:
+    """Point href/src attributes of an HTML page at the fingerprinted asset names."""
+    base = posixpath.dirname(name)
+
+    def replace(match):
+        target = posixpath.normpath(posixpath.join(base, match["path"].decode()))
+        fingerprint = fingerprints.get(target)
+        if fingerprint is None:
+            return match[0]
+        return b'%s="%s"' % (match["attr"], posixpath.relpath(fingerprint, base or ".").encode())
+
+    return REFERENCE.sub(replace, data)
+
+
+def build_assets(root: Path) -> Dict[str, Asset]:
+    sources = {
+        path.relative_to(root).as_posix(): path.read_bytes()
+        for path in sorted(root.rglob("*"))
+        if path.is_file() and not path.name.startswith(".")
+    }
+    fingerprints = {
+        name: fingerprinted_name(name, content_hash(data))
+        for name, data in sources.items()
+        if posixpath.splitext(name)[1] in FINGERPRINTED_EXTENSIONS
+    }
+    assets = {}
+    for name, data in sources.items():
+        if name.endswith(".html"):
+            data = _rewrite_references(name, data, fingerprints)
+        media_type, digest, variants = _media_type(name), content_hash(data), _compress(data)
+        # the plain name stays reachable for anything that does not go through a rewritten page
+        assets[name] = Asset(media_type, REVALIDATE, digest, variants)
+        if name in fingerprints:
+            assets[fingerprints[name]] = Asset(media_type, IMMUTABLE, digest, variants)
+    return assets
+
+
+class StaticAssets:
+    """ASGI app serving a directory through build_assets.
+
+    With ``reload`` the directory is rescanned on every request and the
+    assets are rebuilt when a file changed; meant for run.py only.
+    """
+
+    def __init__(self, directory: Path, reload: bool = False):
+        self.directory = Path(directory)
+        self.reload = reload
+        self.assets: Dict[str, Asset] = {}
+        self._signature: Optional[Tuple] = None
+        self.load()
+
+    def _scan(self) -> Tuple:
+        return tuple(
+            (path.as_posix(), stat.st_mtime_ns, stat.st_size)
+            for path, stat in ((path, path.stat()) for path in sorted(self.directory.rglob("*")) if path.is_file())
+        )
+
+    def load(self) -> None:
+        signature = self._scan()
+        if signature != self._signature:
+            self.assets = build_assets(self.directory)
+            self._signature = signature
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        assert scope["type"] == "http"
+        if self.reload:
+            self.load()
+        request = Request(scope)
+        if request.method not in ("GET", "HEAD"):
+            response = PlainTextResponse("Method Not Allowed", status_code=405, headers={"Allow": "GET, HEAD"})
+        else:
+            response = self.response(get_route_path(scope), request.headers)
+        await response(scope, receive, send)
+
+    def response(self, path: str, headers: Headers) -> Response:
+        name = path.lstrip("/")
+        if name == "" or name.endswith("/"):
+            name += "index.html"
+        asset = self.assets.get(name)
+        if asset is None:
+            return PlainTextResponse("Not Found", status_code=404)
+
+        coding = asset.negotiate(headers.get("accept-encoding", ""))
+        etag = asset.etag(coding)
+        response_headers = {"Cache-Control": asset.cache_control, "ETag": etag, "Vary": "Accept-Encoding"}
+        if_none_match = headers.get("if-none-match")
+        if if_none_match and (if_none_match.strip() == "*" or etag in (tag.strip() for tag in if_none_match.split(","))):
+            return Response(status_code=304, headers=response_headers)
+        if coding != "identity":
+            response_headers["Content-Encoding"] = coding
+        return Response(asset.variants[coding], media_type=asset.media_type, headers=response_headers)
@@ -0,0 +1,218 @@
+"""Parameter sweeps over the numeric fields of a long-term plan.
+
+Every combination of the requested field values is one scenario. The
+template-driven part of the projection does not depend on any of these
+fields, so it is built once and all scenarios are evaluated together as a
+scenarios x months matrix. Field values are given in euros; money fields
+are converted to int64 cents before evaluation, like the projection itself.
+
+Transfers between the plan's accounts do not depend on the swept fields
+either; they are applied to every scenario, and the end balances of the
+plan's LongtermAccounts count towards its end wealth.
+"""
+
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.finance import solve_payment
+from app.models import LongtermPlan
+from app.money import euros_to_cents, round_cents, to_euros
+from app.projection import (
+    FIRST_ACCOUNT,
+    MAIN_ACCOUNT,
+    SAVINGS_ACCOUNT,
+    ProjectionInput,
+    apply_events,
+    month_span,
+    period_series,
+    transfer_series,
+)
+
+SWEEP_FIELDS = (
+    "starting_balance",
+    "starting_saving_balance",
+    "savings_return_rate",
+    "car_purchase_price",
+    "car_down_payment",
+    "car_final_payment",
+    "car_monthly_rate",
+    "car_term_months",
+    "car_interest_rate",
+    "car_insurance_monthly",
+    "car_fuel_monthly",
+    "car_maintenance_monthly",
+    "car_tax_monthly",
+)
+
+# changing any of these changes the monthly loan rate unless the rate itself is swept
+ANNUITY_FIELDS = frozenset(
+    {"car_purchase_price", "car_down_payment", "car_final_payment", "car_term_months", "car_interest_rate"}
+)
+
+MONEY_FIELDS = tuple(
+    name for name in SWEEP_FIELDS if name not in ("savings_return_rate", "car_term_months", "car_interest_rate")
+)
+
+MAX_SCENARIOS = 100_000
+BLOCK_SIZE = 1024
+
+
+@dataclass
+class SweepResult:
+    fields: List[str]
+    # one row per scenario, one column per swept field
+    values: np.ndarray
+    end_wealth: np.ndarray
+    min_balance: np.ndarray
+    # month index of the lowest balance, see app.projection.month_label
+    min_balance_month: np.ndarray
+
+
+def _to_float(value: Optional[Decimal]) -> float:
+    if value is None:
+        return 0.0
+    return float(value)
+
+
+def sweep_base(plan: LongtermPlan) -> Dict[str, float]:
+    return {name: _to_float(getattr(plan, name)) for name in SWEEP_FIELDS}
+
+
+def grid_size(grid: Dict[str, Sequence[float]]) -> int:
+    return int(np.prod([len(values) for values in grid.values()], dtype=np.int64))
+
+
+def _evaluate_block(
+    data: ProjectionInput,
+    first: int,
+    income: np.ndarray,
+    expense: np.ndarray,
+    savings: np.ndarray,
+    moved: np.ndarray,
+    covered: np.ndarray,
+    params: Dict[str, np.ndarray],
+):
+    size = income.size
+    rows = np.arange(params["starting_balance"].size)
+    months = np.arange(size)
+
+    term = params["car_term_months"]
+    fin_start = data.financing.start
+    if fin_start is None:
+        active = np.zeros(rows.size, dtype=bool)
+        offset = 0
+    else:
+        active = term > 0
+        offset = fin_start - first
+
+    financed = (months >= offset) & (months < offset + term[:, None]) & active[:, None]
+    monthly_costs = (
+        params["car_monthly_rate"]
+        + params["car_insurance_monthly"]
+        + params["car_fuel_monthly"]
+        + params["car_maintenance_monthly"]
+        + params["car_tax_monthly"]
+    )
+    expenses = expense + financed * monthly_costs[:, None]
+    if active.any():
+        expenses[rows[active], offset] += params["car_down_payment"][active]
+        expenses[rows[active], offset + term[active] - 1] += params["car_final_payment"][active]
+
+    covered_rows = covered | financed
+    balance = params["starting_balance"][:, None] + np.cumsum(
+        income - expenses - savings + moved[MAIN_ACCOUNT], axis=1
+    )
+
+    growth = 1 + np.maximum(params["savings_return_rate"], 0) / 100 / 12
+    steps = np.cumsum(covered_rows, axis=1)
+    invested = np.power(growth[:, None], steps) * (
+        params["starting_saving_balance"][:, None]
+        + np.cumsum((savings + moved[SAVINGS_ACCOUNT]) * np.power(growth[:, None], 1 - steps), axis=1)
+    )
+
+    # uncovered months carry the previous values, so the last column is the end state
+    masked_balance = np.where(covered_rows, balance, np.inf)
+    lowest = masked_balance.argmin(axis=1)
+    lowest_balance = np.where(covered_rows.any(axis=1), masked_balance[rows, lowest], params["starting_balance"])
+    end_wealth = balance[:, -1] + round_cents(invested[:, -1]) + _accounts_end_balance(data, moved, steps)
+    return to_euros(end_wealth), to_euros(lowest_balance), first + lowest
+
+
+def _accounts_end_balance(data: ProjectionInput, moved: np.ndarray, steps: np.ndarray) -> np.ndarray:
+    """Summed end balance of the plan's LongtermAccounts per scenario."""
+    if not data.accounts:
+        return np.zeros(steps.shape[0], dtype=np.int64)
+    flows = moved[FIRST_ACCOUNT:]
+    starts = np.array([a.starting_balance for a in data.accounts], dtype=np.int64)
+    rates = np.array([a.return_rate for a in data.accounts], dtype=np.float64)
+    growing = rates > 0
+    total = np.full(steps.shape[0], starts[~growing].sum() + flows[~growing].sum(), dtype=np.int64)
+    if growing.any():
+        # interest accrues per covered month, which depends on the swept financing term
+        growth = (1 + rates[growing] / 100 / 12)[:, None, None]
+        ends = np.power(growth[:, :, 0], steps[:, -1]) * (
+            starts[growing][:, None]
+            + np.einsum("at,ast->as", flows[growing], np.power(growth, 1 - steps[None]))
+        )
+        total += round_cents(ends).sum(axis=0)
+    return total
+
+
+def run_sweep(
+    data: ProjectionInput,
+    base: Dict[str, float],
+    grid: Dict[str, Sequence[float]],
+    block_size: int = BLOCK_SIZE,
+) -> SweepResult:
+    fields = list(grid)
+    mesh = np.meshgrid(*[np.asarray(grid[name], dtype=np.float64) for name in fields], indexing="ij")
+    values = np.stack([axis.ravel() for axis in mesh], axis=1) if fields else np.zeros((1, 0))
+    count = values.shape[0]
+
+    columns = {name: np.full(count, base[name], dtype=np.float64) for name in SWEEP_FIELDS}
+    for position, name in enumerate(fields):
+        columns[name] = values[:, position]
+    columns["car_term_months"] = np.maximum(np.rint(columns["car_term_months"]), 0).astype(np.int64)
+    if ANNUITY_FIELDS & set(fields) and "car_monthly_rate" not in grid:
+        columns["car_monthly_rate"] = np.maximum(
+            solve_payment(
+                principal=columns["car_purchase_price"] - columns["car_down_payment"],
+                rate=np.maximum(columns["car_interest_rate"], 0),
+                term=columns["car_term_months"],
+                balloon=columns["car_final_payment"],
+            ),
+            0,
+        )
+    for name in MONEY_FIELDS:
+        columns[name] = euros_to_cents(columns[name])
+
+    if data.financing.account != MAIN_ACCOUNT:
+        raise ValueError("Sweeps do not support a financing paid from another account than the main one.")
+    first, size = month_span(data, term_months=int(columns["car_term_months"].max()))
+    if not size:
+        raise ValueError("Plan has no periods or financing to project.")
+    income, expense, savings, covered = period_series(data.periods, first, size)
+    moved, transferred = transfer_series(data.transfers, data.account_count, first, size)
+    covered = covered | transferred
+    apply_events(data.events, first, income, expense, covered, moved)
+
+    end_wealth = np.empty(count)
+    min_balance = np.empty(count)
+    min_balance_month = np.empty(count, dtype=np.int64)
+    for start in range(0, count, block_size):
+        block = slice(start, start + block_size)
+        params = {name: column[block] for name, column in columns.items()}
+        end_wealth[block], min_balance[block], min_balance_month[block] = _evaluate_block(
+            data, first, income, expense, savings, moved, covered, params
+        )
+
+    return SweepResult(
+        fields=fields,
+        values=values,
+        end_wealth=end_wealth,
+        min_balance=min_balance,
+        min_balance_month=min_balance_month,
+    )
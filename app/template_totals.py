@@ -0,0 +1,185 @@
+"""Month-of-year totals per template.
+
+Every income, expense and saving template stores the sum of its entries for
+each calendar month in ``month_totals`` (12 decimal strings, January
+first). Annual expenses only count in their ``annual_month``; all other
+entries count in every month. The vectors are refreshed in the flushing
+transaction whenever template links or entries change, so projections read
+the templates only and never walk their entries.
+"""
+
+from collections import defaultdict
+from decimal import Decimal
+from itertools import chain
+from typing import Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import bindparam, event, func, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.util import identity_key
+
+from app.models import (
+    Expense,
+    ExpenseTemplate,
+    Income,
+    IncomeTemplate,
+    LongtermPeriodExpenseTemplateLink,
+    LongtermPeriodIncomeTemplateLink,
+    LongtermPeriodSavingTemplateLink,
+    Saving,
+    SavingTemplate,
+    TemplateExpenseLink,
+    TemplateIncomeLink,
+    TemplateSavingLink,
+)
+from app.versions import bump_versions
+
+ZERO = Decimal("0")
+
+# kind -> (template model, link model, entry model, link column referencing the entry)
+KINDS = {
+    "income": (IncomeTemplate, TemplateIncomeLink, Income, TemplateIncomeLink.income_id),
+    "expense": (ExpenseTemplate, TemplateExpenseLink, Expense, TemplateExpenseLink.expense_id),
+    "saving": (SavingTemplate, TemplateSavingLink, Saving, TemplateSavingLink.saving_id),
+}
+PERIOD_LINKS = {
+    "income": LongtermPeriodIncomeTemplateLink,
+    "expense": LongtermPeriodExpenseTemplateLink,
+    "saving": LongtermPeriodSavingTemplateLink,
+}
+TEMPLATE_KINDS = {template: kind for kind, (template, _, _, _) in KINDS.items()}
+LINK_KINDS = {link: kind for kind, (_, link, _, _) in KINDS.items()}
+ENTRY_KINDS = {entry: kind for kind, (_, _, entry, _) in KINDS.items()}
+
+
+def empty_totals() -> List[Decimal]:
+    return [ZERO] * 12
+
+
+def add_entry(
+    totals: List[Decimal],
+    amount: Decimal,
+    is_annual_payment: bool = False,
+    annual_month: Optional[int] = None,
+    times: int = 1,
+) -> None:
+    """Add ``times`` occurrences of one entry to ``totals`` in place."""
+    amount = (amount or ZERO) * times
+    if is_annual_payment:
+        if annual_month and 1 <= annual_month <= 12:
+            totals[annual_month - 1] += amount
+        return
+    for month in range(12):
+        totals[month] += amount
+
+
+def parse_totals(values) -> List[Decimal]:
+    if not values:
+        return empty_totals()
+    return [Decimal(value) for value in values]
+
+
+def compute_month_totals(db: Session, kind: str, template_ids: Iterable[int]) -> Dict[int, List[Decimal]]:
+    template_ids = sorted(set(template_ids))
+    totals = {template_id: empty_totals() for template_id in template_ids}
+    if not template_ids:
+        return totals
+
+    _, link, entry, entry_column = KINDS[kind]
+    if kind == "expense":
+        keys = (entry.is_annual_payment, entry.annual_month)
+    else:
+        keys = ()
+    rows = db.connection().execute(
+        select(link.template_id, func.sum(entry.amount), *keys)
+        .join(entry, entry.id == entry_column)
+        .where(link.template_id.in_(template_ids))
+        .group_by(link.template_id, *keys)
+    )
+    for template_id, amount, *annual in rows:
+        add_entry(totals[template_id], amount, *annual)
+    return totals
+
+
+def linked_template_ids(db: Session, kind: str, entry_ids: Iterable[int]) -> Set[int]:
+    entry_ids = list(entry_ids)
+    if not entry_ids:
+        return set()
+    _, link, _, entry_column = KINDS[kind]
+    rows = db.connection().execute(select(link.template_id).where(entry_column.in_(entry_ids)).distinct())
+    return set(rows.scalars())
+
+
+def shared_month_totals(db: Session, kind: str, period_ids: Iterable[int]) -> Dict[int, List[Decimal]]:
+    """Month totals of the entries a period reaches through more than one template, counted per extra template.
+
+    Subtracting them from the sum of the period's template vectors counts
+    every entry once, as the projection did when it collected entries.
+    """
+    period_ids = sorted(set(period_ids))
+    if not period_ids:
+        return {}
+    _, link, entry, entry_column = KINDS[kind]
+    period_link = PERIOD_LINKS[kind]
+    if kind == "expense":
+        keys = (entry.is_annual_payment, entry.annual_month)
+    else:
+        keys = ()
+    rows = db.connection().execute(
+        select(period_link.period_id, entry.amount, func.count(), *keys)
+        .join(link, link.template_id == period_link.template_id)
+        .join(entry, entry.id == entry_column)
+        .where(period_link.period_id.in_(period_ids))
+        .group_by(period_link.period_id, entry.id, entry.amount, *keys)
+        .having(func.count() > 1)
+    )
+    shared: Dict[int, List[Decimal]] = {}
+    for period_id, amount, count, *annual in rows:
+        add_entry(shared.setdefault(period_id, empty_totals()), amount, *annual, times=count - 1)
+    return shared
+
+
+def refresh_month_totals(db: Session, kind: str, template_ids: Iterable[int]) -> None:
+    totals = compute_month_totals(db, kind, template_ids)
+    if not totals:
+        return
+    template = KINDS[kind][0]
+    table = template.__table__
+    values = {template_id: [str(value) for value in vector] for template_id, vector in totals.items()}
+    db.connection().execute(
+        update(table).where(table.c.id == bindparam("template_id")).values(month_totals=bindparam("totals")),
+        [{"template_id": template_id, "totals": vector} for template_id, vector in values.items()],
+    )
+    # keep loaded templates in sync without marking them dirty
+    for template_id, vector in values.items():
+        loaded = db.identity_map.get(identity_key(template, template_id))
+        if loaded is not None:
+            set_committed_value(loaded, "month_totals", vector)
+    bump_versions(db, (table.name,))
+    # imported here: both import app.models, which registers this module's hook
+    from app.cache import projection_cache
+    from app.plan_summary import schedule_refresh_after_commit
+
+    tags = [(f"{kind}_template", template_id) for template_id in values]
+    projection_cache.invalidate(*tags)
+    schedule_refresh_after_commit(db, *tags)
+
+
+def refresh_flushed_month_totals(session: Session, flush_context) -> None:
+    pending: Dict[str, Set[int]] = defaultdict(set)
+    changed_entries: Dict[str, Set[int]] = defaultdict(set)
+    for obj in chain(session.new, session.dirty, session.deleted):
+        model = type(obj)
+        if model in LINK_KINDS and obj.template_id is not None:
+            pending[LINK_KINDS[model]].add(obj.template_id)
+        elif model in TEMPLATE_KINDS and obj in session.new:
+            pending[TEMPLATE_KINDS[model]].add(obj.id)
+        elif model in ENTRY_KINDS and obj in session.dirty:
+            changed_entries[ENTRY_KINDS[model]].add(obj.id)
+    for kind, entry_ids in changed_entries.items():
+        pending[kind] |= linked_template_ids(session, kind, entry_ids)
+    for kind, template_ids in pending.items():
+        refresh_month_totals(session, kind, template_ids)
+
+
+event.listen(Session, "after_flush", refresh_flushed_month_totals)
@@ -0,0 +1,111 @@
+"""Per-table version counters for cheap conditional GETs.
+
+Every ORM flush bumps the counter of each table it wrote to (plus tables
+that follow through ON DELETE CASCADE) in the same transaction, so the
+counters are shared by all workers. List endpoints derive their ETag from
+the counters of the tables they read and can answer ``If-None-Match``
+without loading any rows.
+"""
+
+import hashlib
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable
+
+from sqlalchemy import BigInteger, DateTime, String, column, select, table, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.database import Base
+
+VERSIONS_TABLE = "table_versions"
+
+table_versions = table(
+    VERSIONS_TABLE,
+    column("table_name", String),
+    column("version", BigInteger),
+    column("updated_at", DateTime(timezone=True)),
+)
+
+# dialects with INSERT ... ON CONFLICT DO UPDATE
+UPSERT_INSERTS = {"postgresql": postgresql_insert, "sqlite": sqlite_insert}
+
+
+@lru_cache(maxsize=None)
+def _cascade_children(table_name: str) -> FrozenSet[str]:
+    children = set()
+    pending = [table_name]
+    while pending:
+        parent = pending.pop()
+        for candidate in Base.metadata.tables.values():
+            for fk in candidate.foreign_keys:
+                if (
+                    fk.column.table.name == parent
+                    and (fk.ondelete or "").upper() == "CASCADE"
+                    and candidate.name not in children
+                ):
+                    children.add(candidate.name)
+                    pending.append(candidate.name)
+    return frozenset(children)
+
+
+def bump_versions(db: Session, tables: Iterable[str]) -> None:
+    """Bump the counters of ``tables``, creating the rows of tables not counted yet."""
+    names = sorted(set(tables))
+    if not names:
+        return
+    now = datetime.now(timezone.utc)
+    connection = db.connection()
+    dialect_insert = UPSERT_INSERTS.get(connection.dialect.name)
+    if dialect_insert is not None:
+        # one statement, so two first writers of a table cannot both insert its row
+        statement = dialect_insert(table_versions).values(
+            [{"table_name": name, "version": 1, "updated_at": now} for name in names]
+        )
+        connection.execute(
+            statement.on_conflict_do_update(
+                index_elements=[table_versions.c.table_name],
+                set_={"version": table_versions.c.version + 1, "updated_at": statement.excluded.updated_at},
+            )
+        )
+        return
+
+    for name in names:
+        result = connection.execute(
+            update(table_versions)
+            .where(table_versions.c.table_name == name)
+            .values(version=table_versions.c.version + 1, updated_at=now)
+        )
+        if result.rowcount == 0:
+            connection.execute(table_versions.insert().values(table_name=name, version=1, updated_at=now))
+
+
+def bump_flushed_table_versions(session: Session, flush_context) -> None:
+    tables = set()
+    for obj in list(session.new) + list(session.dirty):
+        tables.add(obj.__table__.name)
+    for obj in session.deleted:
+        tables.add(obj.__table__.name)
+        tables |= _cascade_children(obj.__table__.name)
+    tables.discard(VERSIONS_TABLE)
+    if tables:
+        bump_versions(session, tables)
+
+
+def read_versions(db: Session, tables: Iterable[str]) -> Dict[str, tuple]:
+    names = sorted(set(tables))
+    rows = db.execute(
+        select(table_versions.c.table_name, table_versions.c.version, table_versions.c.updated_at)
+        .where(table_versions.c.table_name.in_(names))
+    )
+    found = {name: (version, updated_at) for name, version, updated_at in rows}
+    return {name: found.get(name, (0, None)) for name in names}
+
+
+def table_etag(db: Session, tables: Iterable[str], variant: str = "") -> str:
+    """ETag for data read from ``tables``; ``variant`` distinguishes e.g. different query strings."""
+    versions = read_versions(db, tables)
+    token = ";".join(f"{name}={version}@{updated_at}" for name, (version, updated_at) in versions.items())
+    token += "|" + variant
+    return '"' + hashlib.blake2b(token.encode(), digest_size=16).hexdigest() + '"'
@@ -0,0 +1,13 @@
+from dataclasses import asdict, dataclass
+
+
+@dataclass(frozen=True)
+class DatasetSize:
+    entries: int = 2000
+    templates: int = 60
+    plans: int = 50
+    periods: int = 4
+    seed: int = 42
+
+    def to_dict(self) -> dict:
+        return asdict(self)
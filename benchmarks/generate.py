@@ -0,0 +1,154 @@
+"""Synthetic data for the benchmarks.
+
+Creates ``entries`` incomes/expenses/savings, ``templates`` templates over
+them and ``plans`` long-term plans with ``periods`` consecutive periods each.
+The same seed always produces the same data. All tables are dropped and
+recreated first, so point it at a throwaway database only.
+"""
+
+import random
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, List
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.database import Base
+from app.models import (
+    Expense,
+    ExpenseTemplate,
+    Income,
+    IncomeTemplate,
+    LongtermPeriod,
+    LongtermPeriodExpenseTemplateLink,
+    LongtermPeriodIncomeTemplateLink,
+    LongtermPeriodSavingTemplateLink,
+    LongtermPlan,
+    Saving,
+    SavingTemplate,
+    TemplateExpenseLink,
+    TemplateIncomeLink,
+    TemplateSavingLink,
+)
+from app.template_totals import refresh_month_totals
+from app.versions import bump_versions
+from benchmarks.dataset import DatasetSize
+
+CATEGORIES = ("housing", "food", "transport", "insurance", "leisure", "other")
+
+
+def _insert(db: Session, model, rows: List[dict]) -> List[int]:
+    if not rows:
+        return []
+    return list(db.scalars(insert(model).returning(model.id, sort_by_parameter_order=True), rows))
+
+
+def _money(rng: random.Random, low: float, high: float) -> Decimal:
+    return Decimal(f"{rng.uniform(low, high):.2f}")
+
+
+def _add_months(month: date, count: int) -> date:
+    year, index = divmod(month.year * 12 + month.month - 1 + count, 12)
+    return date(year, index + 1, 1)
+
+
+def generate(engine, size: DatasetSize) -> Dict[str, List[int]]:
+    """Recreate the schema on ``engine`` and fill it; returns the created ids by table."""
+    rng = random.Random(size.seed)
+    now = datetime(2026, 1, 1)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    with Session(engine) as db:
+        income_count = max(1, size.entries // 5)
+        saving_count = max(1, size.entries // 10)
+        expense_count = max(1, size.entries - income_count - saving_count)
+        incomes = _insert(db, Income, [
+            {"name": f"Income {i}", "amount": _money(rng, 200, 4000), "description": None, "created_at": now}
+            for i in range(income_count)
+        ])
+        savings = _insert(db, Saving, [
+            {"name": f"Saving {i}", "amount": _money(rng, 20, 500), "description": None, "created_at": now}
+            for i in range(saving_count)
+        ])
+        expense_rows = []
+        for i in range(expense_count):
+            annual = rng.random() < 0.2
+            expense_rows.append({
+                "name": f"Expense {i}",
+                "amount": _money(rng, 5, 1500),
+                "category": rng.choice(CATEGORIES),
+                "description": None,
+                "is_annual_payment": annual,
+                "annual_month": rng.randint(1, 12) if annual else None,
+                "created_at": now,
+            })
+        expenses = _insert(db, Expense, expense_rows)
+
+        templates = {}
+        per_kind = max(1, size.templates // 3)
+        for kind, template_model, link_model, column, entry_ids in (
+            ("income", IncomeTemplate, TemplateIncomeLink, "income_id", incomes),
+            ("expense", ExpenseTemplate, TemplateExpenseLink, "expense_id", expenses),
+            ("saving", SavingTemplate, TemplateSavingLink, "saving_id", savings),
+        ):
+            template_ids = _insert(db, template_model, [
+                {"name": f"{kind.title()} template {i}", "description": None, "created_at": now}
+                for i in range(per_kind)
+            ])
+            links = []
+            for template_id in template_ids:
+                chosen = rng.sample(entry_ids, min(len(entry_ids), rng.randint(3, 15)))
+                links.extend({"template_id": template_id, column: entry_id, "created_at": now} for entry_id in chosen)
+            _insert(db, link_model, links)
+            refresh_month_totals(db, kind, template_ids)
+            templates[kind] = template_ids
+
+        plans = _insert(db, LongtermPlan, [
+            {
+                "name": f"Plan {i}",
+                "description": None,
+                "starting_balance": _money(rng, 0, 20000),
+                "starting_saving_balance": _money(rng, 0, 50000),
+                "financing_start_month": date(2026 + rng.randint(0, 3), rng.randint(1, 12), 1),
+                "car_purchase_price": Decimal("30000"),
+                "car_down_payment": Decimal("5000"),
+                "car_final_payment": Decimal("10000"),
+                "car_monthly_rate": _money(rng, 150, 600),
+                "car_term_months": rng.choice((24, 36, 48)),
+                "car_insurance_monthly": Decimal("60"),
+                "car_fuel_monthly": Decimal("120"),
+                "car_maintenance_monthly": Decimal("40"),
+                "car_tax_monthly": Decimal("15"),
+                "car_interest_rate": Decimal("4.5"),
+                "savings_return_rate": Decimal("6"),
+                "created_at": now,
+            }
+            for i in range(size.plans)
+        ])
+
+        period_rows = []
+        for plan_id in plans:
+            start = date(2026, 1, 1)
+            for _ in range(size.periods):
+                end = _add_months(start, rng.randint(12, 60) - 1)
+                period_rows.append({"plan_id": plan_id, "start_month": start, "end_month": end, "created_at": now})
+                start = _add_months(end, 1)
+        periods = _insert(db, LongtermPeriod, period_rows)
+
+        for kind, link_model in (
+            ("income", LongtermPeriodIncomeTemplateLink),
+            ("expense", LongtermPeriodExpenseTemplateLink),
+            ("saving", LongtermPeriodSavingTemplateLink),
+        ):
+            _insert(db, link_model, [
+                {"period_id": period_id, "template_id": template_id, "created_at": now}
+                for period_id in periods
+                for template_id in rng.sample(templates[kind], min(len(templates[kind]), rng.randint(1, 3)))
+            ])
+
+        bump_versions(db, [table.name for table in Base.metadata.sorted_tables if table.name != "table_versions"])
+        db.commit()
+
+    return {"incomes": incomes, "expenses": expenses, "savings": savings, "plans": plans, **templates}
@@ -0,0 +1,248 @@
+"""Reproducible performance benchmarks.
+
+Generates a synthetic dataset (see benchmarks.generate), then times the
+main API endpoints through an in-process ASGI client and the projection
+math on its own. Results can be stored as a baseline and later compared
+against it::
+
+    python -m benchmarks.run --save-baseline
+    python -m benchmarks.run --compare            # exits 1 on regressions
+
+By default a temporary SQLite database is used; pass ``--database-url``
+to run against a local Postgres. Every run drops and recreates all
+tables of that database. Requires httpx (benchmarks/requirements.txt).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from benchmarks.dataset import DatasetSize
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+DEFAULT_TOLERANCE = 0.25
+
+
+def _summary(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        "runs": len(ordered),
+        "min_ms": round(ordered[0] * 1000, 3),
+        "median_ms": round(statistics.median(ordered) * 1000, 3),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 3),
+    }
+
+
+def _time_sync(fn: Callable[[], object], repeat: int) -> Dict[str, float]:
+    fn()  # warm up
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return _summary(samples)
+
+
+async def _time_request(client, method: str, url: str, repeat: int, **kwargs) -> Dict[str, float]:
+    async def call():
+        response = await client.request(method, url, **kwargs)
+        if response.status_code >= 400:
+            raise RuntimeError(f"{method} {url} failed with {response.status_code}: {response.text[:200]}")
+
+    await call()  # warm up
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await call()
+        samples.append(time.perf_counter() - started)
+    return _summary(samples)
+
+
+async def bench_endpoints(app, ids: Dict[str, List[int]], repeat: int) -> Dict[str, dict]:
+    import httpx
+
+    plan_id = ids["plans"][len(ids["plans"]) // 2]
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for name, url in (
+            ("GET /api/incomes", "/api/incomes"),
+            ("GET /api/expenses", "/api/expenses"),
+            ("GET /api/expenses?limit=100", "/api/expenses?limit=100"),
+            ("GET /api/savings", "/api/savings"),
+            ("GET /api/templates/income", "/api/templates/income"),
+            ("GET /api/templates/expense", "/api/templates/expense"),
+            ("GET /api/templates/saving", "/api/templates/saving"),
+            ("GET /api/longterm/plans", "/api/longterm/plans"),
+            ("GET /api/longterm/plans/{id}", f"/api/longterm/plans/{plan_id}"),
+            ("GET /api/longterm/plans/{id}/bundle", f"/api/longterm/plans/{plan_id}/bundle"),
+            ("GET /api/longterm/plans/{id}/projection", f"/api/longterm/plans/{plan_id}/projection"),
+        ):
+            results[name] = await _time_request(client, "GET", url, repeat)
+
+        etag = (await client.get("/api/expenses")).headers["etag"]
+        results["GET /api/expenses (304)"] = await _time_request(
+            client, "GET", "/api/expenses", repeat, headers={"If-None-Match": etag}
+        )
+
+        plan = (await client.get(f"/api/longterm/plans/{plan_id}")).json()
+        periods_payload = {
+            key: plan[key]
+            for key in (
+                "starting_balance",
+                "starting_saving_balance",
+                "car_purchase_price",
+                "car_down_payment",
+                "car_final_payment",
+                "car_monthly_rate",
+                "car_term_months",
+                "car_insurance_monthly",
+                "car_fuel_monthly",
+                "car_maintenance_monthly",
+                "car_tax_monthly",
+                "car_interest_rate",
+                "savings_return_rate",
+            )
+        }
+        periods_payload["financing_start_month"] = (plan["financing_start_month"] or "")[:7] or None
+        periods_payload["periods"] = [
+            {
+                "start_month": period["start_month"][:7],
+                "end_month": period["end_month"][:7],
+                "income_template_ids": period["income_template_ids"],
+                "expense_template_ids": period["expense_template_ids"],
+                "saving_template_ids": period["saving_template_ids"],
+            }
+            for period in plan["periods"]
+        ]
+        results["PUT /api/longterm/plans/{id}/periods"] = await _time_request(
+            client, "PUT", f"/api/longterm/plans/{plan_id}/periods", repeat, json=periods_payload
+        )
+        results["POST /api/longterm/plans/compare (all)"] = await _time_request(
+            client, "POST", "/api/longterm/plans/compare", max(1, repeat // 5), json={"plan_ids": "all"}
+        )
+    return results
+
+
+def bench_math(repeat: int) -> Dict[str, dict]:
+    import numpy as np
+
+    from app.database import SessionLocal
+    from app.finance import solve_rate
+    from app.projection import compute_projection, load_plans_for_projection, projection_input
+    from app.sweep import run_sweep, sweep_base
+
+    with SessionLocal() as db:
+        plans = load_plans_for_projection(db)
+    inputs = [projection_input(plan) for plan in plans]
+    plan = plans[len(plans) // 2]
+    data, base = projection_input(plan), sweep_base(plan)
+    grid = {
+        "car_monthly_rate": list(np.linspace(100, 800, 32)),
+        "savings_return_rate": list(np.linspace(0, 10, 32)),
+    }
+    loans = 100_000
+    principal = np.full(loans, 25_000.0)
+    payment = np.linspace(300, 900, loans)
+
+    return {
+        "projection input (all plans)": _time_sync(lambda: [projection_input(p) for p in plans], repeat),
+        "compute_projection (all plans)": _time_sync(lambda: [compute_projection(d) for d in inputs], repeat),
+        "run_sweep 32x32": _time_sync(lambda: run_sweep(data, base, grid), repeat),
+        "solve_rate 100k loans": _time_sync(lambda: solve_rate(principal, payment, 48, 5_000), repeat),
+    }
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], tolerance: float) -> List[str]:
+    regressions = []
+    for name, current in sorted(results.items()):
+        previous = baseline.get(name)
+        if previous is None:
+            print(f"  new       {name}: {current['median_ms']:.3f} ms")
+            continue
+        ratio = current["median_ms"] / previous["median_ms"] if previous["median_ms"] else float("inf")
+        marker = "SLOWER" if ratio > 1 + tolerance else "ok"
+        print(f"  {marker:<9} {name}: {previous['median_ms']:.3f} -> {current['median_ms']:.3f} ms ({ratio:.2f}x)")
+        if marker == "SLOWER":
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None) -> int:
+    defaults = DatasetSize()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", help="database to (re)create; default: temporary SQLite file")
+    parser.add_argument("--entries", type=int, default=defaults.entries)
+    parser.add_argument("--templates", type=int, default=defaults.templates)
+    parser.add_argument("--plans", type=int, default=defaults.plans)
+    parser.add_argument("--periods", type=int, default=defaults.periods)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="write the results to --baseline")
+    parser.add_argument("--compare", action="store_true", help="compare against --baseline, exit 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="allowed slowdown (0.25 = 25%%)")
+    parser.add_argument("--output", type=Path, help="also write the results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    tmpdir = None
+    if args.database_url is None:
+        tmpdir = tempfile.TemporaryDirectory(prefix="financeflow-bench-")
+        args.database_url = f"sqlite:///{tmpdir.name}/bench.db"
+    # app.database reads the URL at import time
+    os.environ["DATABASE_URL"] = args.database_url
+
+    from app.database import engine
+    from app.main import app
+    from benchmarks.generate import generate
+
+    size = DatasetSize(args.entries, args.templates, args.plans, args.periods, args.seed)
+    started = time.perf_counter()
+    ids = generate(engine, size)
+    print(f"generated {size.to_dict()} in {time.perf_counter() - started:.1f}s")
+
+    results = asyncio.run(bench_endpoints(app, ids, args.repeat))
+    results.update(bench_math(args.repeat))
+    for name, stats in results.items():
+        print(f"  {name:<45} median {stats['median_ms']:>9.3f} ms   p95 {stats['p95_ms']:>9.3f} ms")
+
+    report = {
+        "dataset": size.to_dict(),
+        "database": engine.dialect.name,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+
+    exit_code = 0
+    if args.compare:
+        baseline = json.loads(args.baseline.read_text())
+        if baseline.get("dataset") != size.to_dict():
+            print(f"warning: baseline was recorded with dataset {baseline.get('dataset')}")
+        print(f"compared to {args.baseline}:")
+        regressions = compare(results, baseline["results"], args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} benchmark(s) slower than baseline by more than {args.tolerance:.0%}")
+            exit_code = 1
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"baseline written to {args.baseline}")
+
+    if tmpdir is not None:
+        engine.dispose()
+        tmpdir.cleanup()
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,10 +4,8 @@ function loadPage(page, element) {
     });
     element.classList.add('active');
 
-    // cache-busting for iframe content to always load the latest HTML
-    const url = `${page}?t=${Date.now()}`;
-
-    document.getElementById('pageContent').src = url;
+    // pages are revalidated by the server (ETag), their JS/CSS have fingerprinted names
+    document.getElementById('pageContent').src = page;
 }
 
 function showMessage(elementId, text, type) {
@@ -36,6 +34,15 @@ function getCategoryText(category) {
     return map[category] || category;
 }
 
+// Money is summed in integer cents, which stay exact far beyond any plan's horizon
+function toCents(amount) {
+    return Math.round(Number(amount || 0) * 100);
+}
+
+function fromCents(cents) {
+    return cents / 100;
+}
+
 function formatCurrency(amount) {
     return `€ ${Number(amount).toLocaleString('en-US', {
         minimumFractionDigits: 2,
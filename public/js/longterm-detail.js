@@ -2,9 +2,8 @@ let plan = null;
 let incomeTemplates = [];
 let expenseTemplates = [];
 let savingTemplates = [];
-let incomeEntries = [];
-let expenseEntries = [];
-let savingEntries = [];
+// planFormState() as of the last load or save
+let savedPlanState = null;
 
 function parseNumberInput(id) {
     const el = document.getElementById(id);
@@ -36,10 +35,6 @@ function monthStringToDate(monthValue) {
     return new Date(year, month - 1, 1);
 }
 
-function addMonths(date, monthsToAdd) {
-    return new Date(date.getFullYear(), date.getMonth() + monthsToAdd, 1);
-}
-
 function syncMaintenanceMonthly(force = true) {
     const annual = parseNumberInput('maintenanceAnnual');
     if (!force && !annual) return;
@@ -73,18 +68,17 @@ function updateFinancingSummary() {
   const annualRate = Math.max(0, financing.interestRate || 0);
 
   // “Financed principal” = what the bank actually finances
-  // balloon/finalPayment is typically NOT financed until the end, so subtract it from financed principal
+  // balloon/finalPayment stays outstanding until the end and is discounted by the annuity formula
   const financedPrincipal =
     (financing.purchasePrice || 0) -
-    (financing.downPayment || 0) -
-    (financing.finalPayment || 0);
+    (financing.downPayment || 0);
 
   const principal = Math.max(0, financedPrincipal);
 
   // If user provided interestRate and a term, we can *suggest* a computed monthly rate
   let computedMonthlyRate = 0;
   if (months > 0) {
-    computedMonthlyRate = calculateMonthlyRate(principal, annualRate, months);
+    computedMonthlyRate = Math.max(0, calculateMonthlyRate(principal, annualRate, months, financing.finalPayment));
   }
 
   // Use the user-entered monthlyRate, unless it's empty/0 and we can compute one
@@ -115,16 +109,19 @@ function updateFinancingSummary() {
 }
 
 
-function calculateMonthlyRate(principal, annualRatePercent, months) {
+// same annuity formula as solve_payment in app/finance.py
+function calculateMonthlyRate(principal, annualRatePercent, months, finalPayment = 0) {
   if (months <= 0) return 0;
 
   const principalSafe = Math.max(0, Number(principal) || 0);
   const rateSafe = Math.max(0, Number(annualRatePercent) || 0);
+  const balloon = Math.max(0, Number(finalPayment) || 0);
 
-  if (rateSafe === 0) return principalSafe / months;
+  if (rateSafe === 0) return (principalSafe - balloon) / months;
 
   const r = rateSafe / 100 / 12;
-  return principalSafe * (r / (1 - Math.pow(1 + r, -months)));
+  const discount = Math.pow(1 + r, -months);
+  return (principalSafe - balloon * discount) * (r / (1 - discount));
 }
 
 
@@ -160,23 +157,13 @@ async function initDetail() {
     }
 
     try {
-        const [planResponse, incomesResponse, expensesResponse, incomeTemplatesResponse, expenseTemplatesResponse, savingsResponse, savingTemplatesResponse] = await Promise.all([
-            apiRequest(`/longterm/plans/${id}`),
-            apiRequest('/incomes'),
-            apiRequest('/expenses'),
-            apiRequest('/templates/income'),
-            apiRequest('/templates/expense'),
-            apiRequest('/savings'),
-            apiRequest('/templates/saving'),
-        ]);
+        // one request for everything the page needs; unchanged plans come back as 304 from the browser cache
+        const bundle = await apiRequest(`/longterm/plans/${id}/bundle`);
 
-        plan = planResponse;
-        incomeEntries = incomesResponse;
-        expenseEntries = expensesResponse;
-        incomeTemplates = incomeTemplatesResponse;
-        expenseTemplates = expenseTemplatesResponse;
-        savingEntries = savingsResponse;
-        savingTemplates = savingTemplatesResponse;
+        plan = bundle.plan;
+        incomeTemplates = bundle.income_templates;
+        expenseTemplates = bundle.expense_templates;
+        savingTemplates = bundle.saving_templates;
 
         document.getElementById('planTitle').textContent = plan.name;
         const descEl = document.getElementById('planDescription');
@@ -200,6 +187,7 @@ async function initDetail() {
 
         if (plan.periods && plan.periods.length) {
             plan.periods.forEach(period => addPeriodRow({
+                id: period.id,
                 start: toMonthInput(period.start_month),
                 end: toMonthInput(period.end_month),
                 incomeTemplateIds: period.income_template_ids || [],
@@ -210,6 +198,8 @@ async function initDetail() {
             addPeriodRow(getPresetRange());
         }
 
+        savedPlanState = planFormState();
+
         document.getElementById('maintenanceAnnual')?.addEventListener('input', () => {
             syncMaintenanceMonthly(true);
             updateFinancingSummary();
@@ -251,6 +241,7 @@ function addPeriodRow(defaults = {}) {
   const container = document.getElementById('periodsContainer');
   const row = document.createElement('div');
   row.className = 'period-row';
+  if (defaults.id) row.dataset.periodId = defaults.id;
 
   row.innerHTML = `
     <div class="form-group">
@@ -311,109 +302,6 @@ function addPeriodRow(defaults = {}) {
 }
 
 
-function monthRange(start, end) {
-    const [startYear, startMonth] = start.split('-').map(Number);
-    const [endYear, endMonth] = end.split('-').map(Number);
-    const startDate = new Date(startYear, startMonth - 1, 1);
-    const endDate = new Date(endYear, endMonth - 1, 1);
-
-    if (startDate > endDate) {
-        return null;
-    }
-
-    const months = [];
-    let cursor = new Date(startDate);
-    while (cursor <= endDate) {
-        months.push(new Date(cursor));
-        cursor.setMonth(cursor.getMonth() + 1);
-    }
-    return months;
-}
-
-function collectTemplateEntries(templateIds, templates, entryKey) {
-    if (!templateIds || !templateIds.length) return [];
-
-    const seen = new Set();
-    const collected = [];
-
-    templateIds.forEach(id => {
-        const template = templates.find(t => t.id === Number(id));
-        if (!template || !template[entryKey]) return;
-
-        template[entryKey].forEach(item => {
-            if (seen.has(item.id)) return;
-            seen.add(item.id);
-            collected.push(item);
-        });
-    });
-
-    return collected;
-}
-
-function sumIncomeEntries(entries) {
-    if (!entries || !entries.length) return 0;
-    return entries.reduce((sum, entry) => sum + Number(entry.amount || 0), 0);
-}
-
-function sumSavingEntries(entries) {
-    if (!entries || !entries.length) return 0;
-    return entries.reduce((sum, entry) => sum + Number(entry.amount || 0), 0);
-}
-
-function calculateMonthlyExpenses(entries, date) {
-    if (!entries || !entries.length) return 0;
-    const month = date.getMonth() + 1;
-
-    return entries.reduce((sum, expense) => {
-        const amount = Number(expense.amount || 0);
-        if (expense.is_annual_payment) {
-            return sum + (Number(expense.annual_month) === month ? amount : 0);
-        }
-        return sum + amount;
-    }, 0);
-}
-
-function applyFinancingToProjection(monthMap, financing) {
-    if (!financing || !financing.startMonth || financing.termMonths <= 0) return monthMap;
-
-    const startDate = monthStringToDate(financing.startMonth);
-    if (!startDate) return monthMap;
-
-    const runningCosts =
-		financing.carInsuranceMonthly +
-		financing.carFuelMonthly +
-		financing.carMaintenanceMonthly +
-		financing.carTaxMonthly;
-
-	const monthlyCosts = financing.monthlyRate + runningCosts;
-
-
-    for (let i = 0; i < financing.termMonths; i++) {
-        const current = addMonths(startDate, i);
-        const key = monthKey(current);
-        const existing = monthMap.get(key) || { date: new Date(current), income: 0, expense: 0, savings: 0 };
-        existing.expense += monthlyCosts;
-        monthMap.set(key, existing);
-    }
-
-    const startKey = monthKey(startDate);
-    const startEntry = monthMap.get(startKey) || { date: new Date(startDate), income: 0, expense: 0, savings: 0 };
-    startEntry.expense += financing.downPayment;
-    monthMap.set(startKey, startEntry);
-
-    const endDate = addMonths(startDate, Math.max(financing.termMonths - 1, 0));
-    const endKey = monthKey(endDate);
-    const endEntry = monthMap.get(endKey) || { date: new Date(endDate), income: 0, expense: 0, savings: 0 };
-    endEntry.expense += financing.finalPayment;
-    monthMap.set(endKey, endEntry);
-
-    return monthMap;
-}
-
-function monthKey(date) {
-    return `${date.getFullYear()}-${String(date.getMonth() + 1).padStart(2, '0')}`;
-}
-
 function templateNames(templates, templateIds) {
     if (!templateIds || !templateIds.length) return 'Keine Templates';
     const names = templateIds
@@ -432,6 +320,7 @@ function getCheckedIds(row, selector) {
 function collectPeriods() {
   const rows = Array.from(document.querySelectorAll('.period-row'));
   return rows.map(row => ({
+    id: row.dataset.periodId ? Number(row.dataset.periodId) : null,
     start: row.querySelector('.period-start').value,
     end: row.querySelector('.period-end').value,
     incomeTemplateIds: getCheckedIds(row, '.income-template-checkbox'),
@@ -440,6 +329,20 @@ function collectPeriods() {
   }));
 }
 
+// rows added since the last save learn the ids of the periods created for them
+function syncPeriodIds(periods) {
+  const rows = Array.from(document.querySelectorAll('.period-row'));
+  const known = new Set(rows.map(row => Number(row.dataset.periodId)).filter(Boolean));
+  const unclaimed = periods.filter(period => !known.has(period.id));
+  rows.filter(row => !row.dataset.periodId).forEach(row => {
+    const start = row.querySelector('.period-start').value;
+    const end = row.querySelector('.period-end').value;
+    const index = unclaimed.findIndex(period =>
+      toMonthInput(period.start_month) === start && toMonthInput(period.end_month) === end);
+    if (index >= 0) row.dataset.periodId = unclaimed.splice(index, 1)[0].id;
+  });
+}
+
 async function savePeriods() {
     const startingBalance = Number(document.getElementById('startingBalance').value || 0);
     const startingSavingBalance = Number(document.getElementById('startingSavingBalance').value || 0);
@@ -474,6 +377,7 @@ async function savePeriods() {
             return;
         }
         payload.push({
+            id: period.id,
             start_month: period.start,
             end_month: period.end,
             income_template_ids: period.incomeTemplateIds,
@@ -500,11 +404,14 @@ async function savePeriods() {
                 car_tax_monthly: financing.carTaxMonthly,
                 car_interest_rate: financing.interestRate,
                 savings_return_rate: savingsReturnRate,
-                periods: payload
+                periods: payload,
+                version: plan.version
             }
         });
+        syncPeriodIds(plan.periods || []);
         document.getElementById('startingBalance').value = Number(plan.starting_balance || 0);
         document.getElementById('startingSavingBalance').value = Number(plan.starting_saving_balance || 0);
+        savedPlanState = planFormState();
         showMessage('projectionMessage', 'Zeiträume gespeichert.', 'success');
     } catch (error) {
         console.error(error);
@@ -512,136 +419,118 @@ async function savePeriods() {
     }
 }
 
-function generateProjection() {
-    const startingBalance = Number(document.getElementById('startingBalance').value || 0);
-    const startingSavingBalance = Number(document.getElementById('startingSavingBalance').value || 0);
-    const savingsReturnRate = Number(document.getElementById('savingsReturnRate').value || 0);
-    const financing = collectFinancingData();
-
-    if (savingsReturnRate < 0) {
-        showMessage('projectionMessage', 'Rendite kann nicht negativ sein.', 'error');
-        return;
-    }
-
-    if (Number.isNaN(startingSavingBalance)) {
-        showMessage('projectionMessage', 'Bitte eine gültige Start-Sparsumme eingeben.', 'error');
+// the table shows the server projection of the saved plan, which also covers accounts, transfers and events
+async function generateProjection() {
+    let projection;
+    let events;
+    try {
+        [projection, events] = await Promise.all([
+            apiRequest(`/longterm/plans/${plan.id}/projection`),
+            apiRequest(`/longterm/plans/${plan.id}/events`),
+        ]);
+    } catch (error) {
+        console.error(error);
+        showMessage('projectionMessage', error.message || 'Projektion konnte nicht geladen werden.', 'error');
         return;
     }
 
-    const periods = collectPeriods();
-    if (!periods.length) {
-        showMessage('projectionMessage', 'Füge mindestens einen Zeitraum hinzu.', 'error');
+    if (!projection.months.length) {
+        showMessage('projectionMessage', 'Keine Monate im gespeicherten Plan gefunden.', 'error');
         return;
     }
 
-    const monthMap = new Map();
-    for (let i = 0; i < periods.length; i++) {
-        const period = periods[i];
-        if (!period.start || !period.end) {
-            showMessage('projectionMessage', `Zeitraum ${i + 1}: Bitte Start- und Endmonat wählen.`, 'error');
-            return;
-        }
-
-        const months = monthRange(period.start, period.end);
-        if (!months) {
-            showMessage('projectionMessage', `Zeitraum ${i + 1}: Startmonat muss vor dem Endmonat liegen.`, 'error');
-            return;
-        }
-
-        const periodIncomeEntries = collectTemplateEntries(period.incomeTemplateIds, incomeTemplates, 'incomes');
-        const periodExpenseEntries = collectTemplateEntries(period.expenseTemplateIds, expenseTemplates, 'expenses');
-        const periodSavingEntries = collectTemplateEntries(period.savingTemplateIds, savingTemplates, 'savings');
-        const monthlyIncome = sumIncomeEntries(periodIncomeEntries);
-        const monthlySavings = sumSavingEntries(periodSavingEntries);
-
-        months.forEach(date => {
-            const key = monthKey(date);
-            const existing = monthMap.get(key) || { date: new Date(date), income: 0, expense: 0, savings: 0 };
-            existing.income += monthlyIncome;
-            existing.expense += calculateMonthlyExpenses(periodExpenseEntries, date);
-            existing.savings += monthlySavings;
-            monthMap.set(key, existing);
-        });
-    }
-
-    applyFinancingToProjection(monthMap, financing);
+    const rows = projection.months.map((month, i) => ({
+        date: monthStringToDate(month),
+        income: projection.income[i],
+        expense: projection.expense[i],
+        savings: projection.savings[i],
+        net: projection.net[i],
+        balance: projection.balance[i],
+        savingTotal: projection.saving_total[i],
+        investedBalance: projection.invested_balance[i],
+        totalWealth: projection.total_wealth[i],
+        accounts: projection.accounts.map(account => account.balance[i]),
+    }));
 
-    if (!monthMap.size) {
-        showMessage('projectionMessage', 'Keine Monate im ausgewählten Zeitraum gefunden.', 'error');
-        return;
+    renderTable(rows, projection.accounts, events);
+    renderWealthGraph(rows);
+    if (planFormState() !== savedPlanState) {
+        showMessage('projectionMessage', 'Zeigt den gespeicherten Plan; ungespeicherte Änderungen erst speichern.', 'error');
+    } else {
+        showMessage('projectionMessage', 'Refreshed.', 'success');
     }
+}
 
-    const rows = Array.from(monthMap.values())
-        .sort((a, b) => a.date - b.date)
-        .map(item => {
-        const net = item.income - item.expense - (item.savings || 0);
-        return { ...item, net };
-    });
-
-    let balance = startingBalance;
-    let savingTotal = startingSavingBalance;
-    let investedBalance = startingSavingBalance;
-    const monthlyReturnRate = Math.max(0, Number(savingsReturnRate) || 0) / 100 / 12;
-    const rowsWithBalance = rows.map(r => {
-        balance += r.net;
-        savingTotal += r.savings || 0;
-        investedBalance = (investedBalance + (r.savings || 0)) * (1 + monthlyReturnRate);
-        return {
-            ...r,
-            balance,
-            savingTotal,
-        investedBalance,
-        totalWealth: balance + investedBalance,
-    };
+// serialized form inputs, to tell whether the rendered projection matches what is on screen
+function planFormState() {
+    return JSON.stringify({
+        startingBalance: document.getElementById('startingBalance').value,
+        startingSavingBalance: document.getElementById('startingSavingBalance').value,
+        savingsReturnRate: document.getElementById('savingsReturnRate').value,
+        financing: collectFinancingData(),
+        periods: collectPeriods(),
     });
+}
 
-    renderTable(rowsWithBalance, startingBalance, startingSavingBalance, periods, financing, savingsReturnRate);
-    renderWealthGraph(rowsWithBalance);
-    showMessage('projectionMessage', 'Refreshed.', 'success');
+function accountName(accountId) {
+    const account = (plan.accounts || []).find(a => a.id === accountId);
+    return account ? account.name : `Konto ${accountId}`;
 }
 
-function renderTable(rows, startingBalance, startingSavingBalance, periods, financing, savingsReturnRate) {
+function renderTable(rows, accountSeries, events) {
     const container = document.getElementById('projectionTable');
     if (!rows.length) {
         container.innerHTML = '';
         return;
     }
 
+    const periods = plan.periods || [];
     const periodSummary = periods.map((p, idx) => {
-        const incomeName = templateNames(incomeTemplates, p.incomeTemplateIds);
-        const expenseName = templateNames(expenseTemplates, p.expenseTemplateIds);
-        const savingName = templateNames(savingTemplates, p.savingTemplateIds);
-        return `#${idx + 1}: ${p.start} → ${p.end} • Income: ${incomeName} • Expense: ${expenseName} • Saving: ${savingName}`;
+        const incomeName = templateNames(incomeTemplates, p.income_template_ids);
+        const expenseName = templateNames(expenseTemplates, p.expense_template_ids);
+        const savingName = templateNames(savingTemplates, p.saving_template_ids);
+        return `#${idx + 1}: ${toMonthInput(p.start_month)} → ${toMonthInput(p.end_month)} • Income: ${incomeName} • Expense: ${expenseName} • Saving: ${savingName}`;
     }).join('<br>');
 
     const runningCosts =
-		financing.carInsuranceMonthly +
-		financing.carFuelMonthly +
-		financing.carMaintenanceMonthly +
-		financing.carTaxMonthly;
-
-	const totalPaid = financing.downPayment + (financing.monthlyRate * financing.termMonths) + financing.finalPayment;
-	const totalInterest = Math.max(0, totalPaid - financing.purchasePrice);
-	const startText = financing.startMonth ? ` from ${financing.startMonth}` : '';
-
-	financingDetails = `
-		<div class="entry-details" style="margin-bottom:10px;">
-			Vehicle financing${startText}: ${financing.termMonths} months •
-			Monthly rate ${formatCurrency(financing.monthlyRate)} •
-			Running costs ${formatCurrency(runningCosts)} / month •
-			Estimated interest ${formatCurrency(totalInterest)}
-		</div>
-		`;
+        Number(plan.car_insurance_monthly || 0) +
+        Number(plan.car_fuel_monthly || 0) +
+        Number(plan.car_maintenance_monthly || 0) +
+        Number(plan.car_tax_monthly || 0);
+    const termMonths = Number(plan.car_term_months || 0);
+    const monthlyRate = Number(plan.car_monthly_rate || 0);
+    const totalPaid = Number(plan.car_down_payment || 0) + (monthlyRate * termMonths) + Number(plan.car_final_payment || 0);
+    const totalInterest = Math.max(0, totalPaid - Number(plan.car_purchase_price || 0));
+    const startText = plan.financing_start_month ? ` from ${toMonthInput(plan.financing_start_month)}` : '';
+    const financingAccount = plan.financing_account_id ? ` • booked on ${accountName(plan.financing_account_id)}` : '';
+
+    const financingDetails = `
+        <div class="entry-details" style="margin-bottom:10px;">
+            Vehicle financing${startText}: ${termMonths} months •
+            Monthly rate ${formatCurrency(monthlyRate)} •
+            Running costs ${formatCurrency(runningCosts)} / month •
+            Estimated interest ${formatCurrency(totalInterest)}${financingAccount}
+        </div>
+    `;
 
+    const eventSummary = events.length ? `
+        <div class="entry-details" style="margin-bottom:10px;">
+            Einmalige Buchungen: ${events.map(e =>
+                `${toMonthInput(e.month)} ${e.name || e.kind} ${e.kind === 'income' ? '+' : '−'}${formatCurrency(e.amount)}` +
+                (e.account_id ? ` (${accountName(e.account_id)})` : '')
+            ).join(' • ')}
+        </div>
+    ` : '';
 
     const header = `
-        <div class=\"entry-details\" style=\"margin-bottom:10px;\">
-            Start Balance: <strong>${formatCurrency(startingBalance)}</strong> •
-            Sparkonto Start: <strong>${formatCurrency(startingSavingBalance)}</strong> •
-            ${periods.length} Zeitraum(e) • Rendite Sparrate: ${Number(savingsReturnRate || 0).toFixed(2)}% p.a.
+        <div class="entry-details" style="margin-bottom:10px;">
+            Start Balance: <strong>${formatCurrency(plan.starting_balance || 0)}</strong> •
+            Sparkonto Start: <strong>${formatCurrency(plan.starting_saving_balance || 0)}</strong> •
+            ${periods.length} Zeitraum(e) • Rendite Sparrate: ${Number(plan.savings_return_rate || 0).toFixed(2)}% p.a.
         </div>
-        ${periodSummary ? `<div class=\"entry-details\" style=\"margin-bottom:10px;\">${periodSummary}</div>` : ''}
+        ${periodSummary ? `<div class="entry-details" style="margin-bottom:10px;">${periodSummary}</div>` : ''}
         ${financingDetails}
+        ${eventSummary}
     `;
 
     const table = `
@@ -649,28 +538,30 @@ function renderTable(rows, startingBalance, startingSavingBalance, periods, fina
             <thead>
                 <tr>
                     <th>Monat</th>
-                    <th class=\"text-right\">Income</th>
-                    <th class=\"text-right\">Expense</th>
-                    <th class=\"text-right\">Saving</th>
-                    <th class=\"text-right\">Netto</th>
-                    <th class=\"text-right\">Sparkonto</th>
-                    <th class=\"text-right\">Sparanlage (mit Rendite)</th>
-                    <th class=\"text-right\">Balance</th>
-                    <th class=\"text-right\">Gesamtvermögen</th>
+                    <th class="text-right">Income</th>
+                    <th class="text-right">Expense</th>
+                    <th class="text-right">Saving</th>
+                    <th class="text-right">Netto</th>
+                    <th class="text-right">Sparkonto</th>
+                    <th class="text-right">Sparanlage (mit Rendite)</th>
+                    <th class="text-right">Balance</th>
+                    ${accountSeries.map(account => `<th class="text-right">${accountName(account.id)}</th>`).join('')}
+                    <th class="text-right">Gesamtvermögen</th>
                 </tr>
             </thead>
             <tbody>
                 ${rows.map(r => `
                     <tr>
                         <td>${formatMonth(r.date)}</td>
-                        <td class=\"text-right\">${formatCurrency(r.income)}</td>
-                        <td class=\"text-right\">${formatCurrency(r.expense)}</td>
-                        <td class=\"text-right\">${formatCurrency(r.savings || 0)}</td>
-                        <td class=\"text-right\">${formatCurrency(r.net)}</td>
-                        <td class=\"text-right\">${formatCurrency(r.savingTotal)}</td>
-                        <td class=\"text-right\">${formatCurrency(r.investedBalance)}</td>
-                        <td class=\"text-right\">${formatCurrency(r.balance)}</td>
-                        <td class=\"text-right\">${formatCurrency(r.totalWealth)}</td>
+                        <td class="text-right">${formatCurrency(r.income)}</td>
+                        <td class="text-right">${formatCurrency(r.expense)}</td>
+                        <td class="text-right">${formatCurrency(r.savings || 0)}</td>
+                        <td class="text-right">${formatCurrency(r.net)}</td>
+                        <td class="text-right">${formatCurrency(r.savingTotal)}</td>
+                        <td class="text-right">${formatCurrency(r.investedBalance)}</td>
+                        <td class="text-right">${formatCurrency(r.balance)}</td>
+                        ${r.accounts.map(balance => `<td class="text-right">${formatCurrency(balance)}</td>`).join('')}
+                        <td class="text-right">${formatCurrency(r.totalWealth)}</td>
                     </tr>
                 `).join('')}
             </tbody>
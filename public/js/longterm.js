@@ -33,11 +33,33 @@ function renderPlans() {
             <div class="pill">Plan</div>
             <h3>${plan.name}</h3>
             ${plan.description ? `<p>${plan.description}</p>` : '<p>No Description.</p>'}
+            ${renderPlanSummary(plan)}
             <div class="plan-meta">Created on ${new Date(plan.created_at).toLocaleDateString()}</div>
         </div>
     `).join('');
 }
 
+function formatSummaryMonth(value) {
+    // "YYYY-MM-DD" of the first day of the month
+    const [year, month] = value.split('-').map(Number);
+    return new Date(year, month - 1, 1).toLocaleDateString(undefined, { month: 'short', year: 'numeric' });
+}
+
+function renderPlanSummary(plan) {
+    const summary = plan.summary;
+    // computed in the background after every change
+    if (!summary) return '<div class="plan-meta">Summary is being calculated…</div>';
+    if (!summary.first_month) return '<div class="plan-meta">Nothing to project yet.</div>';
+
+    return `
+        <div class="plan-summary">
+            <div>${formatSummaryMonth(summary.first_month)} – ${formatSummaryMonth(summary.last_month)}</div>
+            <div>Start capital: ${formatCurrency(fromCents(toCents(plan.starting_balance) + toCents(plan.starting_saving_balance)))}</div>
+            <div>End capital: ${formatCurrency(summary.end_wealth)}</div>
+        </div>
+    `;
+}
+
 function openPlan(id) {
     window.location.href = `longterm-detail.html?id=${id}`;
 }
@@ -1,13 +1,16 @@
+import os
+
 import uvicorn
-from fastapi.staticfiles import StaticFiles
-from app.main import app
 
-app.mount("/", StaticFiles(directory="public", html=True), name="static")
+from serve import log_config
 
 if __name__ == "__main__":
+    # rebuild the fingerprinted frontend assets when files in public/ change
+    os.environ.setdefault("STATIC_RELOAD", "1")
     uvicorn.run(
-        "app.main:app",
+        "app.asgi:app",
         host="0.0.0.0",
         port=8000,
-        reload=True
-    )
\ No newline at end of file
+        reload=True,
+        log_config=log_config("info"),
+    )
@@ -0,0 +1,155 @@
+"""Production entry point.
+
+Runs the API and the frontend (app.asgi:app) in several uvicorn worker
+processes. uvloop and httptools are used when installed (``pip install
+uvloop httptools``), otherwise uvicorn falls back to asyncio and h11.
+Every option can also be set through the environment, e.g.::
+
+    WEB_CONCURRENCY=8 PORT=8080 python serve.py
+
+The schema is checked once, in this process, before any worker starts
+(--schema check, the default: refuse to start unless the database is at
+the Alembic head). Workers then start with SCHEMA_MODE=off and do not
+touch the schema. Use --schema create only for throwaway databases.
+Missing plan summaries are computed here as well, so the workers do not
+all compute the same ones (SUMMARY_BACKFILL=off).
+
+On SIGTERM/SIGINT the workers stop accepting connections and finish
+in-flight requests for up to --graceful-timeout seconds. Load balancers
+should poll /api/health/ready, which answers per worker (the response
+contains its pid) and fails while that worker cannot reach the database.
+"""
+
+import argparse
+import copy
+import importlib.util
+import logging
+import logging.config
+import os
+import time
+
+import uvicorn
+from uvicorn.config import LOGGING_CONFIG
+
+logger = logging.getLogger("financeflow.serve")
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def _available(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def log_config(level: str) -> dict:
+    """uvicorn's logging config plus the application loggers; applied again in every worker."""
+    config = copy.deepcopy(LOGGING_CONFIG)
+    config["loggers"]["financeflow"] = {"handlers": ["default"], "level": level.upper(), "propagate": False}
+    return config
+
+
+def prepare_schema(mode: str) -> None:
+    if mode == "off":
+        return
+    from app import database, models  # noqa: F401 - registers the tables for --schema create
+    from app.startup import prepare_schema as prepare
+
+    if database.engine is None:
+        raise SystemExit("DATABASE_URL is not configured")
+    started = time.perf_counter()
+    try:
+        prepare(database.engine, mode)
+    except RuntimeError as exc:
+        raise SystemExit(str(exc))
+    finally:
+        database.engine.dispose()
+    logger.info("Schema %s done in %.1f ms", mode, (time.perf_counter() - started) * 1000)
+
+
+def backfill_summaries() -> None:
+    from app import database
+    from app.plan_summary import backfill_summaries as backfill
+
+    started = time.perf_counter()
+    try:
+        # on this process only; a process pool here would outlive the backfill
+        count = backfill(workers=1)
+    finally:
+        database.engine.dispose()
+    logger.info("Summarized %d plan(s) in %.1f ms", count, (time.perf_counter() - started) * 1000)
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    cpus = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description="Run FinanceFlow with multiple worker processes.")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=_env_int("PORT", 8000))
+    parser.add_argument("--workers", type=int, default=_env_int("WEB_CONCURRENCY", cpus))
+    parser.add_argument("--backlog", type=int, default=_env_int("BACKLOG", 2048))
+    parser.add_argument(
+        "--keep-alive", type=int, default=_env_int("KEEP_ALIVE", 5),
+        help="seconds an idle keep-alive connection stays open",
+    )
+    parser.add_argument(
+        "--limit-concurrency", type=int, default=_env_int("LIMIT_CONCURRENCY", 0),
+        help="per worker; answer 503 above this many connections (0 = unlimited)",
+    )
+    parser.add_argument(
+        "--max-requests", type=int, default=_env_int("MAX_REQUESTS", 0),
+        help="restart a worker after this many requests (0 = never)",
+    )
+    parser.add_argument("--graceful-timeout", type=int, default=_env_int("GRACEFUL_TIMEOUT", 30))
+    parser.add_argument("--forwarded-allow-ips", default=os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1"))
+    parser.add_argument(
+        "--schema", choices=("check", "create", "off"), default=os.getenv("SCHEMA_MODE", "check"),
+        help="what to do with the database schema before the workers start",
+    )
+    parser.add_argument("--log-level", default=os.getenv("LOG_LEVEL", "info"))
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    workers = max(1, args.workers)
+    loop = "uvloop" if _available("uvloop") else "asyncio"
+    http = "httptools" if _available("httptools") else "h11"
+
+    # each worker gets its own process pool (app.pool); share the cores instead of multiplying them
+    os.environ.setdefault("PROCESS_POOL_WORKERS", str(max(1, (os.cpu_count() or 1) // workers)))
+
+    logging_config = log_config(args.log_level)
+    logging.config.dictConfig(logging_config)
+    prepare_schema(args.schema)
+    os.environ["SCHEMA_MODE"] = "off"
+    if args.schema != "off":
+        backfill_summaries()
+    os.environ["SUMMARY_BACKFILL"] = "off"
+
+    logger.info(
+        "Starting %d worker(s) on %s:%d (loop=%s, http=%s, backlog=%d, keep-alive=%ds)",
+        workers, args.host, args.port, loop, http, args.backlog, args.keep_alive,
+    )
+    uvicorn.run(
+        "app.asgi:app",
+        host=args.host,
+        port=args.port,
+        workers=workers,
+        loop=loop,
+        http=http,
+        backlog=args.backlog,
+        timeout_keep_alive=args.keep_alive,
+        limit_concurrency=args.limit_concurrency or None,
+        limit_max_requests=args.max_requests or None,
+        timeout_graceful_shutdown=args.graceful_timeout,
+        proxy_headers=True,
+        forwarded_allow_ips=args.forwarded_allow_ips,
+        access_log=False,
+        log_config=logging_config,
+        log_level=args.log_level,
+    )
+
+
+if __name__ == "__main__":
+    main()
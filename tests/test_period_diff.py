@@ -0,0 +1,118 @@
+from datetime import date
+
+import pytest
+
+from app.models import LongtermPeriod, LongtermPeriodIncomeTemplateLink, LongtermPlan
+from app.period_diff import PeriodSpec, apply_period_diff, match_periods
+
+
+def month(value: str) -> date:
+    year, month_ = map(int, value.split("-"))
+    return date(year, month_, 1)
+
+
+def period(period_id, start, end, income=()):
+    return LongtermPeriod(
+        id=period_id,
+        start_month=month(start),
+        end_month=month(end),
+        income_templates=[
+            LongtermPeriodIncomeTemplateLink(template_id=template_id, account_id=account_id)
+            for template_id, account_id in income
+        ],
+    )
+
+
+def spec(start, end, period_id=None, income=(), accounts=None):
+    return PeriodSpec(
+        start_month=month(start),
+        end_month=month(end),
+        template_ids={"income": list(income), "expense": [], "saving": []},
+        id=period_id,
+        accounts=accounts if accounts is not None else {},
+    )
+
+
+def pairs(diff):
+    return [(stored.id, (submitted.start_month, submitted.end_month)) for stored, submitted in diff.matched]
+
+
+def test_matches_by_id_before_range():
+    first = period(1, "2026-01", "2026-12")
+    second = period(2, "2027-01", "2027-12")
+    # the id wins even though the range now equals the other stored period's
+    diff = match_periods([first, second], [spec("2027-01", "2027-12", period_id=1)])
+    assert pairs(diff) == [(1, (month("2027-01"), month("2027-12")))]
+    assert diff.deleted == [second]
+    assert diff.inserted == []
+
+
+def test_matches_identical_range_without_id():
+    first = period(1, "2026-01", "2026-12")
+    second = period(2, "2027-01", "2027-12")
+    diff = match_periods([first, second], [spec("2027-01", "2027-12"), spec("2026-01", "2026-12")])
+    assert sorted(pairs(diff)) == [(1, (month("2026-01"), month("2026-12"))), (2, (month("2027-01"), month("2027-12")))]
+    assert diff.deleted == [] and diff.inserted == []
+
+
+def test_pairs_leftovers_in_date_order():
+    stored = [period(1, "2028-01", "2028-12"), period(2, "2026-01", "2026-12")]
+    submitted = [spec("2029-01", "2029-06"), spec("2027-01", "2027-06")]
+    diff = match_periods(stored, submitted)
+    # earliest stored period takes the earliest submitted range
+    assert pairs(diff) == [(2, (month("2027-01"), month("2027-06"))), (1, (month("2029-01"), month("2029-06")))]
+
+
+def test_extra_periods_are_inserted_or_deleted():
+    stored = [period(1, "2026-01", "2026-12"), period(2, "2027-01", "2027-12"), period(3, "2028-01", "2028-12")]
+    diff = match_periods(stored, [spec("2027-01", "2027-12")])
+    assert pairs(diff) == [(2, (month("2027-01"), month("2027-12")))]
+    assert [p.id for p in diff.deleted] == [1, 3]
+
+    diff = match_periods(stored[:1], [spec("2026-01", "2026-12"), spec("2030-01", "2030-12")])
+    assert pairs(diff) == [(1, (month("2026-01"), month("2026-12")))]
+    assert [(s.start_month, s.end_month) for s in diff.inserted] == [(month("2030-01"), month("2030-12"))]
+
+
+def test_duplicate_id_is_matched_once():
+    stored = [period(1, "2026-01", "2026-12")]
+    diff = match_periods(stored, [spec("2026-01", "2026-12", period_id=1), spec("2027-01", "2027-12", period_id=1)])
+    assert pairs(diff) == [(1, (month("2026-01"), month("2026-12")))]
+    # the second claim on the same id becomes a new period
+    assert [(s.start_month, s.id) for s in diff.inserted] == [(month("2027-01"), 1)]
+    assert diff.deleted == []
+
+
+def test_rejects_ids_of_other_plans():
+    with pytest.raises(ValueError, match=r"\[7\]"):
+        match_periods([period(1, "2026-01", "2026-12")], [spec("2026-01", "2026-12", period_id=7)])
+
+
+def test_apply_counts_only_what_changed():
+    stored = period(1, "2026-01", "2026-12", income=[(10, None), (11, None)])
+    plan = LongtermPlan(periods=[stored])
+    submitted = spec("2026-01", "2026-12", period_id=1, income=[10, 12])
+    changes = apply_period_diff(plan, match_periods(plan.periods, [submitted]), {"income": {}, "expense": {}, "saving": {}})
+    assert (changes.periods_updated, changes.links_inserted, changes.links_deleted) == (0, 1, 1)
+    assert sorted(link.template_id for link in stored.income_templates) == [10, 12]
+
+
+def test_apply_keeps_accounts_of_omitted_kinds():
+    stored = period(1, "2026-01", "2026-12", income=[(10, 5)])
+    plan = LongtermPlan(periods=[stored])
+    templates = {"income": {}, "expense": {}, "saving": {}}
+
+    # no accounts sent for incomes: the link keeps account 5
+    changes = apply_period_diff(plan, match_periods(plan.periods, [spec("2026-01", "2026-12", 1, [10])]), templates)
+    assert changes.links_updated == 0
+    assert stored.income_templates[0].account_id == 5
+
+    # an explicit empty map books the link on the default account again
+    submitted = spec("2026-01", "2026-12", 1, [10], accounts={"income": {}})
+    changes = apply_period_diff(plan, match_periods(plan.periods, [submitted]), templates)
+    assert changes.links_updated == 1
+    assert stored.income_templates[0].account_id is None
+
+    submitted = spec("2026-01", "2026-12", 1, [10, 11], accounts={"income": {11: 6}})
+    apply_period_diff(plan, match_periods(plan.periods, [submitted]), templates)
+    assert {link.template_id: link.account_id for link in stored.income_templates} == {10: None, 11: 6}
@@ -0,0 +1,43 @@
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import update
+
+from app.models import LongtermPlan
+from app.routes.longterm import _claim_plan_version
+
+
+@pytest.fixture
+def plan(db):
+    plan = LongtermPlan(name="Plan")
+    db.add(plan)
+    db.commit()
+    return plan
+
+
+def test_claim_bumps_version(db, plan):
+    version = plan.version
+    _claim_plan_version(db, plan, version)
+    db.commit()
+    assert plan.version == version + 1
+    assert db.get(LongtermPlan, plan.id).version == version + 1
+
+
+def test_claim_rejects_version_the_client_did_not_load(db, plan):
+    with pytest.raises(HTTPException) as exc_info:
+        _claim_plan_version(db, plan, plan.version - 1)
+    assert exc_info.value.status_code == 409
+
+
+def test_claim_rejects_save_that_lost_the_race(db, plan):
+    version = plan.version
+    # another request saved the plan after this one loaded it
+    db.execute(
+        update(LongtermPlan)
+        .where(LongtermPlan.id == plan.id)
+        .values(version=version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    assert plan.version == version
+    with pytest.raises(HTTPException) as exc_info:
+        _claim_plan_version(db, plan, version)
+    assert exc_info.value.status_code == 409